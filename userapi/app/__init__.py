@@ -0,0 +1 @@
+from app import boot  # noqa: F401  (records the import time used by the boot report)
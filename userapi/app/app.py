@@ -1,6 +1,7 @@
 from flask import Flask
+from app.boot import BootTimer
 from app.config.config import get_config_by_name
-from app.initialize_functions import initialize_route, initialize_db, initialize_swagger, initialize_cors
+from app.initialize_functions import initialize_route, initialize_db, initialize_swagger, initialize_cors, initialize_hashing, initialize_commands, initialize_cache, initialize_json, initialize_compression, initialize_metrics, initialize_query_budget
 
 def create_app(config=None) -> Flask:
     """
@@ -12,20 +13,46 @@ def create_app(config=None) -> Flask:
     Returns:
         A Flask application instance.
     """
+    boot = BootTimer()
     app = Flask(__name__)
     if config:
         app.config.from_object(get_config_by_name(config))
 
     # Initialize CORS (must be done early)
-    initialize_cors(app)
+    with boot.phase('cors'):
+        initialize_cors(app)
+
+    # Install the configured JSON provider
+    initialize_json(app)
 
     # Initialize extensions
-    initialize_db(app)
+    with boot.phase('db'):
+        initialize_db(app)
+    with boot.phase('hashing'):
+        initialize_hashing(app)
+    initialize_cache(app)
+
+    # Request timing (its after_request runs last, so it includes compression)
+    initialize_metrics(app)
+
+    # Per-route query budgets and N+1 detection (tests fail, development warns)
+    initialize_query_budget(app)
 
     # Register blueprints
-    initialize_route(app)
+    with boot.phase('routes'):
+        initialize_route(app)
+
+    # Compress responses (after_request, runs after the blueprint hooks)
+    initialize_compression(app)
+
+    # Register CLI commands
+    initialize_commands(app)
 
     # Initialize Swagger
-    initialize_swagger(app)
+    with boot.phase('swagger'):
+        initialize_swagger(app)
+
+    app.extensions['boot'] = boot.finish()
+    app.logger.info('App ready in %.1f ms', boot.boot_ms)
 
     return app
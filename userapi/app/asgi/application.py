@@ -0,0 +1,194 @@
+import re
+from urllib.parse import parse_qs
+
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.app import create_app
+from app.db.db import db, Employee
+from app.compression.compression import etag_variants
+from app.modules.employee.controller import parse_fieldset, fieldset_tag, project_payload
+from app.modules.employee.serializers import select_employees, select_skills, add_skill_rows, employee_lookup
+
+
+# Async drivers replacing the sync ones configured for Flask-SQLAlchemy
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_engine_options(config, url):
+    """Engine options for the async engine, from the same DB_* settings as the sync one."""
+    backend = url.get_backend_name()
+    if backend == 'sqlite':
+        return {}
+    if config.get('DB_PGBOUNCER', False):
+        # PgBouncer in transaction mode cannot keep asyncpg's prepared statements
+        return {'poolclass': NullPool, 'connect_args': {'statement_cache_size': 0}}
+
+    options = {
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', -1),
+    }
+    statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+    if statement_timeout:
+        options['connect_args'] = {'server_settings': {'statement_timeout': str(int(statement_timeout))}}
+    return options
+
+
+def create_async_engine_for(flask_app):
+    """Async engine on the database of the Flask app (same URL, async driver)."""
+    with flask_app.app_context():
+        url = db.engine.url
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None:
+        raise ValueError(f'No async driver for {url.get_backend_name()}')
+    url = url.set(drivername=drivername)
+    if flask_app.config.get('DB_PGBOUNCER', False) and url.get_backend_name() == 'postgresql':
+        url = url.update_query_dict({'prepared_statement_cache_size': '0'})
+    return create_async_engine(url, **async_engine_options(flask_app.config, url))
+
+
+async def load_employee(session, include_skills=True, employee_id=None, email=None):
+    """Load one employee payload (with skills unless left out) by id or email, or return None."""
+    rows = (await session.execute(select_employees().where(employee_lookup(employee_id, email)).limit(1))).all()
+    if not rows:
+        return None
+    payload = dict(zip(Employee.SERIALIZED_FIELDS, rows[0]))
+    if not include_skills:
+        return payload
+    skill_rows = (await session.execute(select_skills([payload['id']]))).all()
+    return add_skill_rows([payload], skill_rows)[0]
+
+
+class ReadAPI:
+    """ASGI application serving the employee read endpoints on async sessions.
+
+    Serves GET /api/v1/employees/<id>, /api/v1/employees/by-email/<email>
+    and /api/v1/employees/<id>/skills with the payloads, ETags and errors of
+    the Flask routes, sparse fieldsets (fields / include) included, plus the
+    liveness probe. Everything else is 404:
+    writes stay on the WSGI app, and a proxy routes these reads here.
+    """
+
+    def __init__(self, flask_app, engine):
+        self.flask_app = flask_app
+        self.engine = engine
+        self.sessions = async_sessionmaker(engine, expire_on_commit=False)
+        self.dumps = flask_app.json.dumps
+        self.routes = [
+            (re.compile(r'^/api/v1/employees/(?P<employee_id>\d+)$'), self.get_employee_by_id),
+            (re.compile(r'^/api/v1/employees/by-email/(?P<email>[^/]+)$'), self.get_employee_by_email),
+            (re.compile(r'^/api/v1/employees/(?P<employee_id>\d+)/skills$'), self.get_employee_skills),
+            (re.compile(r'^/internal/health/live$'), self.liveness),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        for pattern, handler in self.routes:
+            match = pattern.match(scope['path'])
+            if match:
+                break
+        else:
+            await self.send_json(send, {'error': 'Not found'}, 404)
+            return
+        if scope['method'] not in ('GET', 'HEAD'):
+            await self.send_json(send, {'error': 'Method not allowed'}, 405, [(b'allow', b'GET, HEAD')])
+            return
+
+        request = {
+            'headers': {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']},
+            # Blank values count, as in Flask's request.args: ?fields= selects only the id
+            'args': {name: values[0] for name, values in
+                     parse_qs(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True).items()},
+            **match.groupdict(),
+        }
+        try:
+            result, status_code, etag = await handler(request)
+        except Exception as e:
+            result, status_code, etag = {'error': f'An error occurred: {str(e)}'}, 500, None
+
+        headers = []
+        if etag and status_code == 200:
+            headers.append((b'etag', f'"{etag}"'.encode()))
+            tags = if_none_match(request['headers'])
+            if '*' in tags or tags.intersection(etag_variants(etag)):
+                await self.send(send, 304, b'', headers)
+                return
+        await self.send_json(send, result, status_code, headers, head=scope['method'] == 'HEAD')
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def send_json(self, send, result, status_code, headers=(), head=False):
+        body = (self.dumps(result) + '\n').encode()
+        headers = [(b'content-type', b'application/json'), *headers]
+        await self.send(send, status_code, b'' if head else body, headers, content_length=len(body))
+
+    @staticmethod
+    async def send(send, status_code, body, headers, content_length=None):
+        length = len(body) if content_length is None else content_length
+        await send({
+            'type': 'http.response.start',
+            'status': status_code,
+            'headers': [*headers, (b'content-length', str(length).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _employee(self, **criteria):
+        async with self.sessions() as session:
+            return await load_employee(session, **criteria)
+
+    async def _employee_representation(self, request, **criteria):
+        """An employee in the fieldset given by fields / include, tagged like the Flask routes."""
+        fields, include_skills, error = parse_fieldset(request['args'])
+        if error:
+            return {'error': error}, 400, None
+        payload = await self._employee(include_skills=include_skills, **criteria)
+        if payload is None:
+            return {'error': 'Employee not found'}, 404, None
+        etag = f'{fieldset_tag(fields, include_skills)}-{payload["id"]}-v{payload["version"]}'
+        return {'employee': project_payload(payload, fields, include_skills)}, 200, etag
+
+    async def get_employee_by_id(self, request):
+        return await self._employee_representation(request, employee_id=int(request['employee_id']))
+
+    async def get_employee_by_email(self, request):
+        return await self._employee_representation(request, email=request['email'])
+
+    async def get_employee_skills(self, request):
+        payload = await self._employee(employee_id=int(request['employee_id']))
+        if payload is None:
+            return {'error': 'Employee not found'}, 404, None
+        return {'skills': payload['skills']}, 200, f'skills-{payload["id"]}-v{payload["version"]}'
+
+    async def liveness(self, request):
+        return {'status': 'alive'}, 200, None
+
+
+def if_none_match(headers):
+    """The entity tags listed in If-None-Match, unquoted (weak prefixes dropped)."""
+    value = headers.get('if-none-match', '')
+    return {tag.strip().removeprefix('W/').strip('"') for tag in value.split(',') if tag.strip()}
+
+
+def create_asgi_app(config=None):
+    """Create the async read API for a config name, sharing the Flask app's settings and models."""
+    flask_app = create_app(config)
+    return ReadAPI(flask_app, create_async_engine_for(flask_app))
@@ -0,0 +1,33 @@
+import time
+from contextlib import contextmanager
+
+# When the app package was first imported, i.e. roughly when the worker started loading the app
+IMPORTED_AT = time.perf_counter()
+
+
+class BootTimer:
+    """Wall time of each create_app phase, so cold boot time can be reported."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = {}
+        self.boot_ms = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def finish(self):
+        self.boot_ms = round((time.perf_counter() - self.started_at) * 1000, 2)
+        return self
+
+    def stats(self):
+        return {
+            'boot_ms': self.boot_ms,
+            'import_ms': round((self.started_at - IMPORTED_AT) * 1000, 2),
+            'phases': self.phases,
+        }
@@ -0,0 +1,261 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL.
+
+    Values are stored as-is, so callers must treat them as read-only.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value for ttl seconds (default: the cache TTL)."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    # Bytes need no encoding in process
+    get_bytes = get
+    set_bytes = set
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LocalClient:
+    """In-process stand-in for a Redis client (get / set with ex / delete).
+
+    Lets the shared backend run in development and tests without a server.
+    Expiry times live in the LRU entries, so evicted and expired keys leave
+    nothing behind.
+    """
+
+    def __init__(self, maxsize=100000):
+        self._cache = LRUCache(maxsize=maxsize, ttl=float('inf'))
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ex=None):
+        self._cache.set(key, value, ttl=ex or None)
+
+    def delete(self, *keys):
+        self._cache.delete(*keys)
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class SharedCache:
+    """Cache backend stored in a shared server (Redis), visible to every worker.
+
+    Values are JSON encoded, except through get_bytes / set_bytes; keys are
+    namespaced with a prefix.
+    """
+
+    def __init__(self, client, ttl=300, prefix='userapi:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def get_bytes(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set_bytes(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+
+class NullCache:
+    """Backend that stores nothing, used to switch caching off."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    get_bytes = get
+    set_bytes = set
+
+    def delete(self, *keys):
+        pass
+
+
+def create_backend(config):
+    """Build the cache backend selected by CACHE_BACKEND.
+
+    memory: per-process LRU (default); redis: shared Redis at CACHE_REDIS_URL;
+    local: the shared backend over an in-process stand-in client; null: off.
+    """
+    backend = config.get('CACHE_BACKEND', 'memory')
+    ttl = config.get('CACHE_TTL', 60)
+    if backend == 'memory':
+        return LRUCache(maxsize=config.get('CACHE_MAXSIZE', 1024), ttl=ttl)
+    if backend == 'redis':
+        import redis
+        return SharedCache(redis.Redis.from_url(config['CACHE_REDIS_URL']), ttl=ttl)
+    if backend == 'local':
+        return SharedCache(LocalClient(), ttl=ttl)
+    if backend == 'null':
+        return NullCache()
+    raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+
+class EmployeeCache:
+    """Read-through cache of serialized employees (Employee.to_dict payloads).
+
+    The payload is stored under the employee id; the email key only maps to
+    the id, so invalidating an employee is a single delete of its id key.
+
+    Encoded response bodies are kept next to the payloads, keyed by ETag and
+    content-coding. ETags carry the employee id, which is never reused (see
+    migration 8), and its version, so neither a change nor a delete needs to
+    remove them: stale bodies are no longer asked for and expire.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.body_hits = 0
+
+    @staticmethod
+    def _id_key(employee_id):
+        return f'employee:id:{employee_id}'
+
+    @staticmethod
+    def _email_key(email):
+        return f'employee:email:{email}'
+
+    @staticmethod
+    def _body_key(etag, encoding):
+        return f'employee:body:{etag}:{encoding}'
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _store(self, payload):
+        self.backend.set(self._id_key(payload['id']), payload)
+        self.backend.set(self._email_key(payload['email']), payload['id'])
+
+    def get_by_id(self, employee_id, loader):
+        """Return the cached payload for an id, calling loader() on a miss.
+
+        loader returns the payload or None when the employee does not exist.
+        """
+        payload = self.backend.get(self._id_key(employee_id))
+        if payload is not None:
+            self._count('hits')
+            return payload
+        
+        self._count('misses')
+        payload = loader()
+        if payload is not None:
+            self._store(payload)
+        return payload
+
+    def get_by_email(self, email, loader):
+        """Return the cached payload for an email, calling loader() on a miss."""
+        employee_id = self.backend.get(self._email_key(email))
+        if employee_id is not None:
+            payload = self.backend.get(self._id_key(employee_id))
+            if payload is not None and payload['email'] == email:
+                self._count('hits')
+                return payload
+        
+        self._count('misses')
+        payload = loader()
+        if payload is not None:
+            self._store(payload)
+        return payload
+
+    def peek(self, employee_id=None, email=None):
+        """Return a cached payload by id or email without loading or counting a lookup."""
+        if employee_id is None:
+            employee_id = self.backend.get(self._email_key(email))
+            if employee_id is None:
+                return None
+        payload = self.backend.get(self._id_key(employee_id))
+        if payload is not None and email is not None and payload['email'] != email:
+            return None
+        return payload
+
+    def get_body(self, etag, encoding):
+        """Return the stored response body for an ETag in a content-coding, or None."""
+        body = self.backend.get_bytes(self._body_key(etag, encoding))
+        if body is not None:
+            self._count('body_hits')
+        return body
+
+    def set_body(self, etag, encoding, body):
+        self.backend.set_bytes(self._body_key(etag, encoding), body)
+
+    def invalidate(self, employee_id):
+        """Drop an employee after any change to it or its skills."""
+        self.backend.delete(self._id_key(employee_id))
+        self._count('invalidations')
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        stats = {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'body_hits': self.body_hits,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+        }
+        if hasattr(self.backend, '__len__'):
+            stats['entries'] = len(self.backend)
+        return stats
+
+
+def get_employee_cache():
+    return current_app.extensions['employee_cache']
@@ -0,0 +1,58 @@
+import click
+from flask.cli import AppGroup
+
+from app.db.db import db
+from app.db.migrations import upgrade, current_version, latest_version, MIGRATIONS
+from app.security.hashing import calibrate_rounds
+from app.modules.analytics.aggregates import rebuild_skill_stats, rebuild_employee_counts
+
+
+@click.command('calibrate-bcrypt')
+@click.option('--target-ms', default=250.0, show_default=True,
+              help='Acceptable time for one password hash, in milliseconds.')
+@click.option('--min-rounds', default=4, show_default=True)
+@click.option('--max-rounds', default=16, show_default=True)
+@click.option('--samples', default=3, show_default=True, help='Hashes measured per cost.')
+def calibrate_bcrypt(target_ms, min_rounds, max_rounds, samples):
+    """Measure bcrypt on this host and recommend BCRYPT_LOG_ROUNDS."""
+    recommended, measurements = calibrate_rounds(target_ms, min_rounds, max_rounds, samples)
+    for rounds, elapsed_ms in measurements:
+        click.echo(f'rounds={rounds:<3} {elapsed_ms:9.1f} ms')
+    click.echo(f'Recommended BCRYPT_LOG_ROUNDS={recommended} (target {target_ms:g} ms per hash)')
+
+
+@click.command('rebuild-skill-stats')
+def rebuild_skill_stats_command():
+    """Recompute the skill analytics summary from the skills table."""
+    rows = rebuild_skill_stats()
+    click.echo(f'Rebuilt skill_level_stats: {rows} rows')
+
+
+@click.command('rebuild-employee-counts')
+def rebuild_employee_counts_command():
+    """Recompute the per department and per position employee counters."""
+    rows = rebuild_employee_counts()
+    click.echo(f'Rebuilt employee_counts: {rows} rows')
+
+
+db_cli = AppGroup('db', help='Schema migrations.')
+
+
+@db_cli.command('upgrade')
+@click.option('--to', 'target', type=int, default=None, help='Stop at this version instead of the latest.')
+def db_upgrade_command(target):
+    """Apply the pending schema migrations."""
+    for version, description in upgrade(db.engine, target):
+        click.echo(f'Applied {version:04d} {description}')
+    with db.engine.connect() as connection:
+        click.echo(f'Schema at version {current_version(connection)} (latest {latest_version()})')
+
+
+@db_cli.command('status')
+def db_status_command():
+    """List the migrations and whether each one is applied."""
+    with db.engine.connect() as connection:
+        version = current_version(connection)
+    for migration_version, description, _ in MIGRATIONS:
+        state = 'applied' if migration_version <= version else 'pending'
+        click.echo(f'{migration_version:04d} {state:<8} {description}')
@@ -0,0 +1,174 @@
+import gzip
+import threading
+
+from flask import current_app, g, request
+
+try:
+    import brotli
+except ImportError:  # optional, 'br' is simply not offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, 'zstd' is simply not offered
+    zstandard = None
+
+
+# Content-codings the compressor knows, in server preference order
+ENCODINGS = ('zstd', 'br', 'gzip')
+
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'application/json', 'application/x-ndjson', 'text/plain', 'text/html', 'text/csv',
+})
+
+
+def available_codecs(config):
+    """Compression functions by content-coding, for the COMPRESSION_ENCODINGS that are installed.
+
+    The order of COMPRESSION_ENCODINGS breaks ties between encodings the
+    client accepts with the same quality.
+    """
+    gzip_level = config.get('COMPRESSION_GZIP_LEVEL', 6)
+    brotli_level = config.get('COMPRESSION_BROTLI_LEVEL', 5)
+    zstd_level = config.get('COMPRESSION_ZSTD_LEVEL', 3)
+    codecs = {'gzip': lambda data: gzip.compress(data, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        codecs['br'] = lambda data: brotli.compress(data, quality=brotli_level)
+    if zstandard is not None:
+        # ZstdCompressor instances must not be shared between threads
+        codecs['zstd'] = lambda data: zstandard.ZstdCompressor(level=zstd_level).compress(data)
+
+    enabled = [name.strip() for name in config.get('COMPRESSION_ENCODINGS', ','.join(ENCODINGS)).split(',')]
+    return {name: codecs[name] for name in enabled if name in codecs}
+
+
+def encoded_etag(etag, encoding):
+    """ETag of the representation of etag encoded with a content-coding."""
+    return f'{etag}-{encoding}'
+
+
+def etag_variants(etag):
+    """The ETag and every encoded variant of it, to match If-None-Match against."""
+    return [etag] + [encoded_etag(etag, encoding) for encoding in ENCODINGS]
+
+
+class ResponseCompressor:
+    """Compresses responses in the encoding negotiated from Accept-Encoding.
+
+    Runs as an after_request hook. Only successful responses of a
+    compressible type that are at least min_size bytes are compressed;
+    streamed responses and ones already carrying a Content-Encoding are
+    left alone. A strong ETag gets the encoding appended so each encoded
+    variant has its own validator.
+
+    Views can hand it a body store (get_body / set_body by key and encoding)
+    with serve_stored / remember, so hot responses are sent from stored
+    encoded bytes instead of being serialized and compressed again.
+    """
+
+    def __init__(self, codecs, min_size=1024, mimetypes=COMPRESSIBLE_MIMETYPES):
+        self.codecs = codecs
+        self.min_size = min_size
+        self.mimetypes = mimetypes
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.stored_hits = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(available_codecs(config), min_size=config.get('COMPRESSION_MIN_SIZE', 1024))
+
+    def negotiate(self, accept_encodings):
+        """The accepted encoding with the highest quality, or None for identity."""
+        best, best_quality = None, 0
+        for encoding in self.codecs:
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compressible(self, response):
+        return (
+            200 <= response.status_code < 300 and response.status_code not in (204, 206)
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and 'Content-Encoding' not in response.headers
+            and response.mimetype in self.mimetypes
+            and 'no-transform' not in response.headers.get('Cache-Control', '')
+        )
+
+    @staticmethod
+    def _set_encoding(response, encoding):
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(encoded_etag(etag, encoding))
+
+    def after_request(self, response):
+        if not self.compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        data = response.get_data()
+        encoding = self.negotiate(request.accept_encodings) if len(data) >= self.min_size else None
+        if encoding is not None:
+            body = self.codecs[encoding](data)
+            response.set_data(body)
+            self._set_encoding(response, encoding)
+            with self._lock:
+                self.compressed += 1
+                self.bytes_in += len(data)
+                self.bytes_out += len(body)
+
+        pending = g.pop('compression_store', None)
+        if pending is not None:
+            store, key = pending
+            store.set_body(key, encoding or 'identity', response.get_data())
+        return response
+
+    def remember(self, store, key):
+        """Have this request's final body saved in store under key and its encoding."""
+        g.compression_store = (store, key)
+
+    def serve_stored(self, store, key, mimetype):
+        """Build a response from a stored body for key, or return None.
+
+        A body stored in the negotiated encoding is sent as is. Otherwise a
+        stored identity body is sent through the normal compression path
+        (and the result stored), which still skips serialization.
+        """
+        negotiated = encoding = self.negotiate(request.accept_encodings)
+        body = store.get_body(key, negotiated) if negotiated else None
+        if body is None:
+            body = store.get_body(key, 'identity')
+            if body is None:
+                return None
+            encoding = None
+            if negotiated and len(body) >= self.min_size:
+                self.remember(store, key)
+
+        response = current_app.response_class(body, mimetype=mimetype)
+        response.set_etag(key)
+        if encoding is not None:
+            self._set_encoding(response, encoding)
+            response.vary.add('Accept-Encoding')
+        with self._lock:
+            self.stored_hits += 1
+        return response
+
+    def stats(self):
+        return {
+            'encodings': list(self.codecs),
+            'min_size': self.min_size,
+            'compressed': self.compressed,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            'stored_hits': self.stored_hits,
+        }
+
+
+def get_compressor():
+    return current_app.extensions['compression']
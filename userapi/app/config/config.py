@@ -6,30 +6,120 @@ class BaseConfig:
     TESTING = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.environ.get('SECRET_KEY', 'secret-key')
+    # bcrypt cost factor; stored hashes with another cost are rehashed at login.
+    # Use `flask calibrate-bcrypt` to pick a value for the host.
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    # Lifetime in seconds of the signed tokens issued at login
+    ACCESS_TOKEN_TTL = int(os.environ.get('ACCESS_TOKEN_TTL', 15 * 60))
+    REFRESH_TOKEN_TTL = int(os.environ.get('REFRESH_TOKEN_TTL', 7 * 24 * 60 * 60))
+    # Keyset pagination for GET /employees
+    EMPLOYEES_PAGE_SIZE = int(os.environ.get('EMPLOYEES_PAGE_SIZE', 100))
+    EMPLOYEES_MAX_PAGE_SIZE = int(os.environ.get('EMPLOYEES_MAX_PAGE_SIZE', 1000))
+    # Rows fetched per round-trip by the NDJSON export
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    # Bulk import (POST /employees/bulk)
+    BULK_IMPORT_MAX_ROWS = int(os.environ.get('BULK_IMPORT_MAX_ROWS', 50000))
+    # Most hashing pool workers one import may take at once (default: all of them)
+    BULK_IMPORT_HASH_WORKERS = int(os.environ.get('BULK_IMPORT_HASH_WORKERS', 0)) or None
+    # bcrypt worker pool used by login and sign-up: 'process', 'thread' or 'inline'
+    HASHING_EXECUTOR = os.environ.get('HASHING_EXECUTOR', 'process')
+    HASHING_WORKERS = int(os.environ.get('HASHING_WORKERS', 0)) or None
+    HASHING_QUEUE_SIZE = int(os.environ.get('HASHING_QUEUE_SIZE', 64))
+    # Employee lookup cache: 'memory' (per process), 'redis' (shared), 'local' or 'null'.
+    # With several workers and the memory backend, other workers may serve a
+    # changed employee for up to CACHE_TTL seconds; use redis to avoid that.
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 60))
+    CACHE_MAXSIZE = int(os.environ.get('CACHE_MAXSIZE', 1024))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # Database connection pool, per worker process: keep
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below the server's max_connections.
+    # Sizing and the statement timeout (ms, 0 = none) apply to PostgreSQL only.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    # Check connections before use and replace them after DB_POOL_RECYCLE seconds
+    # (-1 = never), so connections to a failed-over primary are not handed out
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    # Behind PgBouncer in transaction mode: no app-side pool, per-transaction timeout
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'false').lower() == 'true'
+    # Seconds a starting worker waits for the database (exponential backoff) before failing
+    DB_STARTUP_TIMEOUT = float(os.environ.get('DB_STARTUP_TIMEOUT', 60))
+    # Run `flask db upgrade` at startup; off outside local development, where
+    # migrations run once per deploy instead of once per worker
+    DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', 'false').lower() == 'true'
+    # API docs: 'dynamic' (flasgger parses the route docstrings in each worker),
+    # 'static' (serve the file written by `python -m app.openapi.build`) or 'off'.
+    # SWAGGER_UI also mounts the /apidocs/ page (and imports flasgger).
+    SWAGGER_MODE = os.environ.get('SWAGGER_MODE', 'dynamic')
+    SWAGGER_UI = os.environ.get('SWAGGER_UI', 'true').lower() == 'true'
+    SWAGGER_SPEC_FILE = os.environ.get(
+        'SWAGGER_SPEC_FILE',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'openapi', 'openapi.json')
+    )
+    # JSON encoder for responses: 'orjson', 'default' (stdlib) or an import path
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+    # Response compression negotiated from Accept-Encoding, in preference order.
+    # zstd and br are offered only when zstandard / brotli are installed; empty disables it.
+    COMPRESSION_ENCODINGS = os.environ.get('COMPRESSION_ENCODINGS', 'zstd,br,gzip')
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_LEVEL = int(os.environ.get('COMPRESSION_BROTLI_LEVEL', 5))
+    COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+    # Per-route latency, SQL and bcrypt histograms served at /internal/metrics,
+    # and a Server-Timing header (app, db, bcrypt) on every response
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() == 'true'
+    # /internal/stats and /internal/metrics expose pool, cache and latency internals:
+    # with INTERNAL_TOKEN set callers send `Authorization: Bearer <token>`, without
+    # it only loopback clients are served. /internal/health/* stays open.
+    INTERNAL_TOKEN = os.environ.get('INTERNAL_TOKEN', '')
+    # Check each request against its route's @query_budget and for repeated
+    # statements (N+1): 'raise', 'warn' or '' (off)
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', '')
 
 class DevelopmentConfig(BaseConfig):
     """Development configuration."""
     DEBUG = True
     # Use SQLite for local development
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///development.db')
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 10))
+    DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', 'true').lower() == 'true'
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', 'warn')
 
 class TestingConfig(BaseConfig):
     """Testing configuration."""
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///testing.db')
+    HASHING_EXECUTOR = 'thread'
+    # Cheapest cost bcrypt allows, keeps the suite fast
+    BCRYPT_LOG_ROUNDS = 4
+    # Over-budget and N+1 requests fail the test that made them
+    QUERY_BUDGET_MODE = 'raise'
 
 class ProductionConfig(BaseConfig):
     """Production configuration."""
     DEBUG = False
     # Use PostgreSQL for production (Docker)
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'postgresql://user:password@db:5432/employees')
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    SWAGGER_MODE = os.environ.get('SWAGGER_MODE', 'static')
+    SWAGGER_UI = os.environ.get('SWAGGER_UI', 'false').lower() == 'true'
 
 class DockerConfig(BaseConfig):
     """Docker configuration."""
     DEBUG = True
     # Use PostgreSQL for Docker environment
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'postgresql://user:password@db:5432/employees')
+    # The image ships the spec built by the Dockerfile
+    SWAGGER_MODE = os.environ.get('SWAGGER_MODE', 'static')
 
 
 def get_config_by_name(config_name):
@@ -1,9 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase, relationship
-from sqlalchemy import Column, Integer, String, ForeignKey, CheckConstraint
+from sqlalchemy.orm import DeclarativeBase, relationship, validates
+from sqlalchemy import Column, Integer, String, ForeignKey, CheckConstraint, Index, UniqueConstraint, event, func, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.hybrid import hybrid_property
-from flask_bcrypt import Bcrypt
+from app.security.hashing import generate_password_hash, check_password_hash, password_needs_rehash
 import re
+import sqlite3
 
 
 class Base(DeclarativeBase):
@@ -11,7 +14,20 @@ class Base(DeclarativeBase):
 
 
 db = SQLAlchemy(model_class=Base)
-bcrypt = Bcrypt()
+
+
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only enforces foreign keys (and ON DELETE CASCADE) when asked to, per connection."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
+def normalize_email(email):
+    """Stored form of an email address: trimmed and lowercased."""
+    return email.strip().lower()
 
 
 class Employee(db.Model):
@@ -20,17 +36,40 @@ class Employee(db.Model):
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     position = Column(String(100), nullable=False)
-    email = Column(String(120), nullable=False, unique=True)
+    # Stored normalized; uniqueness is enforced on lower(email) by uq_employees_email_lower
+    email = Column(String(120), nullable=False)
     department = Column(String(100), nullable=False)
     password_hash = Column(String(255), nullable=False)
     seed = Column(String(7), nullable=False)
+    # Bumped on every change to the employee or its skills; drives the ETags
+    version = Column(Integer, nullable=False, default=1, server_default='1')
     
-    skills = relationship('Skill', back_populates='employee', cascade='all, delete-orphan')
+    # Skills are removed by ON DELETE CASCADE in the database, never loaded just to be deleted
+    skills = relationship('Skill', back_populates='employee', cascade='all, delete-orphan', passive_deletes=True)
+    
+    # Columns exposed by the API, in payload order
+    SERIALIZED_FIELDS = ('id', 'name', 'position', 'email', 'department', 'seed', 'version')
     
     __table_args__ = (
         CheckConstraint('length(seed) = 7', name='check_seed_length'),
+        # Filtered listings: equality on the column, then the id keyset order
+        Index('ix_employees_department_id', 'department', 'id'),
+        Index('ix_employees_position_id', 'position', 'id'),
+        # Email lookups compare lower(email), so any casing is one probe of this index
+        Index('uq_employees_email_lower', func.lower(email), unique=True),
+        # Ids appear in ETags and stored response bodies, so SQLite must never reuse one
+        {'sqlite_autoincrement': True},
     )
     
+    @validates('email')
+    def validate_email(self, key, email):
+        return normalize_email(email) if isinstance(email, str) else email
+    
+    @classmethod
+    def email_matches(cls, email):
+        """Case-insensitive email criterion, answered by uq_employees_email_lower"""
+        return func.lower(cls.email) == normalize_email(email)
+    
     @hybrid_property
     def is_valid_email(self):
         """Validate email format"""
@@ -38,24 +77,35 @@ class Employee(db.Model):
         return re.match(email_pattern, self.email) is not None
     
     def set_password(self, password):
-        """Hash and set the user's password"""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Hash and set the user's password (runs on the hashing pool)"""
+        self.password_hash = generate_password_hash(password)
     
     def check_password(self, password):
-        """Verify the provided password against the stored hash"""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        """Verify the provided password against the stored hash (runs on the hashing pool)"""
+        return check_password_hash(self.password_hash, password)
     
-    def to_dict(self):
-        """Convert employee object to dictionary for JSON serialization."""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'position': self.position,
-            'email': self.email,
-            'department': self.department,
-            'seed': self.seed,
-            'skills': [skill.to_dict() for skill in self.skills]
-        }
+    def password_needs_rehash(self):
+        """Whether the stored hash uses a different bcrypt cost than configured"""
+        return password_needs_rehash(self.password_hash)
+    
+    @classmethod
+    def bump_version(cls, employee_id):
+        """Increment an employee's version in the current transaction"""
+        db.session.execute(
+            update(cls.__table__).where(cls.id == employee_id).values(version=cls.version + 1)
+        )
+    
+    def to_dict(self, fields=None, include_skills=True):
+        """Convert employee object to dictionary for JSON serialization.
+
+        Args:
+            fields: Columns to include, defaults to SERIALIZED_FIELDS.
+            include_skills: Whether to embed the skills (loads them if needed).
+        """
+        data = {field: getattr(self, field) for field in fields or self.SERIALIZED_FIELDS}
+        if include_skills:
+            data['skills'] = [skill.to_dict() for skill in self.skills]
+        return data
     
     def __repr__(self):
         return f'<Employee {self.name} - {self.position}>'
@@ -67,12 +117,17 @@ class Skill(db.Model):
     id = Column(Integer, primary_key=True)
     skill_name = Column(String(100), nullable=False)
     skill_level = Column(Integer, nullable=False)
-    employee_id = Column(Integer, ForeignKey('employees.id'), nullable=False)
+    employee_id = Column(Integer, ForeignKey('employees.id', ondelete='CASCADE'), nullable=False)
     
     employee = relationship('Employee', back_populates='skills')
     
     __table_args__ = (
         CheckConstraint('skill_level >= 0 AND skill_level <= 100', name='check_skill_level_range'),
+        # One row per skill name per employee; the ON CONFLICT target of skill upserts.
+        # Its leading employee_id column also serves lookups of an employee's skills.
+        UniqueConstraint('employee_id', 'skill_name', name='uq_skills_employee_skill'),
+        # Covers skill search: range scan on (name, level) yielding employee ids without a table lookup
+        Index('ix_skills_name_level_employee', 'skill_name', 'skill_level', 'employee_id'),
     )
     
     def to_dict(self):
@@ -88,6 +143,47 @@ class Skill(db.Model):
         return f'<Skill {self.skill_name}: {self.skill_level}/100>'
 
 
+class SkillLevelStat(db.Model):
+    """Number of skills per (department, skill_name, skill_level).
+
+    A summary of the skills table kept up to date by the skill write paths,
+    so the analytics endpoint never has to scan skills.
+    """
+    __tablename__ = 'skill_level_stats'
+    
+    department = Column(String(100), primary_key=True)
+    skill_name = Column(String(100), primary_key=True)
+    skill_level = Column(Integer, primary_key=True)
+    skill_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<SkillLevelStat {self.department}/{self.skill_name}@{self.skill_level}: {self.skill_count}>'
+
+
+class EmployeeCount(db.Model):
+    """Number of employees per department and per position.
+
+    Kept up to date by the employee write paths, like SkillLevelStat, so the
+    unfiltered counts endpoint reads a handful of rows.
+    """
+    __tablename__ = 'employee_counts'
+    
+    # 'department' or 'position'
+    dimension = Column(String(20), primary_key=True)
+    value = Column(String(100), primary_key=True)
+    employee_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<EmployeeCount {self.dimension}={self.value}: {self.employee_count}>'
+
+
+def dialect_insert(table):
+    """INSERT construct for the bound database, giving access to ON CONFLICT (SQLite or PostgreSQL)."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
 def create_tables():
     db.create_all()
 
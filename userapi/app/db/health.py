@@ -0,0 +1,41 @@
+import random
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+
+def ping_database(engine):
+    """Run SELECT 1 on a pooled connection; raises if the database cannot be reached."""
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+
+
+def wait_for_database(engine, timeout=60.0, initial_delay=0.1, max_delay=5.0, logger=None):
+    """Block until the database answers, retrying with exponential backoff.
+
+    The delay doubles after each failed attempt up to max_delay, with jitter
+    so workers started together do not retry in lockstep.
+
+    Returns:
+        The number of attempts it took.
+
+    Raises:
+        The last connection error once timeout seconds have passed.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            ping_database(engine)
+            return attempt
+        except DBAPIError as e:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise
+            if logger is not None:
+                logger.warning('Database not reachable (attempt %d): %s', attempt, e.orig)
+            time.sleep(min(delay / 2 + random.uniform(0, delay / 2), remaining))
+            delay = min(delay * 2, max_delay)
@@ -0,0 +1,303 @@
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, DateTime, ForeignKey, CheckConstraint,
+    func, inspect, insert, select, text,
+)
+from app.db.db import db, Employee, EmployeeCount, Skill, SkillLevelStat
+from app.modules.analytics.aggregates import fill_employee_counts, fill_skill_stats
+
+
+# Applied versions; `flask db upgrade` runs every registered migration above the highest one
+schema_migrations = Table(
+    'schema_migrations', db.metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False, server_default=func.now()),
+)
+
+# Key of the PostgreSQL advisory lock held while migrating
+MIGRATION_LOCK_ID = 7314001
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register a function taking a connection as the migration to a schema version.
+
+    Migrations check the schema before changing it, so they also bring
+    databases created by the old create_all-on-boot up to date.
+    """
+    def register(upgrade_fn):
+        MIGRATIONS.append((version, description, upgrade_fn))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return upgrade_fn
+    return register
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def current_version(connection):
+    """Highest applied migration, 0 for a database that was never migrated."""
+    if not inspect(connection).has_table(schema_migrations.name):
+        return 0
+    return connection.scalar(select(func.max(schema_migrations.c.version))) or 0
+
+
+def upgrade(engine, target=None):
+    """Apply the pending migrations up to target (default: all), each in its own transaction.
+
+    On SQLite foreign keys are switched off around each migration, as SQLite
+    requires for rebuilding a table that others reference, and checked
+    before the migration commits.
+
+    Returns:
+        The (version, description) pairs applied.
+    """
+    applied = []
+    with engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            # Serialize concurrent upgrades (e.g. several containers starting)
+            connection.execute(text('SELECT pg_advisory_lock(:id)'), {'id': MIGRATION_LOCK_ID})
+            connection.commit()
+        try:
+            schema_migrations.create(connection, checkfirst=True)
+            connection.commit()
+            version = current_version(connection)
+            connection.commit()
+            for migration_version, description, upgrade_fn in MIGRATIONS:
+                if migration_version <= version or (target is not None and migration_version > target):
+                    continue
+                sqlite = connection.dialect.name == 'sqlite'
+                if sqlite:
+                    # Only takes effect outside a transaction
+                    connection.exec_driver_sql('PRAGMA foreign_keys = OFF')
+                    connection.commit()
+                try:
+                    with connection.begin():
+                        upgrade_fn(connection)
+                        if sqlite and connection.exec_driver_sql('PRAGMA foreign_key_check').first():
+                            raise RuntimeError(f'Migration {migration_version} left broken foreign keys')
+                        connection.execute(insert(schema_migrations).values(
+                            version=migration_version, description=description))
+                finally:
+                    if sqlite:
+                        connection.exec_driver_sql('PRAGMA foreign_keys = ON')
+                        connection.commit()
+                applied.append((migration_version, description))
+        finally:
+            if connection.dialect.name == 'postgresql':
+                connection.execute(text('SELECT pg_advisory_unlock(:id)'), {'id': MIGRATION_LOCK_ID})
+                connection.commit()
+    return applied
+
+
+def column_names(connection, table_name):
+    return {column['name'] for column in inspect(connection).get_columns(table_name)}
+
+
+def create_missing_indexes(connection, table, names=None):
+    """Create the indexes declared on a model table (or those named) that the database lacks.
+
+    Uses IF NOT EXISTS rather than inspection, which does not report
+    expression indexes such as lower(email) on every dialect.
+    """
+    for index in table.indexes:
+        if names is None or index.name in names:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def rebuild_sqlite_table(connection, table):
+    """Recreate a SQLite table from its model definition, keeping its rows.
+
+    SQLite cannot add or change constraints on an existing table. Follows
+    SQLite's create, copy, drop, rename order so that references from other
+    tables keep pointing at the table name; the caller runs with foreign keys
+    off (see upgrade) and recreates any triggers, which the drop removes.
+    """
+    existing = column_names(connection, table.name)
+    columns = ', '.join(column.name for column in table.columns if column.name in existing)
+    # Free the index names for the new table, including expression indexes the inspector skips
+    for name in connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+    ), {'table': table.name}).scalars().all():
+        connection.execute(text(f'DROP INDEX "{name}"'))
+    # Copy every table so the foreign keys of the new one resolve
+    scratch = MetaData()
+    for model_table in db.metadata.sorted_tables:
+        model_table.to_metadata(scratch)
+    new_table = table.to_metadata(scratch, name=f'{table.name}_new')
+    new_table.create(connection)
+    connection.execute(text(f'INSERT INTO "{new_table.name}" ({columns}) SELECT {columns} FROM "{table.name}"'))
+    connection.execute(text(f'DROP TABLE "{table.name}"'))
+    connection.execute(text(f'ALTER TABLE "{new_table.name}" RENAME TO "{table.name}"'))
+
+
+# The employees and skills tables as the first release created them. Frozen:
+# every later change to the models goes into a migration of its own.
+BASELINE = MetaData()
+Table(
+    'employees', BASELINE,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('position', String(100), nullable=False),
+    Column('email', String(120), nullable=False, unique=True),
+    Column('department', String(100), nullable=False),
+    Column('password_hash', String(255), nullable=False),
+    Column('seed', String(7), nullable=False),
+    CheckConstraint('length(seed) = 7', name='check_seed_length'),
+)
+Table(
+    'skills', BASELINE,
+    Column('id', Integer, primary_key=True),
+    Column('skill_name', String(100), nullable=False),
+    Column('skill_level', Integer, nullable=False),
+    Column('employee_id', Integer, ForeignKey('employees.id'), nullable=False),
+    CheckConstraint('skill_level >= 0 AND skill_level <= 100', name='check_skill_level_range'),
+)
+
+
+@migration(1, 'Create tables')
+def create_tables(connection):
+    """Create the baseline employees and skills tables, unless create_all-on-boot already did."""
+    BASELINE.create_all(connection)
+
+
+@migration(2, 'Add employees.version')
+def add_employee_version(connection):
+    if 'version' not in column_names(connection, 'employees'):
+        connection.execute(text('ALTER TABLE employees ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
+
+
+@migration(3, 'Cascade skill deletes, unique skill per employee, skill search index')
+def constrain_skills(connection):
+    # Keep the oldest row of each duplicated (employee_id, skill_name)
+    connection.execute(text(
+        'DELETE FROM skills WHERE id NOT IN '
+        '(SELECT MIN(id) FROM skills GROUP BY employee_id, skill_name)'
+    ))
+    inspector = inspect(connection)
+    foreign_key = next(fk for fk in inspector.get_foreign_keys('skills') if fk['referred_table'] == 'employees')
+    cascades = (foreign_key.get('options') or {}).get('ondelete', '').upper() == 'CASCADE'
+    unique_names = {constraint['name'] for constraint in inspector.get_unique_constraints('skills')}
+
+    if connection.dialect.name == 'sqlite':
+        if not cascades or 'uq_skills_employee_skill' not in unique_names:
+            rebuild_sqlite_table(connection, Skill.__table__)
+    else:
+        if not cascades:
+            connection.execute(text(f'ALTER TABLE skills DROP CONSTRAINT "{foreign_key["name"]}"'))
+            connection.execute(text(
+                f'ALTER TABLE skills ADD CONSTRAINT "{foreign_key["name"]}" FOREIGN KEY (employee_id) '
+                'REFERENCES employees (id) ON DELETE CASCADE'
+            ))
+        if 'uq_skills_employee_skill' not in unique_names:
+            connection.execute(text(
+                'ALTER TABLE skills ADD CONSTRAINT uq_skills_employee_skill UNIQUE (employee_id, skill_name)'
+            ))
+    create_missing_indexes(connection, Skill.__table__)
+
+
+@migration(4, 'Fill the skill analytics summary')
+def fill_skill_level_stats(connection):
+    stats = SkillLevelStat.__table__
+    stats.create(connection, checkfirst=True)
+    if not connection.scalar(select(func.count()).select_from(stats)):
+        connection.execute(fill_skill_stats())
+
+
+# External content FTS5 index of employees, kept in sync by triggers so every
+# write path (ORM, Core bulk inserts, cascades) updates it
+SQLITE_EMPLOYEE_SEARCH = (
+    'DROP TABLE IF EXISTS employees_fts',
+    "CREATE VIRTUAL TABLE employees_fts USING fts5(name, position, department, content='employees', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    'DROP TRIGGER IF EXISTS employees_fts_insert',
+    'CREATE TRIGGER employees_fts_insert AFTER INSERT ON employees BEGIN '
+    'INSERT INTO employees_fts (rowid, name, position, department) '
+    'VALUES (new.id, new.name, new.position, new.department); END',
+    'DROP TRIGGER IF EXISTS employees_fts_delete',
+    'CREATE TRIGGER employees_fts_delete AFTER DELETE ON employees BEGIN '
+    "INSERT INTO employees_fts (employees_fts, rowid, name, position, department) "
+    "VALUES ('delete', old.id, old.name, old.position, old.department); END",
+    'DROP TRIGGER IF EXISTS employees_fts_update',
+    'CREATE TRIGGER employees_fts_update AFTER UPDATE OF name, position, department ON employees BEGIN '
+    "INSERT INTO employees_fts (employees_fts, rowid, name, position, department) "
+    "VALUES ('delete', old.id, old.name, old.position, old.department); "
+    'INSERT INTO employees_fts (rowid, name, position, department) '
+    'VALUES (new.id, new.name, new.position, new.department); END',
+    "INSERT INTO employees_fts (employees_fts) VALUES ('rebuild')",
+)
+
+
+@migration(5, 'Employee directory search index')
+def add_employee_search(connection):
+    """Trigram GIN index on PostgreSQL, FTS5 table on SQLite (when compiled in)."""
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        # Same expression as app.modules.employee.search.search_document
+        connection.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_employees_search_trgm ON employees '
+            "USING gin ((name || ' ' || position || ' ' || department) gin_trgm_ops)"
+        ))
+    elif connection.dialect.name == 'sqlite':
+        compile_options = set(connection.exec_driver_sql('PRAGMA compile_options').scalars())
+        if 'ENABLE_FTS5' in compile_options:
+            for statement in SQLITE_EMPLOYEE_SEARCH:
+                connection.exec_driver_sql(statement)
+
+
+@migration(6, 'Department and position indexes, employee counters')
+def add_employee_counts(connection):
+    create_missing_indexes(connection, Employee.__table__, ('ix_employees_department_id', 'ix_employees_position_id'))
+    counts = EmployeeCount.__table__
+    counts.create(connection, checkfirst=True)
+    if not connection.scalar(select(func.count()).select_from(counts)):
+        connection.execute(fill_employee_counts())
+
+
+@migration(7, 'Lowercase employee emails, unique lower(email) index')
+def add_email_lower_index(connection):
+    """Normalize stored emails and move their uniqueness onto lower(email).
+
+    Emails that differ only by case cannot be merged automatically, so the
+    migration stops and lists them instead.
+    """
+    duplicates = connection.execute(text(
+        'SELECT lower(trim(email)) FROM employees GROUP BY lower(trim(email)) HAVING count(*) > 1'
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(f'Emails used by several employees when case is ignored: {", ".join(duplicates)}')
+    connection.execute(text('UPDATE employees SET email = lower(trim(email)) WHERE email <> lower(trim(email))'))
+    create_missing_indexes(connection, Employee.__table__, ('uq_employees_email_lower',))
+    # The case-sensitive UNIQUE (email) is redundant now. On SQLite it goes with
+    # the rebuild of employees in migration 8
+    if connection.dialect.name != 'sqlite':
+        for constraint in inspect(connection).get_unique_constraints('employees'):
+            if constraint['column_names'] == ['email']:
+                connection.execute(text(f'ALTER TABLE employees DROP CONSTRAINT "{constraint["name"]}"'))
+
+
+@migration(8, 'Never reuse employee ids')
+def autoincrement_employee_ids(connection):
+    """Give the SQLite employees table AUTOINCREMENT.
+
+    Ids are part of the ETags and of the keys of stored response bodies, so
+    an id handed out again after a delete could serve the deleted employee.
+    PostgreSQL sequences never reuse a value; SQLite reuses the highest id
+    unless the table is AUTOINCREMENT, which only a rebuild can add.
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    schema = connection.scalar(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'employees'"))
+    if 'AUTOINCREMENT' in schema.upper():
+        return
+    has_search = connection.scalar(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'employees_fts'"
+    )) is not None
+    rebuild_sqlite_table(connection, Employee.__table__)
+    if has_search:
+        # The search triggers were dropped with the old table
+        for statement in SQLITE_EMPLOYEE_SEARCH:
+            connection.exec_driver_sql(statement)
@@ -0,0 +1,165 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports to PoolMetrics how long each checkout waited.
+
+    A checkout only waits when pool_size + max_overflow connections are
+    already in use, so the wait time shows how close the pool is to running out.
+    """
+
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # dispose() (e.g. after a failover) builds a new pool; keep reporting
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS built from the DB_* settings.
+
+    Pool sizing only applies to server databases; SQLite keeps the pool
+    Flask-SQLAlchemy picks for it. With DB_PGBOUNCER the application does no
+    pooling of its own (PgBouncer does) and the statement timeout is set per
+    transaction, since PgBouncer in transaction mode neither accepts startup
+    options nor keeps session settings for one client.
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = {
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', -1),
+    }
+    if url.get_backend_name() == 'sqlite':
+        return options
+
+    if config.get('DB_PGBOUNCER', False):
+        # A fresh connection per checkout: nothing stale to ping or recycle
+        return {'poolclass': NullPool}
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=config.get('DB_POOL_SIZE', 5),
+        max_overflow=config.get('DB_MAX_OVERFLOW', 10),
+        pool_timeout=config.get('DB_POOL_TIMEOUT', 30),
+    )
+    statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', 0)
+    if statement_timeout and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={int(statement_timeout)}'}
+    return options
+
+
+def set_transaction_statement_timeout(engine, timeout_ms):
+    """Apply statement_timeout with SET LOCAL at the start of every transaction (PgBouncer mode)."""
+    @event.listens_for(engine, 'begin')
+    def set_statement_timeout(connection):
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout_ms)}')
+
+
+class PoolMetrics:
+    """Connection pool counters for one engine, fed by pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self.pool = None
+
+    def attach(self, engine):
+        self.pool = engine.pool
+        if isinstance(engine.pool, TimedQueuePool):
+            engine.pool.metrics = self
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+        event.listen(engine, 'engine_disposed', self._on_disposed)
+        return self
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            if isinstance(self.pool, QueuePool):
+                self.peak_checked_out = max(self.peak_checked_out, self.pool.checkedout())
+                self.peak_overflow = max(self.peak_overflow, self.pool.overflow())
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def _on_disposed(self, engine):
+        self.pool = engine.pool
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def stats(self):
+        pool = self.pool
+        stats = {
+            'pool': type(pool).__name__,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'connects': self.connects,
+            'invalidations': self.invalidations,
+            'timeouts': self.timeouts,
+            'wait_ms': {
+                'total': round(self.wait_total * 1000, 3),
+                'avg': round(self.wait_total * 1000 / self.waits, 3) if self.waits else None,
+                'max': round(self.wait_max * 1000, 3),
+            },
+        }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+                'peak_checked_out': self.peak_checked_out,
+                'peak_overflow': max(self.peak_overflow, 0),
+            })
+        return stats
+
+
+def get_pool_metrics():
+    return current_app.extensions['db_pool_metrics']
@@ -1,45 +1,116 @@
 from flask import Flask
 from flask_cors import CORS
-from flasgger import Swagger
 from app.modules.main.route import main_bp
 from app.modules.employee.route import employee_bp
-from app.db.db import db, bcrypt
+from app.modules.internal.route import internal_bp
+from app.modules.analytics.route import analytics_bp
+from app.db.db import db
+from app.db.pool import PoolMetrics, engine_options, set_transaction_statement_timeout
+from app.db.health import wait_for_database
+from app.db.migrations import upgrade
+from app.security.hashing import HashingPool
+from app.commands import calibrate_bcrypt, rebuild_skill_stats_command, rebuild_employee_counts_command, db_cli
+from app.cache.cache import EmployeeCache, create_backend
+from app.serialization.json_provider import create_json_provider
+from app.compression.compression import ResponseCompressor
+from app.openapi.spec import StaticSpec
+from app.metrics.metrics import RequestMetrics, stats_collector
+from app.metrics.query_budget import QueryBudgetGuard
 
 
 def initialize_route(app: Flask):
     with app.app_context():
         app.register_blueprint(main_bp, url_prefix='/api/v1/main')
         app.register_blueprint(employee_bp, url_prefix='/api/v1')
+        app.register_blueprint(analytics_bp, url_prefix='/api/v1')
+        app.register_blueprint(internal_bp, url_prefix='/internal')
 
 
 def initialize_db(app: Flask):
+    # Pool settings from the DB_* config; explicit SQLALCHEMY_ENGINE_OPTIONS win
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
     with app.app_context():
         db.init_app(app)
-        bcrypt.init_app(app)
         
-        # Wait for database connection in Docker environment
-        import time
-        max_retries = 30
-        retry_count = 0
+        app.extensions['db_pool_metrics'] = PoolMetrics().attach(db.engine)
+        if app.config.get('DB_PGBOUNCER') and app.config.get('DB_STATEMENT_TIMEOUT_MS') \
+                and db.engine.dialect.name == 'postgresql':
+            set_transaction_statement_timeout(db.engine, app.config['DB_STATEMENT_TIMEOUT_MS'])
         
-        while retry_count < max_retries:
-            try:
-                # Try to create tables
-                db.create_all()
-                print("Database tables created successfully!")
-                break
-            except Exception as e:
-                retry_count += 1
-                print(f"Database connection attempt {retry_count}/{max_retries} failed: {e}")
-                if retry_count >= max_retries:
-                    print("Failed to connect to database after all retries")
-                    raise e
-                time.sleep(2)  # Wait 2 seconds before retrying
+        # Startup only checks connectivity; the schema is managed by `flask db upgrade`
+        wait_for_database(db.engine, timeout=app.config['DB_STARTUP_TIMEOUT'], logger=app.logger)
+        if app.config.get('DB_AUTO_MIGRATE'):
+            upgrade(db.engine)
+
+def initialize_hashing(app: Flask):
+    """Attach the bounded bcrypt worker pool used by login and sign-up"""
+    app.extensions['hashing'] = HashingPool.from_config(app.config)
+
+def initialize_cache(app: Flask):
+    """Attach the employee lookup cache selected by CACHE_BACKEND"""
+    app.extensions['employee_cache'] = EmployeeCache(create_backend(app.config))
+
+def initialize_compression(app: Flask):
+    """Compress responses according to the COMPRESSION_* settings"""
+    compressor = ResponseCompressor.from_config(app.config)
+    app.extensions['compression'] = compressor
+    app.after_request(compressor.after_request)
+
+def initialize_metrics(app: Flask):
+    """Time requests, SQL statements and bcrypt calls when METRICS_ENABLED is set"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+    metrics = RequestMetrics(server_timing=app.config.get('SERVER_TIMING', True))
+    with app.app_context():
+        metrics.init_app(app, db.engine, app.extensions['hashing'])
+    metrics.collectors.append(stats_collector(app))
+    app.extensions['metrics'] = metrics
+    return metrics
+
+def initialize_query_budget(app: Flask):
+    """Enforce the per-route query budgets according to QUERY_BUDGET_MODE"""
+    mode = app.config.get('QUERY_BUDGET_MODE', '')
+    if not mode:
+        return None
+    guard = QueryBudgetGuard(mode)
+    with app.app_context():
+        guard.init_app(app, db.engine, db.session)
+    app.extensions['query_budget'] = guard
+    return guard
+
+def initialize_json(app: Flask):
+    """Install the JSON provider selected by JSON_PROVIDER"""
+    app.json = create_json_provider(app)
+
+def initialize_commands(app: Flask):
+    """Register the maintenance commands with the flask CLI"""
+    app.cli.add_command(calibrate_bcrypt)
+    app.cli.add_command(rebuild_skill_stats_command)
+    app.cli.add_command(rebuild_employee_counts_command)
+    app.cli.add_command(db_cli)
 
 def initialize_swagger(app: Flask):
+    """Serve the API docs according to SWAGGER_MODE"""
+    mode = app.config.get('SWAGGER_MODE', 'dynamic')
+    if mode == 'off':
+        return None
+    
+    if mode == 'static':
+        spec = StaticSpec(app.config['SWAGGER_SPEC_FILE'])
+        if not app.config.get('SWAGGER_UI', True):
+            app.add_url_rule('/apispec_1.json', 'apispec', spec.view)
+            return None
+    
+    # flasgger is only imported when its views are mounted
+    from flasgger import Swagger
     with app.app_context():
         swagger = Swagger(app)
-        return swagger
+    if mode == 'static':
+        # The docs page keeps working, fed by the prebuilt file
+        app.view_functions['flasgger.apispec_1'] = spec.view
+    return swagger
 
 def initialize_cors(app: Flask):
     """Initialize CORS to allow all origins for development"""
@@ -0,0 +1,197 @@
+import bisect
+import math
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Prometheus histogram: per label set, a count per bucket plus sum and count.
+
+    observe() is a bisect and three additions under a lock, cheap enough for
+    every request and every SQL statement.
+    """
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for label_values, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = (('le', _number(bound)),)
+                lines.append(f'{self.name}_bucket{_labels(self.labels, label_values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labels, label_values)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labels, label_values)} {count}')
+        return lines
+
+
+def sample(name, metric_type, description, value):
+    """Lines for a single unlabelled sample (used for the stats-derived metrics)."""
+    return [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}', f'{name} {_number(value)}']
+
+
+class RequestTiming:
+    """What one request spent, collected while it runs."""
+
+    __slots__ = ('started', 'db_count', 'db_time', 'bcrypt_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.bcrypt_time = 0.0
+
+
+class RequestMetrics:
+    """Per-route latency, SQL and bcrypt instrumentation with a Prometheus text export.
+
+    before/after_request hooks time each request by route template; SQLAlchemy
+    cursor events time every statement; the hashing pool reports bcrypt
+    calls. Each response gets a Server-Timing header with its own totals.
+    Metrics are per process: with several workers, each one is scraped
+    (or aggregated) separately.
+    """
+
+    def __init__(self, server_timing=True):
+        self.server_timing = server_timing
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Request latency by route.', ('method', 'route', 'status'))
+        self.request_queries = Histogram(
+            'http_request_db_queries', 'SQL statements executed per request.', ('method', 'route'),
+            QUERY_COUNT_BUCKETS)
+        self.query_duration = Histogram(
+            'db_query_duration_seconds', 'SQL statement execution time.', (), QUERY_TIME_BUCKETS)
+        self.bcrypt_duration = Histogram(
+            'bcrypt_duration_seconds', 'bcrypt hash and verify time, queueing included.', ('operation',),
+            BCRYPT_BUCKETS)
+        # Callables returning extra exposition lines, read at scrape time
+        self.collectors = []
+
+    def init_app(self, app, engine, hashing_pool):
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+        hashing_pool.observers.append(self.observe_bcrypt)
+
+    def before_request(self):
+        g.request_timing = RequestTiming()
+
+    def after_request(self, response):
+        timing = g.pop('request_timing', None)
+        if timing is None:
+            return response
+        elapsed = time.perf_counter() - timing.started
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        self.request_duration.observe(elapsed, request.method, route, str(response.status_code))
+        self.request_queries.observe(timing.db_count, request.method, route)
+
+        if self.server_timing:
+            entries = [
+                f'app;dur={elapsed * 1000:.2f}',
+                f'db;dur={timing.db_time * 1000:.2f};desc="{timing.db_count} queries"',
+            ]
+            if timing.bcrypt_time:
+                entries.append(f'bcrypt;dur={timing.bcrypt_time * 1000:.2f}')
+            response.headers['Server-Timing'] = ', '.join(entries)
+        return response
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        self.query_duration.observe(elapsed)
+        if has_request_context():
+            timing = g.get('request_timing')
+            if timing is not None:
+                timing.db_count += 1
+                timing.db_time += elapsed
+
+    def observe_bcrypt(self, operation, elapsed):
+        self.bcrypt_duration.observe(elapsed, operation)
+        if has_request_context():
+            timing = g.get('request_timing')
+            if timing is not None:
+                timing.bcrypt_time += elapsed
+
+    def render(self):
+        lines = []
+        for histogram in (self.request_duration, self.request_queries, self.query_duration, self.bcrypt_duration):
+            lines.extend(histogram.render())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+def stats_collector(app):
+    """Expose the counters behind /internal/stats (pool, cache, hashing) as metrics."""
+    def collect():
+        extensions = app.extensions
+        pool = extensions['db_pool_metrics'].stats()
+        cache = extensions['employee_cache'].stats()
+        hashing = extensions['hashing'].stats()
+        return [
+            *sample('db_pool_checkouts_total', 'counter', 'Connections checked out of the pool.', pool['checkouts']),
+            *sample('db_pool_timeouts_total', 'counter', 'Checkouts that timed out.', pool['timeouts']),
+            *sample('db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection.',
+                    pool['wait_ms']['total'] / 1000),
+            *sample('db_pool_checked_out', 'gauge', 'Connections currently in use.', pool.get('checked_out', 0)),
+            *sample('db_pool_overflow', 'gauge', 'Overflow connections currently open.', pool.get('overflow', 0)),
+            *sample('employee_cache_hits_total', 'counter', 'Employee cache hits.', cache['hits']),
+            *sample('employee_cache_misses_total', 'counter', 'Employee cache misses.', cache['misses']),
+            *sample('bcrypt_in_flight', 'gauge', 'Password hashes running or queued.', hashing['in_flight']),
+            *sample('bcrypt_rejected_total', 'counter', 'Password hashes rejected as busy.', hashing['rejected']),
+        ]
+    return collect
+
+
+def get_request_metrics():
+    return current_app.extensions.get('metrics')
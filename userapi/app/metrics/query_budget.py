@@ -0,0 +1,175 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+
+# A statement shape repeated more often than this in one request is reported as N+1
+REPEAT_THRESHOLD = 3
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_PARAMETER_LISTS = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more SQL statements than its budget, or the same one in a loop."""
+
+
+def query_budget(max_queries):
+    """Declare the most SQL statements a view may run per request.
+
+    Put it right below the route decorator. The budget is checked by the
+    QueryBudgetGuard when QUERY_BUDGET_MODE is set.
+    """
+    def annotate(view):
+        view.query_budget = max_queries
+        return view
+    return annotate
+
+
+@contextmanager
+def batched_queries():
+    """Mark the statements run inside as chunks of one batched operation.
+
+    Work split into chunks (e.g. IN lists kept under the bind parameter
+    limits) runs a number of statements that grows with the request body,
+    not with a loop over rows. The guard counts each statement shape run
+    inside the block once, and not as a repeat.
+    """
+    if not has_request_context() or g.get('query_log') is None:
+        yield
+        return
+    depth = g.get('query_batch_depth', 0)
+    g.query_batch_depth = depth + 1
+    try:
+        yield
+    finally:
+        g.query_batch_depth = depth
+
+
+def statement_shape(statement):
+    """The statement with literals and IN lists collapsed, so loop iterations compare equal."""
+    shape = _LITERALS.sub('?', statement)
+    shape = _PARAMETER_LISTS.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def repeated_shapes(statements, threshold=REPEAT_THRESHOLD):
+    """Shapes run more than threshold times, with their counts."""
+    counts = Counter(statement_shape(statement) for statement in statements)
+    return {shape: count for shape, count in counts.items() if count > threshold}
+
+
+def budget_problems(statements, max_queries=None, threshold=REPEAT_THRESHOLD):
+    """Describe what is wrong with a list of statements; empty when within budget."""
+    problems = []
+    if max_queries is not None and len(statements) > max_queries:
+        problems.append(f'{len(statements)} queries, budget {max_queries}')
+    for shape, count in repeated_shapes(statements, threshold).items():
+        problems.append(f'same statement {count} times (N+1?): {shape[:200]}')
+    return problems
+
+
+class QueryCounter:
+    """Collect the statements an engine runs inside a with block.
+
+    Example:
+        with QueryCounter(db.engine) as queries:
+            client.get('/api/v1/employees')
+        queries.check(max_queries=2)
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.parameters = []
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def check(self, max_queries=None, threshold=REPEAT_THRESHOLD):
+        problems = budget_problems(self.statements, max_queries, threshold)
+        if problems:
+            raise QueryBudgetExceeded('; '.join(problems))
+
+
+class QueryBudgetGuard:
+    """Check every request against its view's query budget and for repeated statements.
+
+    mode 'raise' fails the request (the test suite), 'warn' logs a warning
+    (development). In 'raise' mode the check also runs before every commit,
+    so an over-budget request fails before its changes are stored.
+    Statements run after the response is returned, such as a streamed body,
+    are not counted.
+    """
+
+    def __init__(self, mode, threshold=REPEAT_THRESHOLD):
+        self.mode = mode
+        self.threshold = threshold
+
+    def init_app(self, app, engine, session):
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        # Session events are per session class, shared by every app: listen once
+        if not event.contains(session, 'before_commit', check_before_commit):
+            event.listen(session, 'before_commit', check_before_commit)
+
+    def before_request(self):
+        g.query_log = []
+        g.batched_shapes = set()
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            statements = g.get('query_log')
+            if statements is None:
+                return
+            if g.get('query_batch_depth'):
+                shape = statement_shape(statement)
+                if shape in g.batched_shapes:
+                    return
+                g.batched_shapes.add(shape)
+            statements.append(statement)
+
+    def problems(self):
+        """Budget problems of the current request so far, as one message (None when within budget)."""
+        view = current_app.view_functions.get(request.endpoint)
+        problems = budget_problems(g.query_log, getattr(view, 'query_budget', None), self.threshold)
+        return f'{request.method} {request.path}: ' + '; '.join(problems) if problems else None
+
+    def after_request(self, response):
+        if g.get('query_log') is None:
+            return response
+        message = self.problems()
+        g.pop('query_log')
+        if message:
+            if self.mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            current_app.logger.warning('Query budget: %s', message)
+        return response
+
+
+def check_before_commit(session):
+    """Fail a commit in 'raise' mode when the request is already over budget."""
+    if not has_request_context() or g.get('query_log') is None:
+        return
+    guard = current_app.extensions.get('query_budget')
+    if guard is not None and guard.mode == 'raise':
+        message = guard.problems()
+        if message:
+            raise QueryBudgetExceeded(message)
@@ -0,0 +1,219 @@
+import math
+from collections import Counter
+
+from sqlalchemy import Integer, String, bindparam, delete, func, insert, literal, select, tuple_, union_all, update
+
+from app.db.db import db, dialect_insert, Employee, EmployeeCount, Skill, SkillLevelStat
+
+
+HISTOGRAM_BIN_WIDTH = 10
+PERCENTILES = (25, 50, 75, 90)
+# Employee columns counted in employee_counts
+COUNT_DIMENSIONS = ('department', 'position')
+
+
+def skill_deltas(department, added=(), removed=()):
+    """Build the summary changes for skills added to or removed from one employee.
+
+    Args:
+        department: The employee's department.
+        added: (skill_name, skill_level) pairs that now exist.
+        removed: (skill_name, skill_level) pairs that no longer exist.
+    """
+    deltas = Counter()
+    for skill_name, skill_level in added:
+        deltas[(department, skill_name, skill_level)] += 1
+    for skill_name, skill_level in removed:
+        deltas[(department, skill_name, skill_level)] -= 1
+    return deltas
+
+
+def apply_skill_deltas(deltas):
+    """Apply summary changes in the current transaction.
+
+    All changes go out as one executemany INSERT ... ON CONFLICT DO UPDATE.
+    Rows that drop to zero are kept (readers skip them) to save a statement.
+    """
+    rows = [
+        {'department': department, 'skill_name': skill_name, 'skill_level': skill_level, 'skill_count': change}
+        for (department, skill_name, skill_level), change in deltas.items() if change
+    ]
+    if not rows:
+        return
+    
+    stats = SkillLevelStat.__table__
+    stmt = dialect_insert(stats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[stats.c.department, stats.c.skill_name, stats.c.skill_level],
+        set_={'skill_count': stats.c.skill_count + stmt.excluded.skill_count}
+    )
+    db.session.execute(stmt, rows)
+
+
+def add_skill_to_stats(employee_id, skill_name, skill_level):
+    """Count one skill of an employee in the summary without looking up its department.
+
+    The department is taken from employees inside the same INSERT ... SELECT
+    ... ON CONFLICT DO UPDATE statement.
+    """
+    stats, employees = SkillLevelStat.__table__, Employee.__table__
+    source = (
+        select(employees.c.department, bindparam('skill_name', skill_name, type_=String),
+               bindparam('skill_level', skill_level, type_=Integer), literal(1))
+        .where(employees.c.id == employee_id)
+    )
+    stmt = dialect_insert(stats).from_select(['department', 'skill_name', 'skill_level', 'skill_count'], source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[stats.c.department, stats.c.skill_name, stats.c.skill_level],
+        set_={'skill_count': stats.c.skill_count + stmt.excluded.skill_count}
+    )
+    db.session.execute(stmt)
+
+
+def remove_skills_from_stats(*criteria):
+    """Subtract the skills matching criteria from the summary, in one statement.
+
+    Call it before those skills are updated or deleted. The affected summary
+    rows and their counts are found with subqueries, so no skill row is read
+    into the application.
+
+    Args:
+        criteria: WHERE clauses on the skills table, e.g. Skill.id == skill_id.
+    """
+    stats, employees, skills = SkillLevelStat.__table__, Employee.__table__, Skill.__table__
+    matching = skills.join(employees, skills.c.employee_id == employees.c.id)
+    affected = select(employees.c.department, skills.c.skill_name, skills.c.skill_level) \
+        .select_from(matching).where(*criteria)
+    removed = (
+        select(func.count()).select_from(matching)
+        .where(*criteria,
+               employees.c.department == stats.c.department,
+               skills.c.skill_name == stats.c.skill_name,
+               skills.c.skill_level == stats.c.skill_level)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(stats)
+        .where(tuple_(stats.c.department, stats.c.skill_name, stats.c.skill_level).in_(affected))
+        .values(skill_count=stats.c.skill_count - removed)
+    )
+
+
+def rebuild_skill_stats():
+    """Recompute the whole summary from the skills table.
+
+    Returns:
+        The number of summary rows written.
+    """
+    stats = SkillLevelStat.__table__
+    db.session.execute(delete(stats))
+    db.session.execute(fill_skill_stats())
+    db.session.commit()
+    return db.session.scalar(select(func.count()).select_from(stats))
+
+
+def fill_skill_stats():
+    """INSERT ... SELECT computing the summary rows from the skills table."""
+    employees, skills = Employee.__table__, Skill.__table__
+    source = (
+        select(employees.c.department, skills.c.skill_name, skills.c.skill_level, func.count())
+        .select_from(skills.join(employees, skills.c.employee_id == employees.c.id))
+        .group_by(employees.c.department, skills.c.skill_name, skills.c.skill_level)
+    )
+    return insert(SkillLevelStat.__table__).from_select(
+        ['department', 'skill_name', 'skill_level', 'skill_count'], source)
+
+
+def employee_count_deltas(added=(), removed=()):
+    """Build the counter changes for employees added or removed.
+
+    Args:
+        added: (department, position) pairs of new employees.
+        removed: (department, position) pairs of deleted employees.
+    """
+    deltas = Counter()
+    for department, position in added:
+        deltas[('department', department)] += 1
+        deltas[('position', position)] += 1
+    for department, position in removed:
+        deltas[('department', department)] -= 1
+        deltas[('position', position)] -= 1
+    return deltas
+
+
+def apply_employee_count_deltas(deltas):
+    """Apply counter changes in the current transaction, as one executemany upsert."""
+    rows = [
+        {'dimension': dimension, 'value': value, 'employee_count': change}
+        for (dimension, value), change in deltas.items() if change
+    ]
+    if not rows:
+        return
+    
+    counts = EmployeeCount.__table__
+    stmt = dialect_insert(counts)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[counts.c.dimension, counts.c.value],
+        set_={'employee_count': counts.c.employee_count + stmt.excluded.employee_count}
+    )
+    db.session.execute(stmt, rows)
+
+
+def fill_employee_counts():
+    """INSERT ... SELECT computing the counters from the employees table."""
+    employees = Employee.__table__
+    source = union_all(*(
+        select(literal(dimension), employees.c[dimension], func.count()).group_by(employees.c[dimension])
+        for dimension in COUNT_DIMENSIONS
+    ))
+    return insert(EmployeeCount.__table__).from_select(['dimension', 'value', 'employee_count'], source)
+
+
+def rebuild_employee_counts():
+    """Recompute the employee counters from the employees table.
+
+    Returns:
+        The number of counter rows written.
+    """
+    counts = EmployeeCount.__table__
+    db.session.execute(delete(counts))
+    db.session.execute(fill_employee_counts())
+    db.session.commit()
+    return db.session.scalar(select(func.count()).select_from(counts))
+
+
+def _percentile(level_counts, total, percent):
+    """Nearest-rank percentile over (level, count) pairs sorted by level."""
+    rank = max(1, math.ceil(percent / 100 * total))
+    seen = 0
+    for level, count in level_counts:
+        seen += count
+        if seen >= rank:
+            return level
+    return level_counts[-1][0]
+
+
+def summarize_levels(level_counts):
+    """Average, percentiles and histogram for one skill from its level counts.
+
+    Args:
+        level_counts: (skill_level, count) pairs sorted by level.
+    """
+    total = sum(count for _, count in level_counts)
+    histogram = [0] * (100 // HISTOGRAM_BIN_WIDTH)
+    for level, count in level_counts:
+        histogram[min(level // HISTOGRAM_BIN_WIDTH, len(histogram) - 1)] += count
+    
+    return {
+        'count': total,
+        'average': round(sum(level * count for level, count in level_counts) / total, 2),
+        'min': level_counts[0][0],
+        'max': level_counts[-1][0],
+        'percentiles': {f'p{p}': _percentile(level_counts, total, p) for p in PERCENTILES},
+        'histogram': [
+            {'from': index * HISTOGRAM_BIN_WIDTH,
+             'to': 100 if index == len(histogram) - 1 else (index + 1) * HISTOGRAM_BIN_WIDTH - 1,
+             'count': count}
+            for index, count in enumerate(histogram)
+        ]
+    }
@@ -0,0 +1,73 @@
+from itertools import groupby
+
+from flask import request
+from sqlalchemy import func, select
+
+from app.db.db import db, Employee, EmployeeCount, SkillLevelStat
+from .aggregates import COUNT_DIMENSIONS, summarize_levels
+
+
+class AnalyticsController:
+    """Controller for skill analytics."""
+    
+    def get_department_skills(self):
+        """Skill level distributions per department, read from the summary table."""
+        try:
+            stmt = (
+                select(SkillLevelStat.department, SkillLevelStat.skill_name,
+                       SkillLevelStat.skill_level, SkillLevelStat.skill_count)
+                .where(SkillLevelStat.skill_count > 0)
+                .order_by(SkillLevelStat.department, SkillLevelStat.skill_name, SkillLevelStat.skill_level)
+            )
+            if request.args.get('department'):
+                stmt = stmt.where(SkillLevelStat.department == request.args['department'])
+            if request.args.get('skill_name'):
+                stmt = stmt.where(SkillLevelStat.skill_name == request.args['skill_name'])
+            
+            departments = []
+            rows = db.session.execute(stmt).all()
+            for department, department_rows in groupby(rows, key=lambda row: row.department):
+                skills = []
+                for skill_name, skill_rows in groupby(department_rows, key=lambda row: row.skill_name):
+                    summary = summarize_levels([(row.skill_level, row.skill_count) for row in skill_rows])
+                    skills.append({'skill_name': skill_name, **summary})
+                departments.append({'department': department, 'skills': skills})
+            
+            return {'departments': departments}, 200
+        except Exception as e:
+            return {'error': f'An error occurred: {str(e)}'}, 500
+    
+    def get_employee_counts(self):
+        """Number of employees per department or per position.
+
+        Without filters the counts are read from the employee_counts table.
+        Filtered by department or position, they are a GROUP BY over the
+        matching employees, found through the (department, id) and
+        (position, id) indexes.
+        """
+        try:
+            by = request.args.get('by', 'department')
+            if by not in COUNT_DIMENSIONS:
+                return {'error': 'by must be "department" or "position"'}, 400
+            filters = {field: request.args[field] for field in COUNT_DIMENSIONS if request.args.get(field)}
+            
+            if filters:
+                employees = Employee.__table__
+                group, count = employees.c[by], func.count()
+                stmt = (
+                    select(group, count)
+                    .where(*(employees.c[field] == value for field, value in filters.items()))
+                    .group_by(group)
+                )
+            else:
+                group, count = EmployeeCount.value, EmployeeCount.employee_count
+                stmt = select(group, count).where(EmployeeCount.dimension == by, count > 0)
+            
+            rows = db.session.execute(stmt.order_by(count.desc(), group)).all()
+            return {
+                'by': by,
+                'total': sum(row[1] for row in rows),
+                'counts': [{by: value, 'count': employee_count} for value, employee_count in rows]
+            }, 200
+        except Exception as e:
+            return {'error': f'An error occurred: {str(e)}'}, 500
@@ -0,0 +1,127 @@
+from flask import Blueprint, make_response, jsonify
+from .controller import AnalyticsController
+
+
+analytics_bp = Blueprint('analytics', __name__)
+analytics_controller = AnalyticsController()
+
+
+@analytics_bp.route('/analytics/skills', methods=['GET'])
+def get_department_skills():
+    """Skill level distributions per department.
+    ---
+    tags:
+      - Analytics API
+    parameters:
+      - name: department
+        in: query
+        type: string
+        required: false
+        description: Only this department
+      - name: skill_name
+        in: query
+        type: string
+        required: false
+        description: Only this skill
+    responses:
+      200:
+        description: Per department and skill, the count, average, min, max, percentiles and a histogram of skill_level
+        schema:
+          type: object
+          properties:
+            departments:
+              type: array
+              items:
+                type: object
+                properties:
+                  department:
+                    type: string
+                  skills:
+                    type: array
+                    items:
+                      type: object
+                      properties:
+                        skill_name:
+                          type: string
+                        count:
+                          type: integer
+                        average:
+                          type: number
+                        min:
+                          type: integer
+                        max:
+                          type: integer
+                        percentiles:
+                          type: object
+                          properties:
+                            p25:
+                              type: integer
+                            p50:
+                              type: integer
+                            p75:
+                              type: integer
+                            p90:
+                              type: integer
+                        histogram:
+                          type: array
+                          description: Counts per bin of 10 levels (the last bin is 90-100)
+                          items:
+                            type: object
+                            properties:
+                              from:
+                                type: integer
+                              to:
+                                type: integer
+                              count:
+                                type: integer
+    """
+    result, status_code = analytics_controller.get_department_skills()
+    return make_response(jsonify(result), status_code)
+
+
+@analytics_bp.route('/analytics/employees/counts', methods=['GET'])
+def get_employee_counts():
+    """Number of employees per department or per position.
+    ---
+    tags:
+      - Analytics API
+    parameters:
+      - name: by
+        in: query
+        type: string
+        enum: [department, position]
+        default: department
+        description: Column to group by
+      - name: department
+        in: query
+        type: string
+        required: false
+        description: Only employees of this department (e.g. positions within Engineering)
+      - name: position
+        in: query
+        type: string
+        required: false
+        description: Only employees holding this position
+    responses:
+      200:
+        description: Counts per group, largest first
+        schema:
+          type: object
+          properties:
+            by:
+              type: string
+            total:
+              type: integer
+            counts:
+              type: array
+              items:
+                type: object
+                description: The group value under the `by` key, and its count
+                properties:
+                  count:
+                    type: integer
+      400:
+        description: Invalid by parameter
+    """
+    result, status_code = analytics_controller.get_employee_counts()
+    return make_response(jsonify(result), status_code)
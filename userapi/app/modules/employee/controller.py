@@ -1,7 +1,139 @@
-from flask import request, jsonify
-from app.db.db import db, Employee, Skill
+from flask import request, jsonify, current_app, g
+from app.db.db import db, dialect_insert, normalize_email, Employee, Skill
+from app.security.hashing import hash_passwords, HashingBusyError
+from app.security.tokens import issue_tokens, verify_refresh_token, refresh_token_matches, TokenError
+from app.cache.cache import get_employee_cache
+from app.modules.analytics.aggregates import (
+    skill_deltas, apply_skill_deltas, add_skill_to_stats, remove_skills_from_stats,
+    employee_count_deltas, apply_employee_count_deltas
+)
+from .importer import read_import_rows, validate_import_rows, insert_employees
+from .validation import validate_employee_data, validate_skill_set, is_valid_skill_level
+from .serializers import employees_table, select_employees, build_payloads, employee_lookup, load_employee_payload
+from .search import SEARCH_COLUMNS, search_terms, ranked_matches
+from .writes import update_skill_statement, delete_skill_statement, delete_employee_statement
+from sqlalchemy import select, insert, update, delete, func, and_, or_
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-import re
+
+
+def project_payload(payload, fields, include_skills):
+    """Cut a full employee payload down to a sparse fieldset."""
+    data = {field: payload[field] for field in fields}
+    if include_skills:
+        data['skills'] = payload['skills']
+    return data
+
+
+def parse_fieldset(args=None):
+    """Read the sparse fieldset arguments (fields, include) from the query string.
+
+    `fields` is a comma-separated list of employee columns (id is always
+    returned) and `include=skills` embeds the skills. Without either
+    argument the full representation is returned, skills included.
+
+    Args:
+        args: Mapping of query arguments, defaults to the Flask request's.
+
+    Returns:
+        A (fields, include_skills, error) tuple. error is None when the arguments are valid.
+    """
+    args = request.args if args is None else args
+    fields_arg, include_arg = args.get('fields'), args.get('include')
+    if fields_arg is None and include_arg is None:
+        return Employee.SERIALIZED_FIELDS, True, None
+    
+    requested = set(Employee.SERIALIZED_FIELDS) if fields_arg is None else \
+        {field.strip() for field in fields_arg.split(',') if field.strip()}
+    unknown = requested.difference(Employee.SERIALIZED_FIELDS)
+    if unknown:
+        return None, None, f'Unknown fields: {", ".join(sorted(unknown))}'
+    
+    includes = {name.strip() for name in (include_arg or '').split(',') if name.strip()}
+    if includes - {'skills'}:
+        return None, None, f'Unknown include: {", ".join(sorted(includes - {"skills"}))}'
+    
+    fields = tuple(field for field in Employee.SERIALIZED_FIELDS if field == 'id' or field in requested)
+    return fields, 'skills' in includes, None
+
+
+def fieldset_tag(fields, include_skills):
+    """Name of a representation for ETags; the full one is plain 'employee'."""
+    if fields == Employee.SERIALIZED_FIELDS and include_skills:
+        return 'employee'
+    return 'employee.' + '-'.join(fields) + ('.skills' if include_skills else '')
+
+
+# Employee columns the listing can be filtered on (exact match, indexed with id)
+FILTER_FIELDS = ('department', 'position')
+
+
+def parse_filters():
+    """Read the listing filters (department, position) given in the query string."""
+    return {field: request.args[field] for field in FILTER_FIELDS if request.args.get(field)}
+
+
+def parse_page_args(cursor=int):
+    """Read the keyset pagination arguments (limit, after) from the query string.
+
+    Args:
+        cursor: Callable that parses the `after` value, raising ValueError if invalid.
+
+    Returns:
+        A (limit, after, error) tuple. error is None when the arguments are valid.
+    """
+    default_limit = current_app.config['EMPLOYEES_PAGE_SIZE']
+    max_limit = current_app.config['EMPLOYEES_MAX_PAGE_SIZE']
+    try:
+        limit = int(request.args.get('limit', default_limit))
+        after = request.args.get('after')
+        after = cursor(after) if after not in (None, '') else None
+    except ValueError:
+        return None, None, 'Invalid limit or after parameter'
+    if limit < 1 or limit > max_limit:
+        return None, None, f'limit must be between 1 and {max_limit}'
+    return limit, after, None
+
+
+def parse_skill_predicates(values):
+    """Parse skill search terms such as "Python:80" into (skill_name, min_level) pairs.
+
+    A term without a level matches any level.
+
+    Returns:
+        A (predicates, error) tuple.
+    """
+    predicates = {}
+    for value in values:
+        skill_name, separator, level = value.rpartition(':')
+        if not separator:
+            skill_name, level = value, '0'
+        skill_name = skill_name.strip()
+        try:
+            level = int(level)
+        except ValueError:
+            return None, f'Invalid skill level in "{value}"'
+        if not skill_name:
+            return None, f'Missing skill name in "{value}"'
+        if not is_valid_skill_level(level):
+            return None, 'Skill level must be an integer between 0 and 100'
+        if skill_name in predicates:
+            return None, f'Skill "{skill_name}" given more than once'
+        predicates[skill_name] = level
+    return list(predicates.items()), None
+
+
+def parse_offset_cursor(value):
+    """Parse a search offset cursor, which must be a non-negative integer."""
+    offset = int(value)
+    if offset < 0:
+        raise ValueError(value)
+    return offset
+
+
+def parse_score_cursor(value):
+    """Parse a "<score>.<employee_id>" search cursor."""
+    score, _, employee_id = value.partition('.')
+    return int(score), int(employee_id)
 
 
 class EmployeeController:
@@ -12,20 +144,9 @@ class EmployeeController:
         try:
             data = request.get_json()
             
-            required_fields = ['name', 'position', 'email', 'department', 'seed', 'password']
-            for field in required_fields:
-                if field not in data or not data[field]:
-                    return {'error': f'Missing required field: {field}'}, 400
-            
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, data['email']):
-                return {'error': 'Invalid email format'}, 400
-            
-            if len(data['seed']) != 7:
-                return {'error': 'Seed must be exactly 7 characters'}, 400
-            
-            if len(data['password']) < 6:
-                return {'error': 'Password must be at least 6 characters'}, 400
+            error = validate_employee_data(data)
+            if error:
+                return {'error': error}, 400
             
             employee = Employee(
                 name=data['name'],
@@ -37,25 +158,72 @@ class EmployeeController:
             
             employee.set_password(data['password'])
             
-            if 'skills' in data and isinstance(data['skills'], list):
-                for skill_data in data['skills']:
-                    if 'skill_name' in skill_data and 'skill_level' in skill_data:
-                        skill_level = skill_data['skill_level']
-                        if not isinstance(skill_level, int) or skill_level < 0 or skill_level > 100:
-                            return {'error': 'Skill level must be an integer between 0 and 100'}, 400
-                        
-                        skill = Skill(
-                            skill_name=skill_data['skill_name'],
-                            skill_level=skill_level,
-                            employee=employee
-                        )
-                        db.session.add(skill)
+            skills = [
+                (skill_data['skill_name'], skill_data['skill_level'])
+                for skill_data in data.get('skills') or []
+            ]
             
             db.session.add(employee)
+            db.session.flush()
+            if skills:
+                # One executemany; ORM-added skills are inserted one row at a time on SQLite
+                db.session.execute(insert(Skill.__table__), [
+                    {'employee_id': employee.id, 'skill_name': skill_name, 'skill_level': skill_level}
+                    for skill_name, skill_level in skills
+                ])
+            apply_skill_deltas(skill_deltas(employee.department, added=skills))
+            apply_employee_count_deltas(employee_count_deltas(added=[(employee.department, employee.position)]))
             db.session.commit()
             
             return {'message': 'Employee created successfully', 'employee': employee.to_dict()}, 201
             
+        except HashingBusyError:
+            db.session.rollback()
+            return {'error': 'Server is busy, please retry shortly'}, 503
+        except IntegrityError as e:
+            db.session.rollback()
+            if 'email' in str(e):
+                return {'error': 'Email already exists'}, 409
+            return {'error': 'Database integrity error'}, 400
+        except Exception as e:
+            db.session.rollback()
+            return {'error': f'An error occurred: {str(e)}'}, 500
+    
+    def import_employees(self):
+        """Create many employees at once from a JSON array or a CSV upload.
+
+        Every row is validated up front; invalid rows are reported by row
+        number and the valid ones are inserted together in one transaction.
+        """
+        try:
+            rows, error = read_import_rows()
+            if error:
+                return {'error': error}, 400
+            
+            max_rows = current_app.config['BULK_IMPORT_MAX_ROWS']
+            if len(rows) > max_rows:
+                return {'error': f'Too many rows: at most {max_rows} employees per import'}, 413
+            
+            valid_rows, errors = validate_import_rows(rows)
+            if not valid_rows:
+                return {'error': 'No valid rows to import', 'errors': errors}, 400
+            
+            password_hashes = hash_passwords(
+                [row['password'] for row in valid_rows],
+                max_workers=current_app.config['BULK_IMPORT_HASH_WORKERS']
+            )
+            employee_ids = insert_employees(valid_rows, password_hashes)
+            db.session.commit()
+            
+            return {
+                'message': f'{len(employee_ids)} employees imported successfully',
+                'employee_ids': employee_ids,
+                'errors': errors
+            }, 201
+            
+        except HashingBusyError:
+            db.session.rollback()
+            return {'error': 'Server is busy, please retry shortly'}, 503
         except IntegrityError as e:
             db.session.rollback()
             if 'email' in str(e):
@@ -66,32 +234,178 @@ class EmployeeController:
             return {'error': f'An error occurred: {str(e)}'}, 500
     
     def get_all_employees(self):
-        """Get all employees with their skills."""
+        """Get a page of employees with their skills, ordered by id.
+
+        Pagination is keyset based: pass the returned next_cursor as `after`
+        to fetch the following page. Skills for the whole page are loaded with
+        a single SELECT ... IN query, so a page costs two queries; with a
+        sparse fieldset that leaves out skills it costs one. department and
+        position filters are served by the (column, id) indexes.
+        """
         try:
-            employees = Employee.query.all()
-            return {'employees': [emp.to_dict() for emp in employees]}, 200
+            limit, after, error = parse_page_args()
+            if error:
+                return {'error': error}, 400
+            
+            fields, include_skills, error = parse_fieldset()
+            if error:
+                return {'error': error}, 400
+
+            stmt = select_employees(fields).order_by(Employee.id)
+            stmt = stmt.where(*(employees_table.c[field] == value for field, value in parse_filters().items()))
+            if after is not None:
+                stmt = stmt.where(Employee.id > after)
+
+            # Fetch one extra row to know whether another page exists
+            rows = db.session.execute(stmt.limit(limit + 1)).all()
+            has_more = len(rows) > limit
+            employees = build_payloads(rows[:limit], fields, include_skills)
+
+            return {
+                'employees': employees,
+                'next_cursor': employees[-1]['id'] if has_more else None
+            }, 200
         except Exception as e:
             return {'error': f'An error occurred: {str(e)}'}, 500
     
+    def search_employees(self):
+        """Typeahead search over name, position and department.
+
+        Every word of q has to match: as a word prefix through the FTS5 table
+        on SQLite, as a substring through the trigram index on PostgreSQL.
+        Results are ranked best first (bm25 / word similarity) and paged with
+        an offset cursor. Without fields or include, only id, name, position
+        and department are returned.
+        """
+        try:
+            terms = search_terms(request.args.get('q'))
+            if not terms:
+                return {'error': 'Missing required parameter: q'}, 400
+            
+            limit, offset, error = parse_page_args(cursor=parse_offset_cursor)
+            if error:
+                return {'error': error}, 400
+            
+            if 'fields' in request.args or 'include' in request.args:
+                fields, include_skills, error = parse_fieldset()
+                if error:
+                    return {'error': error}, 400
+            else:
+                fields, include_skills = ('id', *SEARCH_COLUMNS), False
+            
+            matches = ranked_matches(db.session.connection(), terms).subquery()
+            stmt = (
+                select_employees(fields).add_columns(matches.c.rank)
+                .join(matches, matches.c.id == employees_table.c.id)
+                .order_by(matches.c.rank.desc(), employees_table.c.id)
+                .limit(limit + 1)
+                .offset(offset or 0)
+            )
+            rows = db.session.execute(stmt).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            employees = build_payloads(rows, fields, include_skills)
+            for payload, row in zip(employees, rows):
+                payload['rank'] = round(float(row.rank), 4)
+            
+            return {
+                'employees': employees,
+                'next_cursor': (offset or 0) + limit if has_more else None
+            }, 200
+        except Exception as e:
+            return {'error': f'An error occurred: {str(e)}'}, 500
+    
+    def export_employees(self):
+        """Stream every employee with their skills as newline-delimited JSON.
+
+        Rows are pulled in batches of EXPORT_BATCH_SIZE (a server-side cursor on
+        PostgreSQL) and each batch is written out as soon as it is serialized,
+        so memory use does not grow with the size of the table.
+
+        Returns:
+            A generator of NDJSON chunks, one chunk per batch.
+        """
+        batch_size = current_app.config['EXPORT_BATCH_SIZE']
+        dumps = current_app.json.dumps
+        stmt = select_employees().order_by(Employee.id).execution_options(yield_per=batch_size)
+
+        def generate():
+            for rows in db.session.execute(stmt).partitions():
+                yield ''.join(dumps(employee) + '\n' for employee in build_payloads(rows))
+
+        return generate()
+    
+    def get_employee_version(self, employee_id=None, email=None):
+        """Return the (id, version) of an employee, or None if it cannot be found.
+
+        Answered from the cache when possible, otherwise with a two-column
+        query; the skills are never loaded.
+        """
+        try:
+            if employee_id is None:
+                email = normalize_email(email)
+            payload = get_employee_cache().peek(employee_id=employee_id, email=email)
+            if payload is not None:
+                return payload['id'], payload['version']
+            
+            criteria = employee_lookup(employee_id, email)
+            row = db.session.execute(select(Employee.id, Employee.version).where(criteria)).first()
+            return tuple(row) if row else None
+        except SQLAlchemyError:
+            return None
+    
+    def _read_employee(self, employee_id=None, email=None):
+        """Read one employee payload in the fieldset requested by the query string.
+
+        The full representation reads through the cache. A sparse one is cut
+        from a cached payload when there is one, and otherwise loaded with a
+        column projection (without skills unless included), bypassing the cache.
+
+        Returns:
+            A (payload, error) tuple; payload is None when the employee does not exist.
+        """
+        fields, include_skills, error = parse_fieldset()
+        if error:
+            return None, error
+        
+        cache = get_employee_cache()
+        if employee_id is None:
+            # Cached under the stored (normalized) email
+            email = normalize_email(email)
+        criteria = {'employee_id': employee_id, 'email': email}
+        if fields == Employee.SERIALIZED_FIELDS and include_skills:
+            if employee_id is not None:
+                return cache.get_by_id(employee_id, lambda: load_employee_payload(**criteria)), None
+            return cache.get_by_email(email, lambda: load_employee_payload(**criteria)), None
+        
+        payload = cache.peek(employee_id=employee_id, email=email)
+        if payload is not None:
+            return project_payload(payload, fields, include_skills), None
+        return load_employee_payload(fields, include_skills, **criteria), None
+    
     def get_employee_by_id(self, employee_id):
-        """Get a specific employee by ID."""
+        """Get a specific employee by ID (read-through cached)."""
         try:
-            employee = Employee.query.get(employee_id)
-            if not employee:
+            payload, error = self._read_employee(employee_id=employee_id)
+            if error:
+                return {'error': error}, 400
+            if payload is None:
                 return {'error': 'Employee not found'}, 404
             
-            return {'employee': employee.to_dict()}, 200
+            return {'employee': payload}, 200
         except Exception as e:
             return {'error': f'An error occurred: {str(e)}'}, 500
     
     def get_employee_by_email(self, email):
-        """Get a specific employee by email."""
+        """Get a specific employee by email (read-through cached)."""
         try:
-            employee = Employee.query.filter_by(email=email).first()
-            if not employee:
+            payload, error = self._read_employee(email=email)
+            if error:
+                return {'error': error}, 400
+            if payload is None:
                 return {'error': 'Employee not found'}, 404
             
-            return {'employee': employee.to_dict()}, 200
+            return {'employee': payload}, 200
         except Exception as e:
             return {'error': f'An error occurred: {str(e)}'}, 500
     
@@ -106,31 +420,102 @@ class EmployeeController:
             if missing_fields:
                 return {'error': f'Missing required fields: {", ".join(missing_fields)}'}, 400
             
-            employee = Employee.query.filter_by(email=data['email']).first()
+            if not isinstance(data['email'], str):
+                return {'error': 'Invalid email or password'}, 401
+            
+            employee = Employee.query.filter(Employee.email_matches(data['email'])).first()
             if not employee:
                 return {'error': 'Invalid email or password'}, 401
             
             if not employee.check_password(data['password']):
                 return {'error': 'Invalid email or password'}, 401
             
+            if employee.password_needs_rehash():
+                self._rehash_password(employee, data['password'])
+            
             employee_data = employee.to_dict()
             return {
                 'message': 'Login successful',
-                'employee': employee_data
+                'employee': employee_data,
+                **issue_tokens(employee)
             }, 200
             
+        except HashingBusyError:
+            return {'error': 'Server is busy, please retry shortly'}, 503
         except Exception as e:
             return {'error': str(e)}, 500
     
+    def _rehash_password(self, employee, password):
+        """Upgrade a stored hash to the configured bcrypt cost after a successful login.
+
+        Best effort: a failure here must not fail the login itself.
+        """
+        try:
+            employee.set_password(password)
+            db.session.commit()
+        except (HashingBusyError, SQLAlchemyError):
+            db.session.rollback()
+    
+    def refresh_token(self):
+        """Exchange a refresh token for a new token pair, without hashing a password.
+
+        Refresh tokens are not single-use: one stays valid until it expires or
+        the employee's password hash changes (a password change, or a rehash
+        to a new bcrypt cost at login).
+        """
+        try:
+            data = request.get_json(silent=True) or {}
+            if not data.get('refresh_token'):
+                return {'error': 'Missing required field: refresh_token'}, 400
+            
+            claims = verify_refresh_token(data['refresh_token'])
+            
+            # One primary key lookup so deleted employees and changed passwords cannot keep refreshing
+            employee = db.session.get(Employee, claims['sub'])
+            if not employee or not refresh_token_matches(claims, employee):
+                return {'error': 'Invalid token'}, 401
+            
+            return issue_tokens(employee), 200
+            
+        except TokenError as e:
+            return {'error': str(e)}, 401
+        except Exception as e:
+            return {'error': f'An error occurred: {str(e)}'}, 500
+    
+    def get_current_employee(self):
+        """Return the identity carried by the verified access token."""
+        claims = g.token_claims
+        return {'employee': {'id': claims['sub'], 'email': claims['email'], 'name': claims['name']}}, 200
+    
     def delete_employee(self, employee_id):
-        """Delete an employee and all their skills."""
+        """Delete an employee and all their skills.
+
+        A DELETE ... RETURNING; the skills go with it through the database's
+        ON DELETE CASCADE without being loaded. On PostgreSQL the summary and
+        counter updates are CTEs of the same statement; elsewhere they are
+        separate statements around it.
+        """
         try:
-            employee = Employee.query.get(employee_id)
-            if not employee:
-                return {'error': 'Employee not found'}, 404
+            if db.session.connection().dialect.name == 'postgresql':
+                deleted = db.session.execute(delete_employee_statement(employee_id)).first()
+                if deleted is None:
+                    db.session.rollback()
+                    return {'error': 'Employee not found'}, 404
+            else:
+                remove_skills_from_stats(Skill.employee_id == employee_id)
+                
+                employees = Employee.__table__
+                deleted = db.session.execute(
+                    delete(employees).where(employees.c.id == employee_id)
+                    .returning(employees.c.department, employees.c.position)
+                ).first()
+                if deleted is None:
+                    db.session.rollback()
+                    return {'error': 'Employee not found'}, 404
+                apply_employee_count_deltas(employee_count_deltas(removed=[tuple(deleted)]))
             
-            db.session.delete(employee)
             db.session.commit()
+            get_employee_cache().invalidate(employee_id)
             
             return {'message': 'Employee deleted successfully'}, 200
         except Exception as e:
@@ -142,10 +527,15 @@ class SkillController:
     """Controller for skill-related operations."""
     
     def create_skill(self, employee_id):
-        """Create a new skill for an employee."""
+        """Create a new skill for an employee.
+
+        The insert is an INSERT ... ON CONFLICT DO NOTHING on the
+        (employee_id, skill_name) constraint, so concurrent duplicates
+        cannot slip in between a check and the insert.
+        """
         try:
-            employee = Employee.query.get(employee_id)
-            if not employee:
+            department = db.session.scalar(select(Employee.department).where(Employee.id == employee_id))
+            if department is None:
                 return {'error': 'Employee not found'}, 404
             
             data = request.get_json()
@@ -154,81 +544,253 @@ class SkillController:
                 return {'error': 'Missing required fields: skill_name and skill_level'}, 400
             
             skill_level = data['skill_level']
-            if not isinstance(skill_level, int) or skill_level < 0 or skill_level > 100:
+            if not is_valid_skill_level(skill_level):
                 return {'error': 'Skill level must be an integer between 0 and 100'}, 400
             
-            existing_skill = Skill.query.filter_by(
-                employee_id=employee_id,
-                skill_name=data['skill_name']
-            ).first()
-            
-            if existing_skill:
+            skills = Skill.__table__
+            skill = {'skill_name': data['skill_name'], 'skill_level': skill_level, 'employee_id': employee_id}
+            skill['id'] = db.session.scalar(
+                dialect_insert(skills).values(**skill)
+                .on_conflict_do_nothing(index_elements=[skills.c.employee_id, skills.c.skill_name])
+                .returning(skills.c.id)
+            )
+            if skill['id'] is None:
+                db.session.rollback()
                 return {'error': 'Skill already exists for this employee'}, 409
             
-            skill = Skill(
-                skill_name=data['skill_name'],
-                skill_level=skill_level,
-                employee_id=employee_id
-            )
+            apply_skill_deltas(skill_deltas(department, added=[(skill['skill_name'], skill_level)]))
+            Employee.bump_version(employee_id)
+            db.session.commit()
+            get_employee_cache().invalidate(employee_id)
+            
+            return {'message': 'Skill created successfully', 'skill': skill}, 201
             
-            db.session.add(skill)
+        except Exception as e:
+            db.session.rollback()
+            return {'error': f'An error occurred: {str(e)}'}, 500
+    
+    def save_skill_set(self, employee_id, replace):
+        """Replace or merge an employee's whole skill set in one transaction.
+
+        All skills are written with one batched INSERT ... ON CONFLICT DO UPDATE
+        on (employee_id, skill_name). When replacing, skills missing from the
+        request are removed with a single DELETE.
+
+        Args:
+            employee_id: The employee whose skills change.
+            replace: True to make the request the complete skill set, False to
+                only add or update the given skills.
+        """
+        try:
+            data = request.get_json(silent=True)
+            skill_set = data.get('skills') if isinstance(data, dict) else data
+            error = validate_skill_set(skill_set)
+            if error:
+                return {'error': error}, 400
+            
+            # The department and the current skills in one round-trip
+            rows = db.session.execute(
+                select(Employee.department, Skill.id, Skill.skill_name, Skill.skill_level)
+                .outerjoin(Skill, Skill.employee_id == Employee.id)
+                .where(Employee.id == employee_id)
+            ).all()
+            if not rows:
+                return {'error': 'Employee not found'}, 404
+            department = rows[0].department
+            current = {row.skill_name: row for row in rows if row.id is not None}
+            
+            requested = {skill_data['skill_name']: skill_data['skill_level'] for skill_data in skill_set}
+            changed = {name: level for name, level in requested.items()
+                       if name not in current or current[name].skill_level != level}
+            removed = [name for name in current if replace and name not in requested]
+            
+            saved = {}
+            skills = Skill.__table__
+            if changed:
+                stmt = dialect_insert(skills)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[skills.c.employee_id, skills.c.skill_name],
+                    set_={'skill_level': stmt.excluded.skill_level}
+                ).returning(skills.c.id, skills.c.skill_name, skills.c.skill_level)
+                saved = {row.skill_name: row for row in db.session.execute(
+                    stmt, [{'employee_id': employee_id, 'skill_name': name, 'skill_level': level}
+                           for name, level in changed.items()])}
+            if removed:
+                db.session.execute(delete(skills).where(
+                    skills.c.employee_id == employee_id, skills.c.skill_name.in_(removed)))
+            
+            if changed or removed:
+                apply_skill_deltas(skill_deltas(
+                    department,
+                    added=changed.items(),
+                    removed=[(name, current[name].skill_level) for name in [*changed, *removed] if name in current]
+                ))
+                Employee.bump_version(employee_id)
             db.session.commit()
+            if changed or removed:
+                get_employee_cache().invalidate(employee_id)
             
-            return {'message': 'Skill created successfully', 'skill': skill.to_dict()}, 201
+            result = {name: row for name, row in current.items() if name not in removed}
+            result.update(saved)
+            return {
+                'message': 'Skills saved successfully',
+                'skills': [
+                    {'id': row.id, 'skill_name': row.skill_name, 'skill_level': row.skill_level,
+                     'employee_id': employee_id}
+                    for row in sorted(result.values(), key=lambda row: row.id)
+                ]
+            }, 200
             
         except Exception as e:
             db.session.rollback()
             return {'error': f'An error occurred: {str(e)}'}, 500
     
+    def search_skills(self):
+        """Find employees by skills and minimum levels.
+
+        Runs as a single grouped query over the (skill_name, skill_level,
+        employee_id) index: rows matching any predicate are grouped per
+        employee, and match=all keeps only employees matching every one.
+        Results are ranked by score (sum of the matched levels).
+        """
+        try:
+            predicates, error = parse_skill_predicates(request.args.getlist('skill'))
+            if error:
+                return {'error': error}, 400
+            if not predicates:
+                return {'error': 'Missing required parameter: skill'}, 400
+            
+            match = request.args.get('match', 'all')
+            if match not in ('all', 'any'):
+                return {'error': 'match must be "all" or "any"'}, 400
+            
+            limit, after, error = parse_page_args(cursor=parse_score_cursor)
+            if error:
+                return {'error': error}, 400
+            
+            score = func.sum(Skill.skill_level)
+            matched = func.count(func.distinct(Skill.skill_name))
+            stmt = (
+                select(Skill.employee_id, score.label('score'), matched.label('matched_skills'))
+                .where(or_(*(and_(Skill.skill_name == skill_name, Skill.skill_level >= min_level)
+                             for skill_name, min_level in predicates)))
+                .group_by(Skill.employee_id)
+                .order_by(score.desc(), Skill.employee_id)
+                .limit(limit + 1)
+            )
+            if match == 'all':
+                stmt = stmt.having(matched == len(predicates))
+            if after is not None:
+                after_score, after_id = after
+                stmt = stmt.having(or_(score < after_score, and_(score == after_score, Skill.employee_id > after_id)))
+            
+            rows = db.session.execute(stmt).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            return {
+                'results': [
+                    {'employee_id': row.employee_id, 'score': row.score, 'matched_skills': row.matched_skills}
+                    for row in rows
+                ],
+                'next_cursor': f'{rows[-1].score}.{rows[-1].employee_id}' if has_more else None
+            }, 200
+        except Exception as e:
+            return {'error': f'An error occurred: {str(e)}'}, 500
+    
     def get_employee_skills(self, employee_id):
-        """Get all skills for a specific employee."""
+        """Get all skills for a specific employee (served from the employee cache)."""
         try:
-            employee = Employee.query.get(employee_id)
-            if not employee:
+            payload = get_employee_cache().get_by_id(employee_id, lambda: load_employee_payload(employee_id=employee_id))
+            if payload is None:
                 return {'error': 'Employee not found'}, 404
             
-            skills = Skill.query.filter_by(employee_id=employee_id).all()
-            return {'skills': [skill.to_dict() for skill in skills]}, 200
+            return {'skills': payload['skills']}, 200
         except Exception as e:
             return {'error': f'An error occurred: {str(e)}'}, 500
     
     def update_skill(self, skill_id):
-        """Update a skill."""
+        """Update a skill with an UPDATE ... RETURNING.
+
+        On PostgreSQL the summary and version updates are CTEs of the same
+        statement; elsewhere they are separate statements around it.
+        """
         try:
-            skill = Skill.query.get(skill_id)
-            if not skill:
-                return {'error': 'Skill not found'}, 404
-            
-            data = request.get_json()
+            data = request.get_json(silent=True) or {}
             
+            values = {}
             if 'skill_name' in data:
-                skill.skill_name = data['skill_name']
+                skill_name = data['skill_name']
+                if not isinstance(skill_name, str) or not skill_name:
+                    return {'error': 'Skill name must be a non-empty string'}, 400
+                values['skill_name'] = skill_name
             
             if 'skill_level' in data:
                 skill_level = data['skill_level']
-                if not isinstance(skill_level, int) or skill_level < 0 or skill_level > 100:
+                if not is_valid_skill_level(skill_level):
                     return {'error': 'Skill level must be an integer between 0 and 100'}, 400
-                skill.skill_level = skill_level
-            
+                values['skill_level'] = skill_level
+            
+            if not values:
+                return {'error': 'Missing required field: skill_name or skill_level'}, 400
+            
+            skills = Skill.__table__
+            columns = (skills.c.id, skills.c.skill_name, skills.c.skill_level, skills.c.employee_id)
+            if db.session.connection().dialect.name == 'postgresql':
+                skill = db.session.execute(update_skill_statement(skill_id, values)).first()
+                if skill is None:
+                    db.session.rollback()
+                    return {'error': 'Skill not found'}, 404
+            else:
+                remove_skills_from_stats(skills.c.id == skill_id)
+                skill = db.session.execute(
+                    update(skills).where(skills.c.id == skill_id).values(**values).returning(*columns)
+                ).first()
+                if skill is None:
+                    db.session.rollback()
+                    return {'error': 'Skill not found'}, 404
+                
+                add_skill_to_stats(skill.employee_id, skill.skill_name, skill.skill_level)
+                Employee.bump_version(skill.employee_id)
             db.session.commit()
+            get_employee_cache().invalidate(skill.employee_id)
             
-            return {'message': 'Skill updated successfully', 'skill': skill.to_dict()}, 200
+            return {'message': 'Skill updated successfully', 'skill': dict(skill._mapping)}, 200
             
+        except IntegrityError:
+            db.session.rollback()
+            return {'error': 'Skill already exists for this employee'}, 409
         except Exception as e:
             db.session.rollback()
             return {'error': f'An error occurred: {str(e)}'}, 500
     
     def delete_skill(self, skill_id):
-        """Delete a skill."""
+        """Delete a skill with a DELETE ... RETURNING.
+
+        On PostgreSQL the summary and version updates are CTEs of the same
+        statement; elsewhere they are separate statements around it.
+        """
         try:
-            skill = Skill.query.get(skill_id)
-            if not skill:
-                return {'error': 'Skill not found'}, 404
-            
-            db.session.delete(skill)
+            if db.session.connection().dialect.name == 'postgresql':
+                deleted = db.session.execute(delete_skill_statement(skill_id)).first()
+                if deleted is None:
+                    db.session.rollback()
+                    return {'error': 'Skill not found'}, 404
+            else:
+                skills = Skill.__table__
+                remove_skills_from_stats(skills.c.id == skill_id)
+                deleted = db.session.execute(
+                    delete(skills).where(skills.c.id == skill_id).returning(skills.c.employee_id)
+                ).first()
+                if deleted is None:
+                    db.session.rollback()
+                    return {'error': 'Skill not found'}, 404
+                
+                Employee.bump_version(deleted.employee_id)
             db.session.commit()
+            get_employee_cache().invalidate(deleted.employee_id)
             
             return {'message': 'Skill deleted successfully'}, 200
         except Exception as e:
             db.session.rollback()
-            return {'error': f'An error occurred: {str(e)}'}, 500
\ No newline at end of file
+            return {'error': f'An error occurred: {str(e)}'}, 500
@@ -0,0 +1,205 @@
+import csv
+import io
+from collections import Counter
+
+from flask import request
+from sqlalchemy import func, insert, select, text
+
+from app.db.db import db, normalize_email, Employee, Skill
+from app.metrics.query_budget import batched_queries
+from app.modules.analytics.aggregates import (
+    skill_deltas, apply_skill_deltas, employee_count_deltas, apply_employee_count_deltas
+)
+from .validation import validate_employee_data
+
+
+EMPLOYEE_COLUMNS = ['name', 'position', 'email', 'department', 'seed']
+# Keep IN (...) lists well under the bind parameter limits of SQLite
+EMAIL_LOOKUP_CHUNK = 500
+
+
+def parse_csv_skills(value):
+    """Parse a CSV skills cell such as "Python:85;Docker:70"."""
+    skills = []
+    for item in (part.strip() for part in (value or '').split(';')):
+        if not item:
+            continue
+        skill_name, _, skill_level = item.rpartition(':')
+        try:
+            skill_level = int(skill_level)
+        except ValueError:
+            pass
+        if not skill_name:
+            # Leave the raw cell so validation reports it as an invalid level
+            skill_level = item
+        skills.append({'skill_name': skill_name.strip(), 'skill_level': skill_level})
+    return skills
+
+
+def read_csv_rows(stream):
+    """Read employee rows from CSV with a header line.
+
+    The columns match the JSON fields; skills are given as name:level pairs
+    separated by semicolons.
+    """
+    rows = []
+    for record in csv.DictReader(stream):
+        row = {key.strip(): (value or '').strip() for key, value in record.items() if key}
+        row['skills'] = parse_csv_skills(row.get('skills'))
+        rows.append(row)
+    return rows
+
+
+def read_import_rows():
+    """Read the rows of a bulk import request.
+
+    Accepts a JSON array (or an object with an "employees" array), a text/csv
+    body, or a CSV file uploaded as the multipart field "file".
+
+    Returns:
+        A (rows, error) tuple. error is None when the body could be read.
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        return read_csv_rows(io.TextIOWrapper(upload.stream, encoding='utf-8-sig')), None
+    
+    if request.mimetype == 'text/csv':
+        return read_csv_rows(io.StringIO(request.get_data(as_text=True))), None
+    
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get('employees')
+    if not isinstance(payload, list):
+        return None, 'Expected a JSON array of employees or a CSV upload'
+    return payload, None
+
+
+def find_existing_emails(emails):
+    """Return the subset of (normalized) emails that already belong to an employee."""
+    existing = set()
+    with batched_queries():
+        for start in range(0, len(emails), EMAIL_LOOKUP_CHUNK):
+            chunk = emails[start:start + EMAIL_LOOKUP_CHUNK]
+            existing.update(db.session.scalars(
+                select(func.lower(Employee.email)).where(func.lower(Employee.email).in_(chunk))
+            ))
+    return existing
+
+
+def validate_import_rows(rows):
+    """Validate every import row up front.
+
+    Returns:
+        A (valid_rows, errors) tuple. errors holds one {'row', 'error'} entry
+        per rejected row, with 1-based row numbers.
+    """
+    candidates, errors, seen_emails = [], [], set()
+    for number, row in enumerate(rows, start=1):
+        error = validate_employee_data(row) if isinstance(row, dict) else 'Row must be an object'
+        if not error:
+            row['email'] = normalize_email(row['email'])
+            if row['email'] in seen_emails:
+                error = 'Duplicate email in import'
+        if error:
+            errors.append({'row': number, 'error': error})
+            continue
+        seen_emails.add(row['email'])
+        candidates.append((number, row))
+    
+    existing_emails = find_existing_emails(list(seen_emails))
+    valid_rows = []
+    for number, row in candidates:
+        if row['email'] in existing_emails:
+            errors.append({'row': number, 'error': 'Email already exists'})
+        else:
+            valid_rows.append(row)
+    
+    errors.sort(key=lambda error: error['row'])
+    return valid_rows, errors
+
+
+def copy_rows(connection, table, columns, rows):
+    """Load rows into a PostgreSQL table with COPY ... FROM STDIN."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY {table} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+    finally:
+        cursor.close()
+
+
+@batched_queries()
+def insert_employees(rows, password_hashes):
+    """Insert validated employee rows and their skills in bulk.
+
+    On PostgreSQL (psycopg2) ids are reserved from the sequence and both
+    tables are loaded with COPY. Elsewhere the rows go through batched
+    executemany INSERTs, with RETURNING for the employee ids (on SQLite
+    they are read back by email instead). The number of batches grows with
+    the rows, so the query budget counts each statement once.
+
+    Returns:
+        The new employee ids, in the same order as rows.
+    """
+    connection = db.session.connection()
+    use_copy = connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+    
+    if use_copy:
+        employee_ids = connection.execute(
+            text("SELECT nextval(pg_get_serial_sequence('employees', 'id')) FROM generate_series(1, :n)"),
+            {'n': len(rows)}
+        ).scalars().all()
+        copy_rows(
+            connection, 'employees', ['id', *EMPLOYEE_COLUMNS, 'password_hash'],
+            [[employee_id, *(row[column] for column in EMPLOYEE_COLUMNS), password_hash]
+             for employee_id, row, password_hash in zip(employee_ids, rows, password_hashes)]
+        )
+    elif connection.dialect.name == 'sqlite':
+        # SQLite cannot order a batched RETURNING, so SQLAlchemy would send one
+        # INSERT per row; insert in one executemany and read the ids back by email
+        employees = Employee.__table__
+        db.session.execute(
+            insert(employees),
+            [dict({column: row[column] for column in EMPLOYEE_COLUMNS}, password_hash=password_hash)
+             for row, password_hash in zip(rows, password_hashes)]
+        )
+        emails = [row['email'] for row in rows]
+        ids_by_email = {}
+        for start in range(0, len(emails), EMAIL_LOOKUP_CHUNK):
+            ids_by_email.update(db.session.execute(
+                select(employees.c.email, employees.c.id)
+                .where(func.lower(employees.c.email).in_(emails[start:start + EMAIL_LOOKUP_CHUNK]))
+            ).all())
+        employee_ids = [ids_by_email[email] for email in emails]
+    else:
+        employees = Employee.__table__
+        employee_ids = db.session.scalars(
+            insert(employees).returning(employees.c.id, sort_by_parameter_order=True),
+            [dict({column: row[column] for column in EMPLOYEE_COLUMNS}, password_hash=password_hash)
+             for row, password_hash in zip(rows, password_hashes)]
+        ).all()
+    
+    skill_rows, deltas = [], Counter()
+    for employee_id, row in zip(employee_ids, rows):
+        skills = [
+            (skill_data['skill_name'], skill_data['skill_level'])
+            for skill_data in row.get('skills') or []
+        ]
+        skill_rows.extend((employee_id, skill_name, skill_level) for skill_name, skill_level in skills)
+        deltas.update(skill_deltas(row['department'], added=skills))
+    
+    if skill_rows:
+        if use_copy:
+            copy_rows(connection, 'skills', ['employee_id', 'skill_name', 'skill_level'], skill_rows)
+        else:
+            db.session.execute(
+                insert(Skill.__table__),
+                [{'employee_id': employee_id, 'skill_name': skill_name, 'skill_level': skill_level}
+                 for employee_id, skill_name, skill_level in skill_rows]
+            )
+        apply_skill_deltas(deltas)
+    apply_employee_count_deltas(employee_count_deltas(added=[(row['department'], row['position']) for row in rows]))
+    
+    return list(employee_ids)
@@ -1,5 +1,9 @@
-from flask import Blueprint, make_response, jsonify
-from .controller import EmployeeController, SkillController
+from flask import Blueprint, Response, make_response, jsonify, request, stream_with_context, current_app
+from app.security.tokens import token_required
+from app.cache.cache import get_employee_cache
+from app.compression.compression import get_compressor, etag_variants
+from app.metrics.query_budget import query_budget
+from .controller import EmployeeController, SkillController, parse_fieldset, fieldset_tag
 
 
 employee_bp = Blueprint('employee', __name__)
@@ -7,8 +11,60 @@ employee_controller = EmployeeController()
 skill_controller = SkillController()
 
 
+@employee_bp.after_request
+def add_retry_after(response):
+    """Tell clients when to retry after a 503 from the saturated hashing pool."""
+    if response.status_code == 503:
+        response.headers.setdefault('Retry-After', '1')
+    return response
+
+
+def employee_etag(representation, version_info):
+    """Strong ETag for one representation (e.g. 'employee' or 'skills') of an employee version."""
+    if representation is None or version_info is None:
+        return None
+    employee_id, version = version_info
+    return f'{representation}-{employee_id}-v{version}'
+
+
+def employee_representation():
+    """ETag representation name for the fieldset requested by the query string."""
+    fields, include_skills, error = parse_fieldset()
+    return None if error else fieldset_tag(fields, include_skills)
+
+
+def not_modified(etag):
+    """Return a 304 response if the request's If-None-Match holds etag or an encoded variant of it, else None."""
+    if not etag:
+        return None
+    for candidate in etag_variants(etag):
+        if request.if_none_match.contains(candidate):
+            response = make_response('', 304)
+            response.set_etag(candidate)
+            response.vary.add('Accept-Encoding')
+            return response
+    return None
+
+
+def stored_response(etag):
+    """Return the stored (already encoded) body for etag as a response, or None."""
+    if not etag:
+        return None
+    return get_compressor().serve_stored(get_employee_cache(), etag, current_app.json.mimetype)
+
+
+def tagged_response(result, status_code, etag):
+    response = make_response(jsonify(result), status_code)
+    if etag and status_code == 200:
+        response.set_etag(etag)
+        # Keep the encoded body so the next request for this version skips serialization
+        get_compressor().remember(get_employee_cache(), etag)
+    return response
+
+
 # Employee Routes
 @employee_bp.route('/employees', methods=['POST'])
+@query_budget(6)
 def create_employee():
     """Create a new employee.
     ---
@@ -68,23 +124,125 @@ def create_employee():
         description: Invalid input data
       409:
         description: Email already exists
+      503:
+        description: Password hashing pool saturated, retry later
     """
     result, status_code = employee_controller.create_employee()
     return make_response(jsonify(result), status_code)
 
 
+@employee_bp.route('/employees/bulk', methods=['POST'])
+@query_budget(6)
+def import_employees():
+    """Create many employees at once.
+    ---
+    tags:
+      - Employee API
+    description: >
+      Accepts a JSON array of employee objects (same fields as POST /employees),
+      a text/csv body, or a CSV file in the multipart field "file". CSV columns
+      are name, position, email, department, seed, password and skills, where
+      skills is a list of name:level pairs separated by semicolons
+      (e.g. "Python:85;Docker:70"). Invalid rows are reported and skipped.
+    consumes:
+      - application/json
+      - text/csv
+      - multipart/form-data
+    parameters:
+      - in: body
+        name: employees
+        description: Employee rows
+        required: false
+        schema:
+          type: array
+          items:
+            type: object
+      - in: formData
+        name: file
+        type: file
+        required: false
+        description: CSV file with a header line
+    responses:
+      201:
+        description: Valid rows imported; errors lists the rejected rows
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+            employee_ids:
+              type: array
+              items:
+                type: integer
+            errors:
+              type: array
+              items:
+                type: object
+                properties:
+                  row:
+                    type: integer
+                  error:
+                    type: string
+      400:
+        description: Unreadable body or no valid rows
+      409:
+        description: Email already exists
+      413:
+        description: Too many rows
+      503:
+        description: Password hashing pool saturated, retry later
+    """
+    result, status_code = employee_controller.import_employees()
+    return make_response(jsonify(result), status_code)
+
+
 @employee_bp.route('/employees', methods=['GET'])
+@query_budget(2)
 def get_all_employees():
-    """Get all employees with their skills.
+    """Get a page of employees with their skills.
     ---
     tags:
       - Employee API
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (defaults to EMPLOYEES_PAGE_SIZE)
+      - name: after
+        in: query
+        type: integer
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: department
+        in: query
+        type: string
+        required: false
+        description: Only employees of this department
+      - name: position
+        in: query
+        type: string
+        required: false
+        description: Only employees holding this position
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated employee columns to return (id is always included), e.g. "id,name,department"
+      - name: include
+        in: query
+        type: string
+        required: false
+        description: '"skills" to embed the skills. Defaults to skills embedded only when fields is not given'
     responses:
       200:
-        description: List of all employees
+        description: A page of employees ordered by id
         schema:
           type: object
           properties:
+            next_cursor:
+              type: integer
+              description: Id to pass as `after` for the next page, null on the last page
             employees:
               type: array
               items:
@@ -115,12 +273,100 @@ def get_all_employees():
                           type: integer
                         employee_id:
                           type: integer
+      400:
+        description: Invalid pagination or fieldset parameters
     """
     result, status_code = employee_controller.get_all_employees()
     return make_response(jsonify(result), status_code)
 
 
+@employee_bp.route('/employees/search', methods=['GET'])
+@query_budget(3)
+def search_employees():
+    """Search employees by name, position and department (typeahead).
+    ---
+    tags:
+      - Employee API
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Words to look for; every word must match, e.g. "ana eng"
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (defaults to EMPLOYEES_PAGE_SIZE)
+      - name: after
+        in: query
+        type: integer
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated employee columns to return. Defaults to id, name, position and department
+      - name: include
+        in: query
+        type: string
+        required: false
+        description: '"skills" to embed the skills'
+    responses:
+      200:
+        description: Matching employees, best match first
+        schema:
+          type: object
+          properties:
+            next_cursor:
+              type: integer
+              description: Value to pass as `after` for the next page, null on the last page
+            employees:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                  name:
+                    type: string
+                  position:
+                    type: string
+                  department:
+                    type: string
+                  rank:
+                    type: number
+                    description: Relevance, higher is better
+      400:
+        description: Missing q or invalid pagination or fieldset parameters
+    """
+    result, status_code = employee_controller.search_employees()
+    return make_response(jsonify(result), status_code)
+
+
+@employee_bp.route('/employees/export', methods=['GET'])
+def export_employees():
+    """Export every employee with their skills as newline-delimited JSON.
+    ---
+    tags:
+      - Employee API
+    produces:
+      - application/x-ndjson
+    responses:
+      200:
+        description: One JSON employee object (with skills) per line, ordered by id
+    """
+    chunks = employee_controller.export_employees()
+    return Response(
+        stream_with_context(chunks),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=employees.ndjson'}
+    )
+
+
 @employee_bp.route('/employees/<int:employee_id>', methods=['GET'])
+@query_budget(3)
 def get_employee_by_id(employee_id):
     """Get a specific employee by ID.
     ---
@@ -132,17 +378,41 @@ def get_employee_by_id(employee_id):
         type: integer
         required: true
         description: Employee ID
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated employee columns to return (id is always included), e.g. "id,name,department"
+      - name: include
+        in: query
+        type: string
+        required: false
+        description: '"skills" to embed the skills. Defaults to skills embedded only when fields is not given'
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag of a previously fetched version
     responses:
       200:
-        description: Employee data
+        description: Employee data, with an ETag header
+      304:
+        description: Employee unchanged since the given ETag
+      400:
+        description: Invalid fieldset parameters
       404:
         description: Employee not found
     """
+    etag = employee_etag(employee_representation(), employee_controller.get_employee_version(employee_id=employee_id))
+    cached = not_modified(etag) or stored_response(etag)
+    if cached:
+        return cached
     result, status_code = employee_controller.get_employee_by_id(employee_id)
-    return make_response(jsonify(result), status_code)
+    return tagged_response(result, status_code, etag)
 
 
 @employee_bp.route('/employees/by-email/<string:email>', methods=['GET'])
+@query_budget(3)
 def get_employee_by_email(email):
     """Get a specific employee by email.
     ---
@@ -154,17 +424,41 @@ def get_employee_by_email(email):
         type: string
         required: true
         description: Employee email
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated employee columns to return (id is always included), e.g. "id,name,department"
+      - name: include
+        in: query
+        type: string
+        required: false
+        description: '"skills" to embed the skills. Defaults to skills embedded only when fields is not given'
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag of a previously fetched version
     responses:
       200:
-        description: Employee data
+        description: Employee data, with an ETag header
+      304:
+        description: Employee unchanged since the given ETag
+      400:
+        description: Invalid fieldset parameters
       404:
         description: Employee not found
     """
+    etag = employee_etag(employee_representation(), employee_controller.get_employee_version(email=email))
+    cached = not_modified(etag) or stored_response(etag)
+    if cached:
+        return cached
     result, status_code = employee_controller.get_employee_by_email(email)
-    return make_response(jsonify(result), status_code)
+    return tagged_response(result, status_code, etag)
 
 
 @employee_bp.route('/employees/login', methods=['POST'])
+@query_budget(4)
 def login_employee():
     """Authenticate an employee with email and password.
     ---
@@ -196,6 +490,18 @@ def login_employee():
             message:
               type: string
               example: "Login successful"
+            access_token:
+              type: string
+              description: 'Signed token to send as "Authorization: Bearer <token>"'
+            refresh_token:
+              type: string
+              description: Token to exchange for a new pair at /employees/token/refresh
+            token_type:
+              type: string
+              example: "Bearer"
+            expires_in:
+              type: integer
+              description: Access token lifetime in seconds
             employee:
               type: object
               properties:
@@ -215,12 +521,69 @@ def login_employee():
         description: Invalid credentials
       400:
         description: Invalid input data
+      503:
+        description: Password hashing pool saturated, retry later
     """
     result, status_code = employee_controller.login_employee()
     return make_response(jsonify(result), status_code)
 
 
+@employee_bp.route('/employees/token/refresh', methods=['POST'])
+@query_budget(1)
+def refresh_token():
+    """Exchange a refresh token for a new access and refresh token.
+    ---
+    tags:
+      - Employee API
+    parameters:
+      - in: body
+        name: token
+        required: true
+        schema:
+          type: object
+          required:
+            - refresh_token
+          properties:
+            refresh_token:
+              type: string
+    responses:
+      200:
+        description: New token pair
+      400:
+        description: Missing refresh token
+      401:
+        description: Invalid or expired refresh token
+    """
+    result, status_code = employee_controller.refresh_token()
+    return make_response(jsonify(result), status_code)
+
+
+@employee_bp.route('/employees/me', methods=['GET'])
+@query_budget(0)
+@token_required
+def get_current_employee():
+    """Identity of the employee holding the access token.
+    ---
+    tags:
+      - Employee API
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: "Bearer <access token>"
+    responses:
+      200:
+        description: Employee id, email and name taken from the verified token
+      401:
+        description: Missing, invalid or expired token
+    """
+    result, status_code = employee_controller.get_current_employee()
+    return make_response(jsonify(result), status_code)
+
+
 @employee_bp.route('/employees/<int:employee_id>', methods=['DELETE'])
+@query_budget(3)
 def delete_employee(employee_id):
     """Delete an employee and all their skills.
     ---
@@ -244,6 +607,7 @@ def delete_employee(employee_id):
 
 # Skill Routes
 @employee_bp.route('/employees/<int:employee_id>/skills', methods=['POST'])
+@query_budget(4)
 def create_skill(employee_id):
     """Create a new skill for an employee.
     ---
@@ -288,6 +652,7 @@ def create_skill(employee_id):
 
 
 @employee_bp.route('/employees/<int:employee_id>/skills', methods=['GET'])
+@query_budget(3)
 def get_employee_skills(employee_id):
     """Get all skills for a specific employee.
     ---
@@ -299,17 +664,139 @@ def get_employee_skills(employee_id):
         type: integer
         required: true
         description: Employee ID
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag of a previously fetched version
     responses:
       200:
-        description: List of employee skills
+        description: List of employee skills, with an ETag header
+      304:
+        description: Skills unchanged since the given ETag
       404:
         description: Employee not found
     """
+    etag = employee_etag('skills', employee_controller.get_employee_version(employee_id=employee_id))
+    cached = not_modified(etag) or stored_response(etag)
+    if cached:
+        return cached
     result, status_code = skill_controller.get_employee_skills(employee_id)
+    return tagged_response(result, status_code, etag)
+
+
+@employee_bp.route('/employees/<int:employee_id>/skills', methods=['PUT', 'PATCH'])
+@query_budget(5)
+def save_skill_set(employee_id):
+    """Replace (PUT) or merge (PATCH) an employee's whole skill set.
+    ---
+    tags:
+      - Skill API
+    description: >
+      PUT makes the given list the employee's complete skill set; PATCH adds
+      or updates the given skills and keeps the others. Either way the change
+      is applied atomically in one transaction.
+    parameters:
+      - name: employee_id
+        in: path
+        type: integer
+        required: true
+        description: Employee ID
+      - in: body
+        name: skills
+        required: true
+        schema:
+          type: object
+          required:
+            - skills
+          properties:
+            skills:
+              type: array
+              items:
+                type: object
+                required:
+                  - skill_name
+                  - skill_level
+                properties:
+                  skill_name:
+                    type: string
+                    example: "Python"
+                  skill_level:
+                    type: integer
+                    minimum: 0
+                    maximum: 100
+                    example: 85
+    responses:
+      200:
+        description: The employee's resulting skills
+      400:
+        description: Invalid input data
+      404:
+        description: Employee not found
+    """
+    result, status_code = skill_controller.save_skill_set(employee_id, replace=request.method == 'PUT')
+    return make_response(jsonify(result), status_code)
+
+
+@employee_bp.route('/skills/search', methods=['GET'])
+@query_budget(2)
+def search_skills():
+    """Find employees by skill and minimum level.
+    ---
+    tags:
+      - Skill API
+    parameters:
+      - name: skill
+        in: query
+        type: array
+        items:
+          type: string
+        collectionFormat: multi
+        required: true
+        description: 'Repeatable "name:min_level" term, e.g. skill=Python:80&skill=Kubernetes:60'
+      - name: match
+        in: query
+        type: string
+        enum: [all, any]
+        default: all
+        description: Require every term (all) or at least one (any)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+      - name: after
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+    responses:
+      200:
+        description: Matching employee ids ranked by score (sum of matched skill levels)
+        schema:
+          type: object
+          properties:
+            results:
+              type: array
+              items:
+                type: object
+                properties:
+                  employee_id:
+                    type: integer
+                  score:
+                    type: integer
+                  matched_skills:
+                    type: integer
+            next_cursor:
+              type: string
+      400:
+        description: Invalid search terms or pagination parameters
+    """
+    result, status_code = skill_controller.search_skills()
     return make_response(jsonify(result), status_code)
 
 
 @employee_bp.route('/skills/<int:skill_id>', methods=['PUT'])
+@query_budget(4)
 def update_skill(skill_id):
     """Update a skill.
     ---
@@ -342,12 +829,15 @@ def update_skill(skill_id):
         description: Invalid input data
       404:
         description: Skill not found
+      409:
+        description: The employee already has a skill with that name
     """
     result, status_code = skill_controller.update_skill(skill_id)
     return make_response(jsonify(result), status_code)
 
 
 @employee_bp.route('/skills/<int:skill_id>', methods=['DELETE'])
+@query_budget(3)
 def delete_skill(skill_id):
     """Delete a skill.
     ---
@@ -0,0 +1,88 @@
+import re
+
+from flask import current_app
+from sqlalchemy import and_, case, func, literal_column, or_, select, table, column, text
+
+from .serializers import employees_table
+
+
+# Directory search over name, position and department.
+# PostgreSQL: pg_trgm GIN index on search_document(), matched with ILIKE and
+# ranked by word_similarity. SQLite: FTS5 table kept in sync by triggers,
+# prefix-matched and ranked by bm25. Elsewhere (or SQLite without FTS5): LIKE.
+SEARCH_COLUMNS = ('name', 'position', 'department')
+FTS_TABLE = 'employees_fts'
+# bm25 weights of name, position and department: a name match ranks highest
+FTS_WEIGHTS = (10.0, 2.0, 1.0)
+MAX_TERMS = 8
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+employees_fts = table(FTS_TABLE, column('rowid'))
+
+
+def search_terms(query):
+    """Split a search string into lowercase word terms (at most MAX_TERMS)."""
+    return [term.lower() for term in _TERM.findall(query or '')][:MAX_TERMS]
+
+
+def search_document(source=employees_table):
+    """name || ' ' || position || ' ' || department, the expression indexed on PostgreSQL."""
+    space = literal_column("' '")
+    return source.c.name.op('||')(space).op('||')(source.c.position).op('||')(space).op('||')(source.c.department)
+
+
+def fts5_query(terms):
+    """An FTS5 query requiring every term as a prefix, e.g. "ana"* AND "eng"*."""
+    return ' AND '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def fts_available(connection):
+    """Whether the SQLite FTS5 table exists (it may not be compiled in).
+
+    Looked up on the first search of the app and remembered: the schema is
+    migrated before the app serves traffic.
+    """
+    available = current_app.extensions.get('employee_search_fts')
+    if available is None:
+        available = connection.dialect.name == 'sqlite' and connection.scalar(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+        ) is not None
+        current_app.extensions['employee_search_fts'] = available
+    return available
+
+
+def ranked_matches(connection, terms):
+    """SELECT of (id, rank) for the employees matching every term; a higher rank is a better match."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite' and fts_available(connection):
+        bm25 = func.bm25(literal_column(FTS_TABLE), *FTS_WEIGHTS)
+        return (
+            select(employees_fts.c.rowid.label('id'), (-bm25).label('rank'))
+            .select_from(employees_fts)
+            .where(literal_column(FTS_TABLE).op('MATCH')(fts5_query(terms)))
+        )
+
+    if dialect == 'postgresql':
+        document = search_document()
+        return (
+            select(employees_table.c.id, func.word_similarity(' '.join(terms), document).label('rank'))
+            .where(and_(*(document.ilike(f'%{escape_like(term)}%', escape='\\') for term in terms)))
+        )
+
+    # Unindexed fallback: every term in some column, names starting with the first term first
+    columns = [func.lower(employees_table.c[name]) for name in SEARCH_COLUMNS]
+    return (
+        select(
+            employees_table.c.id,
+            case((columns[0].like(f'{escape_like(terms[0])}%', escape='\\'), 1), else_=0).label('rank'),
+        )
+        .where(and_(*(
+            or_(*(expression.like(f'%{escape_like(term)}%', escape='\\') for expression in columns))
+            for term in terms
+        )))
+    )
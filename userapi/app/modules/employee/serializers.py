@@ -0,0 +1,62 @@
+from sqlalchemy import select
+from app.db.db import db, Employee, Skill
+
+
+# Read paths select plain columns from the tables, so rows come back as
+# tuples and no ORM instances (or identity map entries) are created.
+employees_table = Employee.__table__
+skills_table = Skill.__table__
+
+SKILL_FIELDS = ('id', 'skill_name', 'skill_level', 'employee_id')
+
+
+def select_employees(fields=Employee.SERIALIZED_FIELDS):
+    """SELECT of the given employee columns, in the order of fields."""
+    return select(*(employees_table.c[field] for field in fields))
+
+
+def select_skills(employee_ids):
+    """SELECT of the skills of the given employees, ordered by id."""
+    return (
+        select(*(skills_table.c[field] for field in SKILL_FIELDS))
+        .where(skills_table.c.employee_id.in_(list(employee_ids)))
+        .order_by(skills_table.c.id)
+    )
+
+
+def add_skill_rows(payloads, skill_rows):
+    """Put skill rows selected with select_skills into their employees' 'skills' lists."""
+    skills_by_employee = {}
+    for payload in payloads:
+        skills_by_employee[payload['id']] = payload['skills'] = []
+    for row in skill_rows:
+        skills_by_employee[row[3]].append(dict(zip(SKILL_FIELDS, row)))
+    return payloads
+
+
+def attach_skills(payloads):
+    """Add a 'skills' list to each employee payload with one SELECT ... IN query."""
+    skill_rows = db.session.execute(select_skills(payload['id'] for payload in payloads)) if payloads else ()
+    return add_skill_rows(payloads, skill_rows)
+
+
+def build_payloads(rows, fields=Employee.SERIALIZED_FIELDS, include_skills=True):
+    """Turn employee rows selected with select_employees(fields) into payloads."""
+    payloads = [dict(zip(fields, row)) for row in rows]
+    if include_skills:
+        attach_skills(payloads)
+    return payloads
+
+
+def employee_lookup(employee_id=None, email=None):
+    """WHERE clause selecting one employee by id, or by email in any casing."""
+    if employee_id is not None:
+        return employees_table.c.id == employee_id
+    return Employee.email_matches(email)
+
+
+def load_employee_payload(fields=Employee.SERIALIZED_FIELDS, include_skills=True, employee_id=None, email=None):
+    """Load one employee by id or email and serialize it, or return None."""
+    stmt = select_employees(fields).where(employee_lookup(employee_id, email)).limit(1)
+    payloads = build_payloads(db.session.execute(stmt), fields, include_skills)
+    return payloads[0] if payloads else None
@@ -0,0 +1,62 @@
+import re
+
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+REQUIRED_EMPLOYEE_FIELDS = ['name', 'position', 'email', 'department', 'seed', 'password']
+
+
+def is_valid_skill_level(skill_level):
+    """Check that a skill level is an integer between 0 and 100."""
+    return isinstance(skill_level, int) and 0 <= skill_level <= 100
+
+
+def validate_employee_data(data):
+    """Validate an employee payload as accepted by POST /employees.
+
+    Returns:
+        An error message, or None when the payload is valid.
+    """
+    for field in REQUIRED_EMPLOYEE_FIELDS:
+        if field not in data or not data[field]:
+            return f'Missing required field: {field}'
+        if not isinstance(data[field], str):
+            return f'Field {field} must be a string'
+    
+    if not EMAIL_PATTERN.match(data['email']):
+        return 'Invalid email format'
+    
+    if len(data['seed']) != 7:
+        return 'Seed must be exactly 7 characters'
+    
+    if len(data['password']) < 6:
+        return 'Password must be at least 6 characters'
+    
+    if data.get('skills') is not None:
+        return validate_skill_set(data['skills'])
+    
+    return None
+
+
+
+def validate_skill_set(skills):
+    """Validate the list of skills sent to replace or merge an employee's skill set.
+
+    Returns:
+        An error message, or None when the list is valid.
+    """
+    if not isinstance(skills, list):
+        return 'Expected a list of skills'
+    
+    skill_names = set()
+    for skill_data in skills:
+        if not isinstance(skill_data, dict) or 'skill_name' not in skill_data or 'skill_level' not in skill_data:
+            return 'Missing required fields: skill_name and skill_level'
+        if not isinstance(skill_data['skill_name'], str) or not skill_data['skill_name']:
+            return 'Skill name must be a non-empty string'
+        if not is_valid_skill_level(skill_data['skill_level']):
+            return 'Skill level must be an integer between 0 and 100'
+        if skill_data['skill_name'] in skill_names:
+            return f'Duplicate skill: {skill_data["skill_name"]}'
+        skill_names.add(skill_data['skill_name'])
+    
+    return None
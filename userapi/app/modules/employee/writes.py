@@ -0,0 +1,109 @@
+from sqlalchemy import and_, delete, func, literal, or_, select, true, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db.db import Employee, EmployeeCount, Skill, SkillLevelStat
+
+
+# Single-statement write paths for PostgreSQL. The skill or employee change
+# runs with RETURNING and the skill_level_stats / employee_counts / version
+# updates ride along as data-modifying CTEs, so each write is one round trip.
+# Every CTE sees the snapshot from before the statement, which is what the
+# summaries need: the old rows of whatever is being changed.
+employees = Employee.__table__
+skills = Skill.__table__
+stats = SkillLevelStat.__table__
+counts = EmployeeCount.__table__
+
+SKILL_COLUMNS = ('id', 'skill_name', 'skill_level', 'employee_id')
+
+
+def _bump_version(employee_ids):
+    return update(employees).where(employees.c.id.in_(employee_ids)).values(version=employees.c.version + 1)
+
+
+def update_skill_statement(skill_id, values):
+    """UPDATE ... RETURNING of one skill that also moves it in the summary and bumps its employee."""
+    old = (
+        select(employees.c.department, skills.c.skill_name, skills.c.skill_level)
+        .select_from(skills.join(employees, skills.c.employee_id == employees.c.id))
+        .where(skills.c.id == skill_id)
+        .with_for_update(of=skills)
+        .cte('old_skill')
+    )
+    updated = (
+        update(skills).where(skills.c.id == skill_id).values(**values)
+        .returning(*(skills.c[column] for column in SKILL_COLUMNS))
+        .cte('updated_skill')
+    )
+    changes = union_all(
+        select(old.c.department, old.c.skill_name, old.c.skill_level, literal(-1).label('change'))
+        .where(select(updated.c.id).exists()),
+        select(old.c.department, updated.c.skill_name, updated.c.skill_level, literal(1))
+        .select_from(updated).join(old, true()),
+    ).subquery()
+    # Net change per summary row: ON CONFLICT may touch each row only once
+    net = (
+        select(changes.c.department, changes.c.skill_name, changes.c.skill_level, func.sum(changes.c.change))
+        .group_by(changes.c.department, changes.c.skill_name, changes.c.skill_level)
+        .having(func.sum(changes.c.change) != 0)
+    )
+    upsert = pg_insert(stats).from_select(['department', 'skill_name', 'skill_level', 'skill_count'], net)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[stats.c.department, stats.c.skill_name, stats.c.skill_level],
+        set_={'skill_count': stats.c.skill_count + upsert.excluded.skill_count}
+    )
+    return (
+        select(*(updated.c[column] for column in SKILL_COLUMNS))
+        .add_cte(upsert.cte('moved_stats'), _bump_version(select(updated.c.employee_id)).cte('bumped'))
+    )
+
+
+def delete_skill_statement(skill_id):
+    """DELETE ... RETURNING of one skill that also uncounts it and bumps its employee."""
+    deleted = (
+        delete(skills).where(skills.c.id == skill_id)
+        .returning(skills.c.employee_id, skills.c.skill_name, skills.c.skill_level)
+        .cte('deleted_skill')
+    )
+    uncounted = update(stats).where(
+        employees.c.id == deleted.c.employee_id,
+        stats.c.department == employees.c.department,
+        stats.c.skill_name == deleted.c.skill_name,
+        stats.c.skill_level == deleted.c.skill_level,
+    ).values(skill_count=stats.c.skill_count - 1)
+    return (
+        select(deleted.c.employee_id)
+        .add_cte(uncounted.cte('uncounted_stats'), _bump_version(select(deleted.c.employee_id)).cte('bumped'))
+    )
+
+
+def delete_employee_statement(employee_id):
+    """DELETE ... RETURNING of an employee that also uncounts its skills and the employee.
+
+    The skills themselves go through ON DELETE CASCADE.
+    """
+    removed_skills = (
+        select(employees.c.department, skills.c.skill_name, skills.c.skill_level, func.count().label('removed'))
+        .select_from(skills.join(employees, skills.c.employee_id == employees.c.id))
+        .where(skills.c.employee_id == employee_id)
+        .group_by(employees.c.department, skills.c.skill_name, skills.c.skill_level)
+        .subquery()
+    )
+    uncounted_skills = update(stats).where(
+        stats.c.department == removed_skills.c.department,
+        stats.c.skill_name == removed_skills.c.skill_name,
+        stats.c.skill_level == removed_skills.c.skill_level,
+    ).values(skill_count=stats.c.skill_count - removed_skills.c.removed)
+    deleted = (
+        delete(employees).where(employees.c.id == employee_id)
+        .returning(employees.c.department, employees.c.position)
+        .cte('deleted_employee')
+    )
+    uncounted_employee = update(counts).where(or_(
+        and_(counts.c.dimension == 'department', counts.c.value == deleted.c.department),
+        and_(counts.c.dimension == 'position', counts.c.value == deleted.c.position),
+    )).values(employee_count=counts.c.employee_count - 1)
+    return (
+        select(deleted.c.department, deleted.c.position)
+        .add_cte(uncounted_skills.cte('uncounted_skills'), uncounted_employee.cte('uncounted_employee'))
+    )
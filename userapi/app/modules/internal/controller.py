@@ -0,0 +1,62 @@
+import time
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.boot import IMPORTED_AT
+from app.db.db import db
+from app.db.migrations import current_version, latest_version
+from app.security.hashing import get_hashing_pool
+from app.cache.cache import get_employee_cache
+from app.compression.compression import get_compressor
+from app.db.pool import get_pool_metrics
+from app.metrics.metrics import get_request_metrics
+
+
+class InternalController:
+    """Controller for internal operational endpoints."""
+    
+    def get_stats(self):
+        """Collect runtime statistics for this worker process."""
+        return {
+            'hashing': get_hashing_pool().stats(),
+            'cache': get_employee_cache().stats(),
+            'compression': get_compressor().stats(),
+            'db_pool': get_pool_metrics().stats(),
+            'boot': current_app.extensions['boot'].stats()
+        }, 200
+    
+    def get_metrics(self):
+        """Render this worker's metrics in the Prometheus text format."""
+        metrics = get_request_metrics()
+        if metrics is None:
+            return {'error': 'Metrics are disabled'}, 404
+        return metrics.render(), 200
+    
+    def get_liveness(self):
+        """The process is up and serving requests; deliberately checks nothing else."""
+        return {'status': 'alive', 'uptime_s': round(time.perf_counter() - IMPORTED_AT, 1)}, 200
+    
+    def get_readiness(self):
+        """Whether this worker can serve traffic: database reachable and schema migrated.
+
+        One query per probe. Once the schema has been seen at the latest
+        version it is not checked again, only connectivity.
+        """
+        latest = latest_version()
+        schema_ready = current_app.extensions.get('schema_ready', False)
+        try:
+            with db.engine.connect() as connection:
+                if schema_ready:
+                    connection.exec_driver_sql('SELECT 1')
+                    version = latest
+                else:
+                    version = current_version(connection)
+        except SQLAlchemyError as e:
+            return {'status': 'not ready', 'database': f'unavailable: {e.__class__.__name__}'}, 503
+        
+        if version < latest:
+            return {'status': 'not ready', 'database': 'ok',
+                    'schema': f'version {version}, migrations up to {latest} pending'}, 503
+        current_app.extensions['schema_ready'] = True
+        return {'status': 'ready', 'database': 'ok', 'schema': f'version {version}'}, 200
@@ -0,0 +1,102 @@
+from flask import Blueprint, make_response, jsonify
+from app.metrics.metrics import PROMETHEUS_CONTENT_TYPE
+from app.security.tokens import internal_access_required
+from .controller import InternalController
+
+
+internal_bp = Blueprint('internal', __name__)
+internal_controller = InternalController()
+
+
+@internal_bp.route('/stats', methods=['GET'])
+@internal_access_required
+def get_stats():
+    """Runtime statistics of the worker process serving the request.
+    ---
+    tags:
+      - Internal API
+    responses:
+      200:
+        description: Per-process statistics
+        schema:
+          type: object
+          properties:
+            hashing:
+              type: object
+              description: bcrypt pool queue depth, counters and latency percentiles (ms)
+            cache:
+              type: object
+              description: Employee cache hit, miss and invalidation counters
+            compression:
+              type: object
+              description: Compressed response count, bytes in/out and stored body hits
+            db_pool:
+              type: object
+              description: Connection pool checkouts, wait time (ms), timeouts and overflow in use
+            boot:
+              type: object
+              description: Cold boot time of the worker (ms), split by create_app phase
+      401:
+        description: INTERNAL_TOKEN is set and the bearer token does not match it
+      403:
+        description: No INTERNAL_TOKEN is set and the client is not on a loopback address
+    """
+    result, status_code = internal_controller.get_stats()
+    return make_response(jsonify(result), status_code)
+
+
+@internal_bp.route('/metrics', methods=['GET'])
+@internal_access_required
+def get_metrics():
+    """Metrics of the worker process serving the request, in the Prometheus text format.
+    ---
+    tags:
+      - Internal API
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Request latency per route, SQL statements per request and their time, bcrypt time, pool, cache and hashing counters
+      401:
+        description: INTERNAL_TOKEN is set and the bearer token does not match it
+      403:
+        description: No INTERNAL_TOKEN is set and the client is not on a loopback address
+      404:
+        description: METRICS_ENABLED is off
+    """
+    result, status_code = internal_controller.get_metrics()
+    if status_code != 200:
+        return make_response(jsonify(result), status_code)
+    response = make_response(result, status_code)
+    response.content_type = PROMETHEUS_CONTENT_TYPE
+    return response
+
+
+@internal_bp.route('/health/live', methods=['GET'])
+def liveness():
+    """Liveness probe: the worker process is running.
+    ---
+    tags:
+      - Internal API
+    responses:
+      200:
+        description: The process is alive
+    """
+    result, status_code = internal_controller.get_liveness()
+    return make_response(jsonify(result), status_code)
+
+
+@internal_bp.route('/health/ready', methods=['GET'])
+def readiness():
+    """Readiness probe: the worker can reach the database and the schema is migrated.
+    ---
+    tags:
+      - Internal API
+    responses:
+      200:
+        description: Ready to receive traffic
+      503:
+        description: Database unreachable or migrations pending
+    """
+    result, status_code = internal_controller.get_readiness()
+    return make_response(jsonify(result), status_code)
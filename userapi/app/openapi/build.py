@@ -0,0 +1,29 @@
+"""Write the OpenAPI spec of the API to a static JSON file.
+
+    python -m app.openapi.build [output]
+
+Only the blueprints are registered, so no database or other service is
+needed and this can run while building the image. Serve the file with
+SWAGGER_MODE=static.
+"""
+import sys
+
+from flask import Flask
+
+from app.config.config import BaseConfig
+from app.initialize_functions import initialize_route
+from app.openapi.spec import generate_spec, write_spec
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    output = argv[0] if argv else BaseConfig.SWAGGER_SPEC_FILE
+    app = Flask('app')
+    initialize_route(app)
+    spec = generate_spec(app)
+    write_spec(spec, output)
+    print(f'Wrote {len(spec["paths"])} paths to {output}')
+
+
+if __name__ == '__main__':
+    main()
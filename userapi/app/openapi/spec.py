@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+import threading
+
+from flask import current_app, request
+
+
+def generate_spec(app):
+    """Parse the flasgger docstrings of the app's routes into a Swagger 2.0 document."""
+    from flasgger import Swagger
+    # Not registered on the app: used only for its docstring parser
+    swagger = Swagger()
+    swagger.app = app
+    with app.test_request_context():
+        return swagger.get_apispecs()
+
+
+def write_spec(spec, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as spec_file:
+        json.dump(spec, spec_file, indent=2, sort_keys=True)
+        spec_file.write('\n')
+
+
+class StaticSpec:
+    """A prebuilt spec file served as-is with a strong ETag.
+
+    The file is read on the first request, so workers that never serve the
+    docs never load it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._body = None
+        self._etag = None
+
+    def load(self):
+        with self._lock:
+            if self._body is None:
+                with open(self.path, 'rb') as spec_file:
+                    self._body = spec_file.read()
+                self._etag = hashlib.sha256(self._body).hexdigest()[:32]
+        return self._body, self._etag
+
+    def view(self):
+        try:
+            body, etag = self.load()
+        except FileNotFoundError:
+            return {'error': 'API spec not built; run python -m app.openapi.build'}, 404
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
@@ -0,0 +1,303 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import bcrypt as _bcrypt
+from flask import current_app
+
+
+class HashingBusyError(Exception):
+    """Raised when every hashing slot (running and queued) is taken."""
+
+
+def _password_bytes(password, handle_long_passwords):
+    password = password.encode('utf-8') if isinstance(password, str) else password
+    if handle_long_passwords:
+        password = hashlib.sha256(password).hexdigest().encode('utf-8')
+    return password
+
+
+def hash_password(password, rounds=12, prefix='2b', handle_long_passwords=False):
+    """Hash a password with bcrypt (same format as the hashes Flask-Bcrypt used to store).
+
+    Kept at module level so it can be pickled and run in a worker process.
+    """
+    salt = _bcrypt.gensalt(rounds=rounds, prefix=prefix.encode('utf-8'))
+    return _bcrypt.hashpw(_password_bytes(password, handle_long_passwords), salt).decode('utf-8')
+
+
+def verify_password(pw_hash, password, handle_long_passwords=False):
+    """Check a password against a bcrypt hash in constant time."""
+    pw_hash = pw_hash.encode('utf-8')
+    candidate = _bcrypt.hashpw(_password_bytes(password, handle_long_passwords), pw_hash)
+    return hmac.compare_digest(candidate, pw_hash)
+
+
+def hash_settings(pw_hash):
+    """Return the (prefix, rounds) a bcrypt hash was made with, e.g. ('2b', 12)."""
+    try:
+        _, prefix, rounds, _ = pw_hash.split('$', 3)
+        return prefix, int(rounds)
+    except (AttributeError, ValueError):
+        return None, None
+
+
+def measure_hash_time(rounds, samples=3):
+    """Return the median time in seconds of one bcrypt hash at the given cost."""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hash_password('calibration-password', rounds=rounds)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_rounds(target_ms, min_rounds=4, max_rounds=16, samples=3):
+    """Find the highest bcrypt cost whose hash time stays within target_ms on this host.
+
+    Each extra round doubles the work, so measuring stops at the first cost
+    that goes over the target.
+
+    Returns:
+        A (recommended_rounds, measurements) tuple, where measurements is a
+        list of (rounds, milliseconds) pairs.
+    """
+    recommended, measurements = min_rounds, []
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed_ms = measure_hash_time(rounds, samples) * 1000
+        measurements.append((rounds, elapsed_ms))
+        if elapsed_ms > target_ms:
+            break
+        recommended = rounds
+    return recommended, measurements
+
+
+def _map_chunk(fn, items, kwargs):
+    """Apply fn to each item of a chunk; module level so it runs in a worker process."""
+    return [fn(item, **kwargs) for item in items]
+
+
+def _percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class HashingPool:
+    """Runs bcrypt off the request thread on a bounded worker pool.
+
+    At most `workers` hashes run at once and at most `queue_size` more wait
+    for a worker; any call beyond that fails fast with HashingBusyError so a
+    login storm cannot pile up behind the CPU-bound work.
+
+    Args:
+        mode: 'process' (default), 'thread', or 'inline' to hash on the
+            calling thread (still bounded and measured).
+        workers: Number of workers, defaults to the number of CPUs.
+        queue_size: Number of calls allowed to wait for a free worker.
+        latency_window: How many recent latencies are kept for the stats.
+    """
+
+    def __init__(self, mode='process', workers=None, queue_size=64, latency_window=1024):
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=latency_window)
+        # Callables notified with (function name, seconds) after each call, e.g. metrics
+        self.observers = []
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            mode=config.get('HASHING_EXECUTOR', 'process'),
+            workers=config.get('HASHING_WORKERS'),
+            queue_size=config.get('HASHING_QUEUE_SIZE', 64)
+        )
+
+    def _get_executor(self):
+        # Created on first use so that forked gunicorn workers each get their own pool
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.mode == 'process':
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                            thread_name_prefix='hashing')
+        return self._executor
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn on the pool and wait for its result.
+
+        Raises:
+            HashingBusyError: If no slot is free.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingBusyError('Password hashing capacity exhausted')
+        
+        with self._lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            if self.mode == 'inline':
+                return fn(*args, **kwargs)
+            return self._get_executor().submit(fn, *args, **kwargs).result()
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._latencies.append(elapsed)
+            self._slots.release()
+            for observer in self.observers:
+                observer(fn.__name__, elapsed)
+
+    def map(self, fn, items, max_workers=None, chunksize=4, **kwargs):
+        """Run fn(item, **kwargs) for every item on the pool and return the results in order.
+
+        Takes up to max_workers slots (default: every worker) at once and
+        keeps one small chunk of items per slot on the pool, so calls from
+        other requests interleave with a long batch instead of queueing
+        behind all of it. Each item is counted and reported to the observers
+        as one call.
+
+        Raises:
+            HashingBusyError: If not even one slot is free.
+        """
+        items = list(items)
+        if not items:
+            return []
+        
+        wanted = min(max_workers or self.workers, self.workers, len(items))
+        held = 0
+        while held < wanted and self._slots.acquire(blocking=False):
+            held += 1
+        if not held:
+            with self._lock:
+                self._rejected += 1
+            raise HashingBusyError('Password hashing capacity exhausted')
+        
+        with self._lock:
+            self._in_flight += held
+        chunks = [items[start:start + chunksize] for start in range(0, len(items), chunksize)]
+        results = [None] * len(chunks)
+        started = time.perf_counter()
+        try:
+            if self.mode == 'inline':
+                results = [_map_chunk(fn, chunk, kwargs) for chunk in chunks]
+            else:
+                executor, pending, next_chunk = self._get_executor(), {}, 0
+                try:
+                    while next_chunk < len(chunks) or pending:
+                        while next_chunk < len(chunks) and len(pending) < held:
+                            pending[executor.submit(_map_chunk, fn, chunks[next_chunk], kwargs)] = next_chunk
+                            next_chunk += 1
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            results[pending.pop(future)] = future.result()
+                finally:
+                    for future in pending:
+                        future.cancel()
+            return [result for chunk in results for result in chunk]
+        finally:
+            elapsed = time.perf_counter() - started
+            per_item = elapsed / len(items)
+            with self._lock:
+                self._in_flight -= held
+                self._completed += len(items)
+                self._latencies.extend([per_item] * len(items))
+            for _ in range(held):
+                self._slots.release()
+            for observer in self.observers:
+                for _ in items:
+                    observer(fn.__name__, per_item)
+
+    def stats(self):
+        """Return queue depth, counters and latency percentiles (in ms)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'mode': self.mode,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'in_flight': self._in_flight,
+                'queue_depth': max(0, self._in_flight - self.workers),
+                'completed': self._completed,
+                'rejected': self._rejected,
+            }
+        if latencies:
+            stats['latency_ms'] = {
+                'avg': round(sum(latencies) / len(latencies) * 1000, 2),
+                'p50': round(_percentile(latencies, 50) * 1000, 2),
+                'p95': round(_percentile(latencies, 95) * 1000, 2),
+                'p99': round(_percentile(latencies, 99) * 1000, 2),
+                'max': round(latencies[-1] * 1000, 2),
+            }
+        return stats
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def get_hashing_pool():
+    return current_app.extensions['hashing']
+
+
+def bcrypt_options():
+    """Return the hash_password keyword arguments configured for the current app."""
+    config = current_app.config
+    return {
+        'rounds': config.get('BCRYPT_LOG_ROUNDS', 12),
+        'prefix': config.get('BCRYPT_HASH_PREFIX', '2b'),
+        'handle_long_passwords': config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False),
+    }
+
+
+def generate_password_hash(password):
+    """Hash a password on the app's hashing pool."""
+    return get_hashing_pool().run(hash_password, password, **bcrypt_options())
+
+
+def check_password_hash(pw_hash, password):
+    """Verify a password against a hash on the app's hashing pool."""
+    handle_long_passwords = current_app.config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False)
+    return get_hashing_pool().run(verify_password, pw_hash, password, handle_long_passwords)
+
+
+def password_needs_rehash(pw_hash):
+    """Check whether a hash was made with a different cost or prefix than configured."""
+    options = bcrypt_options()
+    return hash_settings(pw_hash) != (options['prefix'], options['rounds'])
+
+
+def hash_passwords(passwords, max_workers=None):
+    """Hash many passwords in parallel on the app's hashing pool.
+
+    The batch shares the pool's bound with logins and sign-ups, so
+    concurrent imports cannot start more workers and get the same 503
+    when the pool is saturated.
+
+    Args:
+        passwords: The plain text passwords.
+        max_workers: Most pool slots the batch may hold, defaults to every worker.
+
+    Returns:
+        The hashes, in the same order as passwords.
+
+    Raises:
+        HashingBusyError: If no slot is free.
+    """
+    return get_hashing_pool().map(hash_password, passwords, max_workers=max_workers, **bcrypt_options())
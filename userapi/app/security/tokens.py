@@ -0,0 +1,120 @@
+import hashlib
+import hmac
+import ipaddress
+from functools import lru_cache, wraps
+
+from flask import current_app, g, jsonify, make_response, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+
+ACCESS_TOKEN_SALT = 'employee-access-token'
+REFRESH_TOKEN_SALT = 'employee-refresh-token'
+
+
+class TokenError(Exception):
+    """Raised when a token is missing, malformed, tampered with or expired."""
+
+
+@lru_cache(maxsize=8)
+def _serializer(secret_key, salt):
+    # Building a serializer derives the signing key, so reuse one per key and salt
+    return URLSafeTimedSerializer(secret_key, salt=salt,
+                                  signer_kwargs={'digest_method': hashlib.sha256})
+
+
+def _sign(claims, salt):
+    return _serializer(current_app.config['SECRET_KEY'], salt).dumps(claims)
+
+
+def _load(token, salt, max_age):
+    try:
+        return _serializer(current_app.config['SECRET_KEY'], salt).loads(token, max_age=max_age)
+    except SignatureExpired:
+        raise TokenError('Token expired')
+    except BadSignature:
+        raise TokenError('Invalid token')
+
+
+def password_fingerprint(employee):
+    """Short digest of the stored password hash, carried in refresh tokens."""
+    return hashlib.sha256(employee.password_hash.encode()).hexdigest()[:16]
+
+
+def issue_tokens(employee):
+    """Issue a short-lived access token and a longer-lived refresh token.
+
+    Both are HMAC-SHA256 signed with SECRET_KEY, so they can be verified
+    without a database lookup or a password hash. The refresh token also
+    carries a fingerprint of the stored password hash, so changing the
+    password invalidates every refresh token issued before.
+    """
+    access_claims = {'sub': employee.id, 'email': employee.email, 'name': employee.name}
+    refresh_claims = {'sub': employee.id, 'pwd': password_fingerprint(employee)}
+    return {
+        'access_token': _sign(access_claims, ACCESS_TOKEN_SALT),
+        'refresh_token': _sign(refresh_claims, REFRESH_TOKEN_SALT),
+        'token_type': 'Bearer',
+        'expires_in': current_app.config['ACCESS_TOKEN_TTL']
+    }
+
+
+def verify_access_token(token):
+    """Return the claims of a valid access token or raise TokenError."""
+    return _load(token, ACCESS_TOKEN_SALT, current_app.config['ACCESS_TOKEN_TTL'])
+
+
+def verify_refresh_token(token):
+    """Return the claims of a valid refresh token or raise TokenError."""
+    return _load(token, REFRESH_TOKEN_SALT, current_app.config['REFRESH_TOKEN_TTL'])
+
+
+def refresh_token_matches(claims, employee):
+    """Check that a refresh token was issued for the employee's current password."""
+    return hmac.compare_digest(str(claims.get('pwd', '')), password_fingerprint(employee))
+
+
+def token_required(view):
+    """Require a valid `Authorization: Bearer <access token>` header.
+
+    The verified claims are available to the view as `g.token_claims`.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        try:
+            if scheme.lower() != 'bearer' or not token:
+                raise TokenError('Missing bearer token')
+            g.token_claims = verify_access_token(token)
+        except TokenError as e:
+            response = make_response(jsonify({'error': str(e)}), 401)
+            response.headers['WWW-Authenticate'] = 'Bearer'
+            return response
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _is_loopback(address):
+    try:
+        return ipaddress.ip_address(address or '').is_loopback
+    except ValueError:
+        return False
+
+
+def internal_access_required(view):
+    """Restrict an internal endpoint to holders of INTERNAL_TOKEN.
+
+    Without a configured token only loopback clients are served.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get('INTERNAL_TOKEN')
+        if expected:
+            scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+            if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), expected.encode()):
+                response = make_response(jsonify({'error': 'Invalid internal token'}), 401)
+                response.headers['WWW-Authenticate'] = 'Bearer'
+                return response
+        elif not _is_loopback(request.remote_addr):
+            return make_response(jsonify({'error': 'Forbidden'}), 403)
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,62 @@
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.utils import import_string
+
+try:
+    import orjson
+except ImportError:  # optional; create_json_provider falls back to the stdlib encoder
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider encoding with orjson.
+
+    Honours the same settings as the default provider (sort_keys, compact,
+    mimetype) and hands dates and anything orjson does not know to the
+    default provider's `default`, so payloads decode to the same values.
+    Non-ASCII text is written as UTF-8 rather than escaped. Calls passing
+    json.dumps keyword arguments go through the stdlib encoder.
+    """
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'default': DefaultJSONProvider,
+    'orjson': OrjsonProvider,
+}
+
+
+def create_json_provider(app):
+    """Build the JSON provider named by JSON_PROVIDER.
+
+    The value is a key of JSON_PROVIDERS or an import path such as
+    "mypackage.json:Provider". 'orjson' falls back to the default provider
+    when orjson is not installed.
+    """
+    name = app.config.get('JSON_PROVIDER', 'default')
+    if name == 'orjson' and orjson is None:
+        name = 'default'
+    provider_class = JSON_PROVIDERS[name] if name in JSON_PROVIDERS else import_string(name)
+    return provider_class(app)
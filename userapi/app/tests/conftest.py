@@ -1,15 +1,59 @@
 import pytest
 
 from app.app import create_app
+from app.db.db import db
+from app.db.migrations import upgrade
+from app.metrics.query_budget import QueryCounter
 
 
 @pytest.fixture
 def app():
     app = create_app('testing')
     app.config.update({"TESTING": True})
+    with app.app_context():
+        db.drop_all()
+        upgrade(db.engine)
     yield app
 
 
 @pytest.fixture
 def client(app):
-    return app.test_client()
\ No newline at end of file
+    return app.test_client()
+
+
+@pytest.fixture
+def make_employee(client):
+    """Create an employee through the API and return its JSON payload."""
+    counter = {'n': 0}
+
+    def _make_employee(skills=None, **overrides):
+        counter['n'] += 1
+        data = {
+            'name': f'Employee {counter["n"]}',
+            'position': 'Engineer',
+            'email': f'employee{counter["n"]}@company.com',
+            'department': 'Engineering',
+            'seed': 'AB123CD',
+            'password': 'secret123',
+            'skills': skills or [],
+        }
+        data.update(overrides)
+        response = client.post('/api/v1/employees', json=data)
+        assert response.status_code == 201, response.json
+        return response.json['employee']
+
+    return _make_employee
+
+
+@pytest.fixture
+def query_counter(app):
+    """Count the SQL statements run inside a with block.
+
+    Example:
+        with query_counter() as queries:
+            client.get('/api/v1/employees')
+        queries.check(max_queries=2)  # also fails on a statement repeated in a loop
+    """
+    with app.app_context():
+        engine = db.engine
+    return lambda: QueryCounter(engine)
@@ -0,0 +1,85 @@
+from app.db.db import SkillLevelStat
+from app.modules.analytics.aggregates import summarize_levels, rebuild_skill_stats, rebuild_employee_counts
+
+
+def summary_rows(app):
+    with app.app_context():
+        return sorted(
+            (row.department, row.skill_name, row.skill_level, row.skill_count)
+            for row in SkillLevelStat.query.filter(SkillLevelStat.skill_count > 0)
+        )
+
+
+class TestSummarizeLevels():
+    def test_percentiles_and_histogram(self):
+        summary = summarize_levels([(10, 1), (50, 2), (100, 1)])
+        assert summary['count'] == 4
+        assert summary['average'] == 52.5
+        assert summary['percentiles'] == {'p25': 10, 'p50': 50, 'p75': 50, 'p90': 100}
+        assert summary['histogram'][1]['count'] == 1
+        assert summary['histogram'][-1] == {'from': 90, 'to': 100, 'count': 1}
+
+
+class TestSkillAnalytics():
+    def test_summary_follows_writes(self, app, client, make_employee):
+        ann = make_employee(department='Eng', skills=[{'skill_name': 'Python', 'skill_level': 80}])
+        make_employee(department='Eng', skills=[{'skill_name': 'Python', 'skill_level': 60}])
+        client.post('/api/v1/employees/bulk', json=[
+            {'name': 'Cy', 'position': 'Dev', 'email': 'cy@company.com', 'department': 'Ops',
+             'seed': 'CCCCCCC', 'password': 'secret123', 'skills': [{'skill_name': 'Go', 'skill_level': 40}]}
+        ])
+        skill = client.post(f'/api/v1/employees/{ann["id"]}/skills',
+                            json={'skill_name': 'Go', 'skill_level': 20}).json['skill']
+        client.put(f'/api/v1/skills/{skill["id"]}', json={'skill_level': 25})
+
+        response = client.get('/api/v1/analytics/skills?department=Eng')
+        assert response.status_code == 200
+        [eng] = response.json['departments']
+        python = next(s for s in eng['skills'] if s['skill_name'] == 'Python')
+        assert (python['count'], python['average']) == (2, 70)
+        go = next(s for s in eng['skills'] if s['skill_name'] == 'Go')
+        assert (go['min'], go['max']) == (25, 25)
+
+        client.delete(f'/api/v1/skills/{skill["id"]}')
+        client.delete(f'/api/v1/employees/{ann["id"]}')
+        assert summary_rows(app) == [('Eng', 'Python', 60, 1), ('Ops', 'Go', 40, 1)]
+
+    def test_rebuild_matches_incremental_summary(self, app, make_employee):
+        make_employee(department='Eng', skills=[{'skill_name': 'SQL', 'skill_level': 70}])
+        make_employee(department='Eng', skills=[{'skill_name': 'SQL', 'skill_level': 70}])
+        incremental = summary_rows(app)
+        with app.app_context():
+            assert rebuild_skill_stats() == 1
+        assert summary_rows(app) == incremental == [('Eng', 'SQL', 70, 2)]
+
+
+class TestEmployeeCounts():
+    def make_staff(self, client, make_employee):
+        make_employee(department='Eng', position='Dev')
+        make_employee(department='Eng', position='Lead')
+        gone = make_employee(department='Ops', position='Dev')
+        client.post('/api/v1/employees/bulk', json=[
+            {'name': 'Cy', 'position': 'Dev', 'email': 'cy@company.com', 'department': 'Eng',
+             'seed': 'CCCCCCC', 'password': 'secret123'}
+        ])
+        client.delete(f'/api/v1/employees/{gone["id"]}')
+
+    def test_counters_follow_writes(self, app, client, make_employee):
+        self.make_staff(client, make_employee)
+        response = client.get('/api/v1/analytics/employees/counts')
+        assert response.json == {'by': 'department', 'total': 3, 'counts': [{'department': 'Eng', 'count': 3}]}
+        counts = client.get('/api/v1/analytics/employees/counts?by=position').json['counts']
+        assert counts == [{'position': 'Dev', 'count': 2}, {'position': 'Lead', 'count': 1}]
+
+        with app.app_context():
+            assert rebuild_employee_counts() == 3
+        assert client.get('/api/v1/analytics/employees/counts?by=position').json['counts'] == counts
+
+    def test_filtered_counts_and_listing(self, client, make_employee):
+        self.make_staff(client, make_employee)
+        response = client.get('/api/v1/analytics/employees/counts?by=position&department=Eng')
+        assert response.json['counts'] == [{'position': 'Dev', 'count': 2}, {'position': 'Lead', 'count': 1}]
+        assert client.get('/api/v1/analytics/employees/counts?by=seed').status_code == 400
+
+        employees = client.get('/api/v1/employees?department=Eng&position=Dev&fields=name').json['employees']
+        assert [e['name'] for e in employees] == ['Employee 1', 'Cy']
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('greenlet')
+pytest.importorskip('aiosqlite')
+
+from app.asgi.application import ReadAPI, create_async_engine_for
+
+
+def call(api, path, method='GET', headers=()):
+    """Run one request through the ASGI app and return (status, headers, body)."""
+    path, _, query_string = path.partition('?')
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query_string.encode(),
+             'headers': [(name.lower().encode(), value.encode()) for name, value in headers]}
+    asyncio.run(api(scope, receive, send))
+    start, body = sent
+    return start['status'], dict(start['headers']), body['body']
+
+
+@pytest.fixture
+def api(app):
+    api = ReadAPI(app, create_async_engine_for(app))
+    yield api
+    asyncio.run(api.engine.dispose())
+
+
+class TestAsyncReadAPI():
+    def test_matches_flask_routes(self, api, client, make_employee):
+        employee = make_employee(skills=[{'skill_name': 'Go', 'skill_level': 30}])
+
+        for path in (f'/api/v1/employees/{employee["id"]}',
+                     f'/api/v1/employees/by-email/{employee["email"]}',
+                     f'/api/v1/employees/{employee["id"]}/skills'):
+            status, headers, body = call(api, path)
+            flask_response = client.get(path)
+            assert status == 200
+            assert api.flask_app.json.loads(body) == flask_response.json
+            assert headers[b'etag'].decode() == flask_response.headers['ETag']
+
+            status, _, body = call(api, path, headers=[('If-None-Match', flask_response.headers['ETag'])])
+            assert (status, body) == (304, b'')
+
+    def test_sparse_fieldsets_match_flask_routes(self, api, client, make_employee):
+        employee = make_employee(skills=[{'skill_name': 'Go', 'skill_level': 30}])
+
+        for path in (f'/api/v1/employees/{employee["id"]}?fields=name,email',
+                     f'/api/v1/employees/by-email/{employee["email"]}?fields=name&include=skills',
+                     f'/api/v1/employees/{employee["id"]}?fields=salary',
+                     f'/api/v1/employees/{employee["id"]}?fields=',
+                     f'/api/v1/employees/{employee["id"]}?fields=&include='):
+            status, headers, body = call(api, path)
+            flask_response = client.get(path)
+            assert status == flask_response.status_code
+            assert api.flask_app.json.loads(body) == flask_response.json
+            assert headers.get(b'etag', b'').decode() == flask_response.headers.get('ETag', '')
+
+    def test_not_found_and_writes(self, api):
+        assert call(api, '/api/v1/employees/999')[0] == 404
+        assert call(api, '/api/v1/employees')[0] == 404
+        assert call(api, '/api/v1/employees/1', method='DELETE')[0] == 405
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from app.cache.cache import LRUCache, SharedCache, LocalClient
+
+
+class TestBackends():
+    def test_lru_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_lru_expires_entries(self):
+        cache = LRUCache(maxsize=2, ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+        assert cache.get('a') is None
+
+    def test_local_client_evicts_and_expires_entries(self):
+        client = LocalClient(maxsize=2)
+        client.set('a', 1, ex=60)
+        client.set('b', 2, ex=0.01)
+        client.set('c', 3)
+        assert client.get('a') is None
+        time.sleep(0.02)
+        assert client.get('b') is None
+        assert client.get('c') == 3
+        assert len(client) == 1
+
+    def test_shared_cache_round_trips_json(self):
+        cache = SharedCache(LocalClient(), ttl=60)
+        cache.set('k', {'skills': [1, 2]})
+        assert cache.get('k') == {'skills': [1, 2]}
+        cache.delete('k')
+        assert cache.get('k') is None
+
+
+@pytest.mark.parametrize('backend', ['memory', 'local'])
+class TestEmployeeCache():
+    def test_lookups_hit_cache_and_writes_invalidate(self, app, client, make_employee, backend):
+        app.config['CACHE_BACKEND'] = backend
+        from app.initialize_functions import initialize_cache
+        initialize_cache(app)
+
+        employee = make_employee(skills=[{'skill_name': 'Python', 'skill_level': 60}])
+        employee_id = employee['id']
+
+        client.get(f'/api/v1/employees/{employee_id}')
+        client.get(f'/api/v1/employees/by-email/{employee["email"]}')
+        client.get(f'/api/v1/employees/{employee_id}/skills')
+        stats = client.get('/internal/stats').json['cache']
+        # by-email is answered from the response body stored by the by-id request
+        assert (stats['misses'], stats['hits'], stats['body_hits']) == (1, 1, 1)
+
+        skill = client.post(f'/api/v1/employees/{employee_id}/skills',
+                            json={'skill_name': 'Go', 'skill_level': 30}).json['skill']
+        skills = client.get(f'/api/v1/employees/{employee_id}/skills').json['skills']
+        assert sorted(s['skill_name'] for s in skills) == ['Go', 'Python']
+
+        client.put(f'/api/v1/skills/{skill["id"]}', json={'skill_level': 35})
+        by_email = client.get(f'/api/v1/employees/by-email/{employee["email"]}').json['employee']
+        assert {s['skill_name']: s['skill_level'] for s in by_email['skills']}['Go'] == 35
+
+        client.delete(f'/api/v1/skills/{skill["id"]}')
+        assert len(client.get(f'/api/v1/employees/{employee_id}/skills').json['skills']) == 1
+
+        client.delete(f'/api/v1/employees/{employee_id}')
+        assert client.get(f'/api/v1/employees/{employee_id}').status_code == 404
+        assert client.get(f'/api/v1/employees/by-email/{employee["email"]}').status_code == 404
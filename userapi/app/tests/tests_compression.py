@@ -0,0 +1,58 @@
+import gzip
+import json
+
+
+class TestCompression():
+    def test_large_list_is_gzipped(self, client, make_employee):
+        for _ in range(10):
+            make_employee(skills=[{'skill_name': 'Python', 'skill_level': 80}])
+
+        response = client.get('/api/v1/employees', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert len(json.loads(gzip.decompress(response.data))['employees']) == 10
+
+        plain = client.get('/api/v1/employees', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+        assert 'Content-Encoding' not in plain.headers
+        assert len(plain.json['employees']) == 10
+
+    def test_small_response_below_threshold(self, app, client, make_employee):
+        app.extensions['compression'].min_size = 10 ** 6
+        make_employee()
+        response = client.get('/api/v1/employees', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_cached_body_is_served_precompressed(self, app, client, make_employee, query_counter):
+        app.extensions['compression'].min_size = 1
+        employee = make_employee(skills=[{'skill_name': 'Python', 'skill_level': 80}])
+        url = f'/api/v1/employees/{employee["id"]}'
+        headers = {'Accept-Encoding': 'gzip'}
+
+        first = client.get(url, headers=headers)
+        assert first.headers['Content-Encoding'] == 'gzip'
+        etag = first.headers['ETag']
+        assert etag.endswith('-gzip"')
+
+        with query_counter() as queries:
+            second = client.get(url, headers=headers)
+        assert second.data == first.data
+        assert second.headers['ETag'] == etag
+        assert queries.count == 0
+        assert app.extensions['compression'].stored_hits == 1
+
+        revalidated = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert revalidated.status_code == 304
+
+    def test_deleted_employee_body_is_not_served(self, app, client, make_employee):
+        app.extensions['compression'].min_size = 1
+        make_employee()
+        deleted = make_employee(name='Deleted Employee')
+        url = f'/api/v1/employees/{deleted["id"]}'
+        assert client.get(url, headers={'Accept-Encoding': 'gzip'}).status_code == 200
+        client.delete(url)
+
+        created = make_employee(name='New Employee')
+        assert client.get(url, headers={'Accept-Encoding': 'gzip'}).status_code == 404
+        response = client.get(f'/api/v1/employees/{created["id"]}')
+        assert response.json['employee']['name'] == 'New Employee'
+        assert app.extensions['compression'].stored_hits == 0
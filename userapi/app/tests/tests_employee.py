@@ -0,0 +1,449 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.db.db import db, Skill
+from app.modules.employee.writes import update_skill_statement, delete_skill_statement, delete_employee_statement
+
+
+class TestEmployeeList():
+    def test_pages_follow_cursor(self, client, make_employee):
+        ids = [make_employee()['id'] for _ in range(5)]
+
+        first = client.get('/api/v1/employees?limit=2')
+        assert first.status_code == 200
+        assert [e['id'] for e in first.json['employees']] == ids[:2]
+        assert first.json['next_cursor'] == ids[1]
+
+        second = client.get(f'/api/v1/employees?limit=2&after={ids[1]}')
+        assert [e['id'] for e in second.json['employees']] == ids[2:4]
+
+        last = client.get(f'/api/v1/employees?limit=2&after={ids[3]}')
+        assert [e['id'] for e in last.json['employees']] == ids[4:]
+        assert last.json['next_cursor'] is None
+
+    def test_invalid_limit(self, client):
+        assert client.get('/api/v1/employees?limit=0').status_code == 400
+        assert client.get('/api/v1/employees?limit=abc').status_code == 400
+
+    def test_page_query_count_is_constant(self, app, client, make_employee, query_counter):
+        for i in range(6):
+            make_employee(skills=[{'skill_name': 'Python', 'skill_level': 50 + i}])
+
+        with query_counter() as queries:
+            response = client.get('/api/v1/employees?limit=5')
+
+        assert response.status_code == 200
+        assert all(len(e['skills']) == 1 for e in response.json['employees'])
+        assert queries.count == 2
+
+
+class TestFieldsets():
+    def test_list_projection_skips_skills_query(self, app, client, make_employee, query_counter):
+        make_employee(skills=[{'skill_name': 'Python', 'skill_level': 70}])
+
+        with query_counter() as queries:
+            response = client.get('/api/v1/employees?fields=name,department')
+
+        assert response.status_code == 200
+        assert list(response.json['employees'][0]) == ['department', 'id', 'name']
+        assert queries.count == 1
+        assert 'skills' not in queries.statements[0] and 'password' not in queries.statements[0]
+
+        embedded = client.get('/api/v1/employees?fields=name&include=skills')
+        assert embedded.json['employees'][0]['skills'][0]['skill_name'] == 'Python'
+
+    def test_detail_fieldset_and_etag(self, client, make_employee):
+        employee = make_employee(skills=[{'skill_name': 'Go', 'skill_level': 30}])
+        url = f'/api/v1/employees/{employee["id"]}'
+
+        sparse = client.get(f'{url}?fields=email')
+        assert sparse.json['employee'] == {'id': employee['id'], 'email': employee['email']}
+
+        full = client.get(url)
+        assert full.json['employee']['skills'][0]['skill_name'] == 'Go'
+        assert full.headers['ETag'] != sparse.headers['ETag']
+        assert client.get(f'{url}?fields=email',
+                          headers={'If-None-Match': full.headers['ETag']}).status_code == 200
+
+        # Served from the cached full payload this time
+        cached = client.get(f'/api/v1/employees/by-email/{employee["email"]}?fields=name&include=skills')
+        assert cached.json['employee'] == {'id': employee['id'], 'name': employee['name'],
+                                           'skills': full.json['employee']['skills']}
+
+    def test_unknown_field_or_include(self, client, make_employee):
+        employee = make_employee()
+        assert client.get('/api/v1/employees?fields=password').status_code == 400
+        assert client.get(f'/api/v1/employees/{employee["id"]}?include=manager').status_code == 400
+
+
+class TestEmployeeExport():
+    def test_export_streams_ndjson(self, app, client, make_employee):
+        app.config['EXPORT_BATCH_SIZE'] = 2
+        for i in range(5):
+            make_employee(skills=[{'skill_name': 'Go', 'skill_level': i}])
+
+        response = client.get('/api/v1/employees/export')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+
+        lines = response.get_data(as_text=True).splitlines()
+        employees = [json.loads(line) for line in lines]
+        assert len(employees) == 5
+        assert [e['skills'][0]['skill_level'] for e in employees] == [0, 1, 2, 3, 4]
+
+
+class TestEmployeeImport():
+    def test_json_import_reports_row_errors(self, client, make_employee):
+        make_employee(email='taken@company.com')
+        rows = [
+            {'name': 'Ann', 'position': 'Dev', 'email': 'ann@company.com', 'department': 'Eng',
+             'seed': 'AAAAAAA', 'password': 'secret123',
+             'skills': [{'skill_name': 'Python', 'skill_level': 90}]},
+            {'name': 'Bob', 'position': 'Dev', 'email': 'not-an-email', 'department': 'Eng',
+             'seed': 'BBBBBBB', 'password': 'secret123'},
+            {'name': 'Cid', 'position': 'Dev', 'email': 'taken@company.com', 'department': 'Eng',
+             'seed': 'CCCCCCC', 'password': 'secret123'},
+            {'name': 'Dee', 'position': 'Dev', 'email': 'dee@company.com', 'department': 'Eng',
+             'seed': 'DDDDDDD', 'password': 'secret123'},
+        ]
+
+        response = client.post('/api/v1/employees/bulk', json=rows)
+        assert response.status_code == 201
+        assert len(response.json['employee_ids']) == 2
+        assert response.json['errors'] == [
+            {'row': 2, 'error': 'Invalid email format'},
+            {'row': 3, 'error': 'Email already exists'},
+        ]
+
+        ann = client.get('/api/v1/employees/by-email/ann@company.com').json['employee']
+        assert ann['skills'][0]['skill_level'] == 90
+        login = client.post('/api/v1/employees/login',
+                            json={'email': 'dee@company.com', 'password': 'secret123'})
+        assert login.status_code == 200
+
+    def test_csv_upload(self, client):
+        body = (
+            'name,position,email,department,seed,password,skills\n'
+            'Eve,QA,eve@company.com,Quality,EEEEEEE,secret123,Selenium:70;Python:40\n'
+            'Fay,QA,fay@company.com,Quality,FFFFFFF,secret123,Python:high\n'
+        )
+        response = client.post('/api/v1/employees/bulk',
+                               data={'file': (io.BytesIO(body.encode()), 'employees.csv')},
+                               content_type='multipart/form-data')
+        assert response.status_code == 201
+        assert len(response.json['employee_ids']) == 1
+        assert response.json['errors'][0]['row'] == 2
+
+        eve = client.get('/api/v1/employees/by-email/eve@company.com').json['employee']
+        assert sorted(s['skill_name'] for s in eve['skills']) == ['Python', 'Selenium']
+
+    def test_rows_are_inserted_in_one_statement(self, client, query_counter):
+        rows = [
+            {'name': f'Row {n}', 'position': 'Dev', 'email': f'row{n}@company.com', 'department': 'Eng',
+             'seed': 'AAAAAAA', 'password': 'secret123', 'skills': [{'skill_name': 'Go', 'skill_level': n}]}
+            for n in range(20)
+        ]
+        with query_counter() as queries:
+            response = client.post('/api/v1/employees/bulk', json=rows)
+        assert response.status_code == 201
+
+        inserts = [s for s in queries.statements if s.lstrip().upper().startswith('INSERT INTO EMPLOYEES ')]
+        assert len(inserts) == 1
+        ids = response.json['employee_ids']
+        assert [client.get(f'/api/v1/employees/{employee_id}').json['employee']['email'] for employee_id in ids] == \
+            [row['email'] for row in rows]
+
+    def test_emails_are_normalized(self, client, make_employee):
+        make_employee(email='taken@company.com')
+        rows = [
+            {'name': 'Ann', 'position': 'Dev', 'email': 'Ann@Company.com', 'department': 'Eng',
+             'seed': 'AAAAAAA', 'password': 'secret123'},
+            {'name': 'Ann', 'position': 'Dev', 'email': 'ANN@company.com', 'department': 'Eng',
+             'seed': 'AAAAAAA', 'password': 'secret123'},
+            {'name': 'Cid', 'position': 'Dev', 'email': 'Taken@Company.com', 'department': 'Eng',
+             'seed': 'CCCCCCC', 'password': 'secret123'},
+        ]
+
+        response = client.post('/api/v1/employees/bulk', json=rows)
+        assert len(response.json['employee_ids']) == 1
+        assert response.json['errors'] == [
+            {'row': 2, 'error': 'Duplicate email in import'},
+            {'row': 3, 'error': 'Email already exists'},
+        ]
+        assert client.get('/api/v1/employees/by-email/ann@company.com').json['employee']['email'] == 'ann@company.com'
+
+    def test_malformed_rows_are_reported(self, client):
+        def row(n, **overrides):
+            return dict({'name': f'Row {n}', 'position': 'Dev', 'email': f'row{n}@company.com',
+                         'department': 'Eng', 'seed': 'AAAAAAA', 'password': 'secret123'}, **overrides)
+        rows = [
+            row(1, skills=[{'skill_name': 'Python', 'skill_level': 90}]),
+            row(2, seed=1234567),
+            row(3, skills=[5]),
+            row(4, skills=[{'skill_name': None, 'skill_level': 4}]),
+            row(5, skills=['Python']),
+            row(6, skills=[{'skill_name': 'Go', 'skill_level': '4'}]),
+            row(7),
+        ]
+
+        response = client.post('/api/v1/employees/bulk', json=rows)
+        assert response.status_code == 201
+        assert len(response.json['employee_ids']) == 2
+        assert response.json['errors'] == [
+            {'row': 2, 'error': 'Field seed must be a string'},
+            {'row': 3, 'error': 'Missing required fields: skill_name and skill_level'},
+            {'row': 4, 'error': 'Skill name must be a non-empty string'},
+            {'row': 5, 'error': 'Missing required fields: skill_name and skill_level'},
+            {'row': 6, 'error': 'Skill level must be an integer between 0 and 100'},
+        ]
+        assert client.get('/api/v1/employees/by-email/row1@company.com').json['employee']['skills'][0]['skill_name'] == 'Python'
+        assert client.get('/api/v1/employees/by-email/row7@company.com').status_code == 200
+
+    def test_no_valid_rows(self, client):
+        response = client.post('/api/v1/employees/bulk', json=[{'name': 'Nobody'}])
+        assert response.status_code == 400
+        assert response.json['errors'] == [{'row': 1, 'error': 'Missing required field: position'}]
+
+
+class TestEmailCase():
+    def test_lookup_and_login_ignore_case(self, client, make_employee):
+        employee = make_employee(email='Mixed.Case@Company.com')
+        assert employee['email'] == 'mixed.case@company.com'
+
+        for email in ('mixed.case@company.com', 'MIXED.CASE@COMPANY.COM', 'Mixed.Case@company.com'):
+            response = client.get(f'/api/v1/employees/by-email/{email}')
+            assert response.json['employee']['id'] == employee['id']
+            login = client.post('/api/v1/employees/login', json={'email': email, 'password': 'secret123'})
+            assert login.status_code == 200
+        assert client.get('/api/v1/employees/by-email/other@company.com').status_code == 404
+
+    def test_case_only_duplicate_rejected(self, client, make_employee):
+        make_employee(email='ana@company.com')
+        response = client.post('/api/v1/employees', json={
+            'name': 'Ana', 'position': 'Dev', 'email': 'ANA@Company.com', 'department': 'Eng',
+            'seed': 'AB123CD', 'password': 'secret123'})
+        assert response.status_code == 409
+
+    def test_lookup_probes_lower_email_index(self, app, client, make_employee, query_counter):
+        make_employee()
+        with query_counter() as queries:
+            client.get('/api/v1/employees/by-email/Employee1@Company.com')
+
+        lookup, parameters = next((s, p) for s, p in zip(queries.statements, queries.parameters)
+                                  if 'lower(employees.email)' in s)
+        with app.app_context():
+            plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {lookup}', parameters).all()
+        assert any('uq_employees_email_lower' in row[-1] for row in plan)
+
+
+class TestConditionalGet():
+    def test_deleted_employee_etag_is_not_reused(self, client, make_employee):
+        make_employee()
+        deleted = make_employee()
+        url = f'/api/v1/employees/{deleted["id"]}'
+        etag = client.get(url).headers['ETag']
+        assert client.delete(url).status_code == 200
+
+        created = make_employee()
+        assert created['id'] != deleted['id']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 404
+
+    def test_etag_round_trip(self, app, client, make_employee, query_counter):
+        employee = make_employee(skills=[{'skill_name': 'Python', 'skill_level': 60}])
+        url = f'/api/v1/employees/{employee["id"]}'
+
+        first = client.get(url)
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+
+        app.config['CACHE_BACKEND'] = 'null'
+        from app.initialize_functions import initialize_cache
+        initialize_cache(app)
+        with query_counter() as queries:
+            second = client.get(url, headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.data == b''
+        assert queries.count == 1 and 'skills' not in queries.statements[0]
+
+        by_email = client.get(f'/api/v1/employees/by-email/{employee["email"]}',
+                              headers={'If-None-Match': etag})
+        assert by_email.status_code == 304
+
+    def test_skill_change_bumps_version(self, client, make_employee):
+        employee = make_employee()
+        url = f'/api/v1/employees/{employee["id"]}/skills'
+        etag = client.get(url).headers['ETag']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+        client.post(url, json={'skill_name': 'Go', 'skill_level': 10})
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.json['skills'][0]['skill_name'] == 'Go'
+
+
+class TestEmployeeSearch():
+    def make_directory(self, make_employee):
+        return [
+            make_employee(name='Ana Garcia', position='Engineer', department='Engineering'),
+            make_employee(name='Anabel Ruiz', position='Designer', department='Marketing'),
+            make_employee(name='Pedro Torres', position='Engineer', department='Support'),
+        ]
+
+    def test_prefix_terms_all_match(self, client, make_employee):
+        ana, anabel, pedro = self.make_directory(make_employee)
+        found = client.get('/api/v1/employees/search?q=ana').json['employees']
+        assert [e['id'] for e in found] == [ana['id'], anabel['id']]
+        assert set(found[0]) == {'id', 'name', 'position', 'department', 'rank'}
+
+        found = client.get('/api/v1/employees/search?q=eng supp').json['employees']
+        assert [e['id'] for e in found] == [pedro['id']]
+
+    def test_pages_and_fields(self, client, make_employee):
+        ana, anabel, _ = self.make_directory(make_employee)
+        page = client.get('/api/v1/employees/search?q=ana&limit=1&fields=email').json
+        assert page['employees'][0]['email'] == ana['email'] and page['next_cursor'] == 1
+        page = client.get(f'/api/v1/employees/search?q=ana&limit=1&after={page["next_cursor"]}').json
+        assert [e['id'] for e in page['employees']] == [anabel['id']] and page['next_cursor'] is None
+
+    def test_index_follows_writes(self, client, make_employee):
+        ana, _, _ = self.make_directory(make_employee)
+        assert client.delete(f'/api/v1/employees/{ana["id"]}').status_code == 200
+        assert client.get('/api/v1/employees/search?q=garcia').json['employees'] == []
+        client.post('/api/v1/employees/bulk', json=[{
+            'name': 'Marta Garcia', 'position': 'Analyst', 'email': 'marta@company.com',
+            'department': 'Finance', 'seed': 'AB123CD', 'password': 'secret123',
+        }])
+        assert [e['name'] for e in client.get('/api/v1/employees/search?q=garc').json['employees']] == \
+            ['Marta Garcia']
+
+    def test_like_fallback_without_fts_table(self, app, client, make_employee):
+        ana, anabel, _ = self.make_directory(make_employee)
+        with app.app_context():
+            db.session.execute(text('DROP TABLE employees_fts'))
+            db.session.commit()
+        app.extensions.pop('employee_search_fts', None)
+        found = client.get('/api/v1/employees/search?q=ANA').json['employees']
+        assert [e['id'] for e in found] == [ana['id'], anabel['id']]
+
+    def test_missing_query(self, client):
+        assert client.get('/api/v1/employees/search?q=%20').status_code == 400
+
+    def test_negative_cursor(self, client):
+        response = client.get('/api/v1/employees/search?q=ana&after=-5')
+        assert response.status_code == 400
+        assert response.json['error'] == 'Invalid limit or after parameter'
+
+
+class TestSkillSearch():
+    def test_all_and_any_matching(self, client, make_employee):
+        ann = make_employee(skills=[{'skill_name': 'Python', 'skill_level': 90},
+                                    {'skill_name': 'Kubernetes', 'skill_level': 70}])
+        bob = make_employee(skills=[{'skill_name': 'Python', 'skill_level': 85},
+                                    {'skill_name': 'Kubernetes', 'skill_level': 50}])
+        cy = make_employee(skills=[{'skill_name': 'Kubernetes', 'skill_level': 95}])
+
+        response = client.get('/api/v1/skills/search?skill=Python:80&skill=Kubernetes:60')
+        assert response.status_code == 200
+        assert response.json['results'] == [{'employee_id': ann['id'], 'score': 160, 'matched_skills': 2}]
+
+        response = client.get('/api/v1/skills/search?skill=Python:80&skill=Kubernetes:60&match=any')
+        assert [r['employee_id'] for r in response.json['results']] == [ann['id'], cy['id'], bob['id']]
+
+    def test_cursor_pagination(self, client, make_employee):
+        ids = [make_employee(skills=[{'skill_name': 'SQL', 'skill_level': level}])['id']
+               for level in (50, 70, 70, 90)]
+        seen, after = [], ''
+        while True:
+            page = client.get(f'/api/v1/skills/search?skill=SQL&limit=3&after={after}').json
+            seen += [r['employee_id'] for r in page['results']]
+            if not page['next_cursor']:
+                break
+            after = page['next_cursor']
+        assert seen == [ids[3], ids[1], ids[2], ids[0]]
+
+    def test_invalid_terms(self, client):
+        assert client.get('/api/v1/skills/search').status_code == 400
+        assert client.get('/api/v1/skills/search?skill=Python:high').status_code == 400
+        assert client.get('/api/v1/skills/search?skill=Go:1&skill=Go:2').status_code == 400
+
+
+class TestSkillSet():
+    def test_replace_and_merge(self, app, client, make_employee, query_counter):
+        employee = make_employee(skills=[{'skill_name': 'Python', 'skill_level': 50},
+                                         {'skill_name': 'Go', 'skill_level': 40}])
+        url = f'/api/v1/employees/{employee["id"]}/skills'
+
+        with query_counter() as queries:
+            response = client.put(url, json={'skills': [{'skill_name': f'Skill {i}', 'skill_level': i}
+                                                        for i in range(30)] + [{'skill_name': 'Python', 'skill_level': 60}]})
+        assert response.status_code == 200
+        assert len(response.json['skills']) == 31
+        assert queries.count <= 6
+
+        response = client.patch(url, json={'skills': [{'skill_name': 'Go', 'skill_level': 99},
+                                                      {'skill_name': 'Python', 'skill_level': 61}]})
+        levels = {s['skill_name']: s['skill_level'] for s in response.json['skills']}
+        assert len(levels) == 32
+        assert (levels['Go'], levels['Python']) == (99, 61)
+
+        stats = client.get('/api/v1/analytics/skills?skill_name=Python').json['departments'][0]['skills']
+        assert stats[0]['count'] == 1 and stats[0]['max'] == 61
+
+    def test_rejects_duplicates_and_unknown_employee(self, client, make_employee):
+        employee = make_employee()
+        url = f'/api/v1/employees/{employee["id"]}/skills'
+        duplicate = [{'skill_name': 'Go', 'skill_level': 1}, {'skill_name': 'Go', 'skill_level': 2}]
+        assert client.put(url, json=duplicate).status_code == 400
+        assert client.put('/api/v1/employees/999/skills', json=[]).status_code == 404
+
+    def test_create_skill_conflict(self, client, make_employee):
+        employee = make_employee(skills=[{'skill_name': 'Go', 'skill_level': 1}])
+        url = f'/api/v1/employees/{employee["id"]}/skills'
+        assert client.post(url, json={'skill_name': 'Go', 'skill_level': 5}).status_code == 409
+        other = client.post(url, json={'skill_name': 'Rust', 'skill_level': 5}).json['skill']
+        assert client.put(f'/api/v1/skills/{other["id"]}', json={'skill_name': 'Go'}).status_code == 409
+
+
+class TestWritePaths():
+    @pytest.mark.parametrize('statement', [
+        update_skill_statement(1, {'skill_level': 20}), delete_skill_statement(1), delete_employee_statement(1),
+    ])
+    def test_postgres_writes_are_one_statement(self, statement):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert sql.startswith('WITH ') and sql.count('RETURNING') == 1
+        assert 'skill_level_stats' in sql
+
+    def test_delete_employee_cascades_without_loading_skills(self, app, client, make_employee, query_counter):
+        employee = make_employee(skills=[{'skill_name': f'Skill {i}', 'skill_level': i} for i in range(20)])
+
+        with query_counter() as queries:
+            response = client.delete(f'/api/v1/employees/{employee["id"]}')
+
+        assert response.status_code == 200
+        assert not any(s.lstrip().upper().startswith('SELECT') for s in queries.statements)
+        with app.app_context():
+            assert Skill.query.count() == 0
+        assert client.delete(f'/api/v1/employees/{employee["id"]}').status_code == 404
+
+    def test_update_and_delete_skill(self, client, make_employee):
+        employee = make_employee(skills=[{'skill_name': 'Go', 'skill_level': 10}])
+        skill_id = employee['skills'][0]['id']
+
+        response = client.put(f'/api/v1/skills/{skill_id}', json={'skill_level': 20})
+        assert response.json['skill'] == {'id': skill_id, 'skill_name': 'Go', 'skill_level': 20,
+                                          'employee_id': employee['id']}
+        assert client.put(f'/api/v1/skills/{skill_id}', json={}).status_code == 400
+        response = client.put(f'/api/v1/skills/{skill_id}', json={'skill_name': None})
+        assert response.status_code == 400
+        assert response.json['error'] == 'Skill name must be a non-empty string'
+        assert client.put(f'/api/v1/skills/{skill_id}', json={'skill_name': ''}).status_code == 400
+        assert client.put('/api/v1/skills/999', json={'skill_level': 1}).status_code == 404
+
+        assert client.delete(f'/api/v1/skills/{skill_id}').status_code == 200
+        assert client.delete(f'/api/v1/skills/{skill_id}').status_code == 404
+        assert client.get(f'/api/v1/employees/{employee["id"]}/skills').json['skills'] == []
@@ -0,0 +1,57 @@
+from app.metrics.metrics import Histogram
+
+
+class TestHistogram():
+    def test_cumulative_buckets(self):
+        histogram = Histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, '/a')
+        lines = histogram.render()
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'latency_seconds_count{route="/a"} 4' in lines
+
+
+class TestRequestMetrics():
+    def test_server_timing_header(self, client, make_employee):
+        employee = make_employee()
+        response = client.get(f'/api/v1/employees/{employee["id"]}')
+        timing = response.headers['Server-Timing']
+        assert timing.startswith('app;dur=')
+        assert 'db;dur=' in timing and 'queries"' in timing
+
+    def test_sign_up_reports_bcrypt_time(self, client):
+        response = client.post('/api/v1/employees', json={
+            'name': 'Ana', 'position': 'Engineer', 'email': 'ana@company.com', 'department': 'Engineering',
+            'seed': 'AB123CD', 'password': 'secret123', 'skills': [],
+        })
+        assert 'bcrypt;dur=' in response.headers['Server-Timing']
+
+    def test_prometheus_endpoint(self, client, make_employee):
+        employee = make_employee()
+        client.get(f'/api/v1/employees/{employee["id"]}')
+        response = client.get('/internal/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        body = response.get_data(as_text=True)
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/employees/<int:employee_id>",' \
+               'status="200"} 1' in body
+        assert 'http_request_db_queries_bucket{method="POST",route="/api/v1/employees",le="+Inf"} 1' in body
+        assert 'bcrypt_duration_seconds_count{operation=' in body
+        assert 'db_query_duration_seconds_count ' in body
+        assert 'db_pool_checkouts_total ' in body
+
+
+class TestInternalAccess():
+    def test_remote_client_needs_token(self, app, client):
+        remote = {'REMOTE_ADDR': '203.0.113.7'}
+        assert client.get('/internal/stats', environ_base=remote).status_code == 403
+        assert client.get('/internal/metrics', environ_base=remote).status_code == 403
+        assert client.get('/internal/health/live', environ_base=remote).status_code == 200
+
+        app.config['INTERNAL_TOKEN'] = 'scrape-me'
+        assert client.get('/internal/stats').status_code == 401
+        response = client.get('/internal/metrics', environ_base=remote,
+                              headers={'Authorization': 'Bearer scrape-me'})
+        assert response.status_code == 200
@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from app.db.health import wait_for_database
+from app.db.migrations import upgrade, current_version, latest_version
+
+
+# Schema the app used to create with create_all, before the migrations existed
+LEGACY_SCHEMA = (
+    'CREATE TABLE employees (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, '
+    'position VARCHAR(100) NOT NULL, email VARCHAR(120) NOT NULL UNIQUE, department VARCHAR(100) NOT NULL, '
+    'password_hash VARCHAR(255) NOT NULL, seed VARCHAR(7) NOT NULL)',
+    'CREATE TABLE skills (id INTEGER PRIMARY KEY, skill_name VARCHAR(100) NOT NULL, '
+    'skill_level INTEGER NOT NULL, employee_id INTEGER NOT NULL REFERENCES employees (id))',
+)
+
+
+class TestMigrations():
+    def test_upgrades_legacy_database(self, tmp_path):
+        engine = create_engine(f'sqlite:///{tmp_path}/legacy.db')
+        with engine.begin() as connection:
+            for statement in LEGACY_SCHEMA:
+                connection.execute(text(statement))
+            connection.execute(text("INSERT INTO employees VALUES (1, 'Ana', 'Dev', ' Ana@Company.com', 'R&D', 'x', 'AB123CD')"))
+            connection.execute(text("INSERT INTO skills VALUES (1, 'Go', 40, 1), (2, 'Go', 70, 1), (3, 'SQL', 50, 1)"))
+
+        applied = upgrade(engine)
+        assert [version for version, _ in applied] == list(range(1, latest_version() + 1))
+        assert upgrade(engine) == []
+
+        with engine.begin() as connection:
+            assert current_version(connection) == latest_version()
+            assert connection.execute(text('SELECT version FROM employees')).scalar() == 1
+            assert connection.execute(text('SELECT email FROM employees')).scalar() == 'ana@company.com'
+            assert connection.execute(text('SELECT id FROM skills ORDER BY id')).scalars().all() == [1, 3]
+            assert connection.execute(text('SELECT SUM(skill_count) FROM skill_level_stats')).scalar() == 2
+            foreign_key = inspect(connection).get_foreign_keys('skills')[0]
+            assert foreign_key['options']['ondelete'] == 'CASCADE'
+            assert foreign_key['referred_table'] == 'employees'
+            assert connection.execute(text('PRAGMA foreign_keys')).scalar() == 1
+
+    def test_fresh_database_migrates_step_by_step(self, tmp_path):
+        engine = create_engine(f'sqlite:///{tmp_path}/fresh.db')
+        assert [version for version, _ in upgrade(engine, target=1)] == [1]
+        with engine.begin() as connection:
+            inspector = inspect(connection)
+            assert set(inspector.get_table_names()) == {'schema_migrations', 'employees', 'skills'}
+            assert 'version' not in {column['name'] for column in inspector.get_columns('employees')}
+            assert inspector.get_indexes('skills') == []
+
+        upgrade(engine)
+        with engine.begin() as connection:
+            inspector = inspect(connection)
+            assert {'skill_level_stats', 'employee_counts'} <= set(inspector.get_table_names())
+            assert 'version' in {column['name'] for column in inspector.get_columns('employees')}
+            assert inspector.get_unique_constraints('employees') == []
+            assert {'ix_employees_department_id', 'ix_employees_position_id'} <= \
+                {index['name'] for index in inspector.get_indexes('employees')}
+            assert inspector.get_foreign_keys('skills')[0]['options']['ondelete'] == 'CASCADE'
+
+    def test_employee_ids_are_never_reused(self, tmp_path):
+        engine = create_engine(f'sqlite:///{tmp_path}/legacy.db')
+        with engine.begin() as connection:
+            for statement in LEGACY_SCHEMA:
+                connection.execute(text(statement))
+            connection.execute(text("INSERT INTO employees VALUES (1, 'Ana', 'Dev', 'ana@company.com', 'R&D', 'x', 'AB123CD'), "
+                                    "(2, 'Bo', 'Dev', 'bo@company.com', 'R&D', 'x', 'AB123CD')"))
+            connection.execute(text("INSERT INTO skills VALUES (1, 'Go', 40, 2)"))
+        upgrade(engine)
+
+        with engine.begin() as connection:
+            assert connection.execute(text('SELECT employee_id FROM skills')).scalars().all() == [2]
+            connection.execute(text('DELETE FROM employees WHERE id = 2'))
+            assert connection.execute(text('SELECT COUNT(*) FROM skills')).scalar() == 0
+            connection.execute(text("INSERT INTO employees (name, position, email, department, password_hash, seed) "
+                                    "VALUES ('Cy', 'Dev', 'cy@company.com', 'R&D', 'x', 'AB123CD')"))
+            assert connection.execute(text("SELECT id FROM employees WHERE name = 'Cy'")).scalar() == 3
+
+    def test_email_index_refuses_case_duplicates(self, tmp_path):
+        engine = create_engine(f'sqlite:///{tmp_path}/legacy.db')
+        with engine.begin() as connection:
+            for statement in LEGACY_SCHEMA:
+                connection.execute(text(statement))
+            connection.execute(text(
+                "INSERT INTO employees VALUES (1, 'Ana', 'Dev', 'ana@company.com', 'R&D', 'x', 'AB123CD'), "
+                "(2, 'Ana', 'Dev', 'ANA@company.com', 'R&D', 'x', 'AB123CD')"
+            ))
+
+        with pytest.raises(RuntimeError, match='ana@company.com'):
+            upgrade(engine)
+        with engine.begin() as connection:
+            # Stopped at migration 7, the email index
+            assert current_version(connection) == 6
+
+    def test_wait_for_database_gives_up_after_timeout(self, tmp_path):
+        engine = create_engine(f'sqlite:///{tmp_path}/missing/dir/app.db')
+        with pytest.raises(OperationalError):
+            wait_for_database(engine, timeout=0.3, initial_delay=0.05)
+
+
+class TestHealth():
+    def test_liveness_and_readiness(self, app, client):
+        assert client.get('/internal/health/live').json['status'] == 'alive'
+        assert client.get('/internal/health/ready').status_code == 200
+
+        boot = client.get('/internal/stats').json['boot']
+        assert boot['boot_ms'] > 0 and 'db' in boot['phases']
+
+    def test_not_ready_with_pending_migrations(self, app, client):
+        from app.db.db import db
+        with app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(text('DELETE FROM schema_migrations WHERE version > 1'))
+        response = client.get('/internal/health/ready')
+        assert response.status_code == 503
+        assert 'pending' in response.json['schema']
@@ -0,0 +1,43 @@
+import json
+
+from flask import Flask
+
+from app.initialize_functions import initialize_route, initialize_swagger
+from app.openapi.spec import generate_spec, write_spec
+
+
+def static_app(spec_path, ui):
+    app = Flask('app')
+    app.config.update(SWAGGER_MODE='static', SWAGGER_UI=ui, SWAGGER_SPEC_FILE=str(spec_path))
+    initialize_route(app)
+    initialize_swagger(app)
+    return app
+
+
+class TestOpenApi():
+    def test_build_and_serve_static_spec(self, tmp_path):
+        spec_path = tmp_path / 'openapi.json'
+        write_spec(generate_spec(static_app(spec_path, ui=False)), spec_path)
+        assert '/api/v1/employees/{employee_id}' in json.loads(spec_path.read_text())['paths']
+
+        client = static_app(spec_path, ui=False).test_client()
+        response = client.get('/apispec_1.json')
+        assert response.status_code == 200
+        assert response.data == spec_path.read_bytes()
+        etag = response.headers['ETag']
+        assert client.get('/apispec_1.json', headers={'If-None-Match': etag}).status_code == 304
+        assert client.get('/apidocs/').status_code == 404
+
+    def test_static_spec_behind_docs_page(self, tmp_path):
+        spec_path = tmp_path / 'openapi.json'
+        spec_path.write_text('{"paths": {}}')
+        client = static_app(spec_path, ui=True).test_client()
+        assert client.get('/apispec_1.json').json == {'paths': {}}
+        assert client.get('/apidocs/').status_code == 200
+
+    def test_missing_spec_file(self, tmp_path):
+        client = static_app(tmp_path / 'missing.json', ui=False).test_client()
+        assert client.get('/apispec_1.json').status_code == 404
+
+    def test_dynamic_spec_parses(self, client):
+        assert client.get('/apispec_1.json').status_code == 200
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import NullPool
+
+from app.db.pool import PoolMetrics, TimedQueuePool, engine_options
+
+
+POSTGRES = 'postgresql://user:password@db:5432/employees'
+
+
+class TestPoolConfig():
+    def test_postgres_options(self):
+        options = engine_options({
+            'SQLALCHEMY_DATABASE_URI': POSTGRES, 'DB_POOL_SIZE': 7, 'DB_MAX_OVERFLOW': 3,
+            'DB_POOL_RECYCLE': 600, 'DB_STATEMENT_TIMEOUT_MS': 5000,
+        })
+        assert options['poolclass'] is TimedQueuePool
+        assert (options['pool_size'], options['max_overflow'], options['pool_recycle']) == (7, 3, 600)
+        assert options['pool_pre_ping'] is True
+        assert options['connect_args'] == {'options': '-c statement_timeout=5000'}
+
+    def test_pgbouncer_mode_leaves_pooling_to_pgbouncer(self):
+        options = engine_options({'SQLALCHEMY_DATABASE_URI': POSTGRES, 'DB_PGBOUNCER': True,
+                                  'DB_STATEMENT_TIMEOUT_MS': 5000})
+        assert options == {'poolclass': NullPool}
+
+    def test_sqlite_keeps_its_pool(self):
+        options = engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:///testing.db'})
+        assert 'poolclass' not in options and 'pool_size' not in options
+
+
+class TestPoolMetrics():
+    def test_checkouts_overflow_and_wait(self):
+        engine = create_engine('sqlite://', poolclass=TimedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05)
+        metrics = PoolMetrics().attach(engine)
+        connections = [engine.connect(), engine.connect()]
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+        stats = metrics.stats()
+        assert (stats['checkouts'], stats['checked_out'], stats['overflow'], stats['timeouts']) == (2, 2, 1, 1)
+        assert stats['wait_ms']['max'] >= 50
+        for connection in connections:
+            connection.close()
+        assert metrics.stats()['checkins'] == 2
+
+    def test_stats_endpoint(self, client):
+        stats = client.get('/internal/stats').json['db_pool']
+        assert stats['checkouts'] >= 1
@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy import text
+
+from app.db.db import db
+from app.metrics.query_budget import (
+    QueryBudgetExceeded, batched_queries, query_budget, repeated_shapes, statement_shape
+)
+
+
+class TestStatementShape():
+    def test_literals_and_in_lists_collapse(self):
+        assert statement_shape("SELECT * FROM skills WHERE employee_id = 7 AND skill_name = 'Go'") == \
+            statement_shape("SELECT * FROM skills  WHERE employee_id = 12 AND skill_name = 'Rust'")
+        assert statement_shape('SELECT * FROM skills WHERE employee_id IN (?, ?, ?)') == \
+            'SELECT * FROM skills WHERE employee_id IN (?)'
+
+    def test_repeats_above_threshold(self):
+        statements = [f'SELECT * FROM skills WHERE employee_id = {n}' for n in range(4)]
+        assert list(repeated_shapes(statements).values()) == [4]
+        assert repeated_shapes(statements[:3]) == {}
+
+
+class TestQueryBudgetGuard():
+    @pytest.fixture
+    def loop_client(self, app):
+        @app.route('/loop/<int:n>')
+        @query_budget(10)
+        def loop(n):
+            for employee_id in range(n):
+                db.session.execute(text(f'SELECT id FROM employees WHERE id = {employee_id}'))
+            return {}
+
+        @app.route('/over-budget')
+        @query_budget(1)
+        def over_budget():
+            db.session.execute(text('SELECT 1'))
+            db.session.execute(text('SELECT 2'))
+            return {}
+
+        return app.test_client()
+
+    def test_over_budget_fails(self, loop_client):
+        with pytest.raises(QueryBudgetExceeded, match='2 queries, budget 1'):
+            loop_client.get('/over-budget')
+
+    def test_repeated_statement_fails(self, loop_client):
+        assert loop_client.get('/loop/3').status_code == 200
+        with pytest.raises(QueryBudgetExceeded, match='N\\+1'):
+            loop_client.get('/loop/4')
+
+    def test_over_budget_write_is_not_committed(self, app, loop_client):
+        @app.route('/write')
+        @query_budget(1)
+        def write():
+            db.session.execute(text('SELECT 1'))
+            db.session.execute(text("INSERT INTO employee_counts VALUES ('department', 'Budget', 1)"))
+            db.session.commit()
+            return {}
+
+        with pytest.raises(QueryBudgetExceeded):
+            loop_client.get('/write')
+        with app.app_context():
+            assert db.session.execute(text("SELECT COUNT(*) FROM employee_counts WHERE value = 'Budget'")).scalar() == 0
+
+    def test_batched_chunks_count_once(self, app, loop_client):
+        @app.route('/chunks/<int:n>')
+        @query_budget(2)
+        def chunks(n):
+            with batched_queries():
+                for start in range(n):
+                    db.session.execute(text(f'SELECT id FROM employees WHERE id IN ({start}, {start + 1})'))
+            db.session.execute(text('SELECT 1'))
+            return {}
+
+        assert loop_client.get('/chunks/10').status_code == 200
+
+    def test_warn_mode_logs(self, app, loop_client, caplog):
+        app.extensions['query_budget'].mode = 'warn'
+        assert loop_client.get('/over-budget').status_code == 200
+        assert 'Query budget: GET /over-budget: 2 queries, budget 1' in caplog.text
+
+
+class TestRouteBudgets():
+    def test_listing_does_not_grow_with_the_page(self, client, make_employee, query_counter):
+        for _ in range(10):
+            make_employee(skills=[{'skill_name': 'Python', 'skill_level': 80}])
+        with query_counter() as queries:
+            assert client.get('/api/v1/employees?limit=10').status_code == 200
+        queries.check(max_queries=2)
+
+    def test_sign_up_inserts_skills_in_one_statement(self, client, make_employee, query_counter):
+        skills = [{'skill_name': f'Skill {n}', 'skill_level': 50} for n in range(8)]
+        with query_counter() as queries:
+            make_employee(skills=skills)
+        queries.check(max_queries=6)
+
+    def test_large_import_stays_within_budget(self, client):
+        rows = [
+            {'name': f'Row {n}', 'position': 'Dev', 'email': f'row{n}@company.com', 'department': 'Eng',
+             'seed': 'AAAAAAA', 'password': 'secret123'}
+            for n in range(1200)
+        ]
+        response = client.post('/api/v1/employees/bulk', json=rows)
+        assert response.status_code == 201
+        assert len(response.json['employee_ids']) == 1200
+
+    def test_delete_employee(self, client, make_employee, query_counter):
+        employee = make_employee(skills=[{'skill_name': 'Go', 'skill_level': 60}])
+        with query_counter() as queries:
+            assert client.delete(f'/api/v1/employees/{employee["id"]}').status_code == 200
+        queries.check(max_queries=3)
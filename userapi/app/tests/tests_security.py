@@ -0,0 +1,161 @@
+import threading
+
+import pytest
+
+from app.db.db import db, Employee
+from app.security.hashing import HashingPool, HashingBusyError, hash_password, verify_password, hash_settings
+
+
+class TestHashingPool():
+    def test_hash_round_trip(self):
+        pool = HashingPool(mode='thread', workers=2)
+        pw_hash = pool.run(hash_password, 'secret123', rounds=4)
+        assert pool.run(verify_password, pw_hash, 'secret123')
+        assert not pool.run(verify_password, pw_hash, 'wrong')
+        assert pool.stats()['completed'] == 3
+        pool.shutdown()
+
+    def test_rejects_when_saturated(self):
+        pool = HashingPool(mode='thread', workers=1, queue_size=0)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        worker = threading.Thread(target=pool.run, args=(block,))
+        worker.start()
+        started.wait(5)
+        try:
+            assert pool.stats()['in_flight'] == 1
+            with pytest.raises(HashingBusyError):
+                pool.run(hash_password, 'secret123', rounds=4)
+        finally:
+            release.set()
+            worker.join()
+        assert pool.stats()['rejected'] == 1
+        pool.shutdown()
+
+    def test_map_keeps_order_within_its_slots(self):
+        pool = HashingPool(mode='thread', workers=3, queue_size=0)
+        assert pool.map(str.upper, ['a', 'b', 'c', 'd', 'e'], max_workers=2, chunksize=2) == ['A', 'B', 'C', 'D', 'E']
+        assert pool.stats()['completed'] == 5
+        assert pool.stats()['in_flight'] == 0
+        for _ in range(3):
+            pool._slots.acquire()
+        with pytest.raises(HashingBusyError):
+            pool.map(str.upper, ['a'])
+        pool.shutdown()
+
+    def test_login_returns_503_when_saturated(self, app, client, make_employee):
+        employee = make_employee()
+        app.extensions['hashing'] = HashingPool(mode='inline', workers=1, queue_size=0)
+        app.extensions['hashing']._slots.acquire()
+
+        response = client.post('/api/v1/employees/login',
+                               json={'email': employee['email'], 'password': 'secret123'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+        stats = client.get('/internal/stats').json
+        assert stats['hashing']['rejected'] == 1
+
+    def test_import_returns_503_when_saturated(self, app, client):
+        app.extensions['hashing'] = HashingPool(mode='inline', workers=1, queue_size=0)
+        app.extensions['hashing']._slots.acquire()
+
+        response = client.post('/api/v1/employees/bulk', json=[
+            {'name': 'Ann', 'position': 'Dev', 'email': 'ann@company.com', 'department': 'Eng',
+             'seed': 'AAAAAAA', 'password': 'secret123'}])
+        assert response.status_code == 503
+        assert client.get('/api/v1/employees/by-email/ann@company.com').status_code == 404
+
+
+class TestTokens():
+    def login(self, client, employee):
+        response = client.post('/api/v1/employees/login',
+                               json={'email': employee['email'], 'password': 'secret123'})
+        assert response.status_code == 200
+        return response.json
+
+    def test_access_token_identifies_employee(self, client, make_employee):
+        employee = make_employee()
+        tokens = self.login(client, employee)
+        assert tokens['token_type'] == 'Bearer'
+
+        response = client.get('/api/v1/employees/me',
+                              headers={'Authorization': f'Bearer {tokens["access_token"]}'})
+        assert response.status_code == 200
+        assert response.json['employee'] == {
+            'id': employee['id'], 'email': employee['email'], 'name': employee['name']
+        }
+
+    def test_rejects_missing_tampered_and_expired_tokens(self, app, client, make_employee):
+        tokens = self.login(client, make_employee())
+        assert client.get('/api/v1/employees/me').status_code == 401
+
+        tampered = tokens['access_token'][:-2] + 'xx'
+        response = client.get('/api/v1/employees/me', headers={'Authorization': f'Bearer {tampered}'})
+        assert response.status_code == 401
+
+        # A refresh token is not accepted where an access token is expected
+        response = client.get('/api/v1/employees/me',
+                              headers={'Authorization': f'Bearer {tokens["refresh_token"]}'})
+        assert response.status_code == 401
+
+        app.config['ACCESS_TOKEN_TTL'] = -1
+        response = client.get('/api/v1/employees/me',
+                              headers={'Authorization': f'Bearer {tokens["access_token"]}'})
+        assert response.status_code == 401
+        assert response.json['error'] == 'Token expired'
+
+    def test_refresh_issues_new_pair(self, client, make_employee):
+        employee = make_employee()
+        tokens = self.login(client, employee)
+
+        response = client.post('/api/v1/employees/token/refresh',
+                               json={'refresh_token': tokens['refresh_token']})
+        assert response.status_code == 200
+        me = client.get('/api/v1/employees/me',
+                        headers={'Authorization': f'Bearer {response.json["access_token"]}'})
+        assert me.json['employee']['id'] == employee['id']
+
+        client.delete(f'/api/v1/employees/{employee["id"]}')
+        response = client.post('/api/v1/employees/token/refresh',
+                               json={'refresh_token': tokens['refresh_token']})
+        assert response.status_code == 401
+
+    def test_password_change_invalidates_refresh_token(self, app, client, make_employee):
+        employee = make_employee()
+        tokens = self.login(client, employee)
+
+        with app.app_context():
+            db.session.get(Employee, employee['id']).set_password('changed123')
+            db.session.commit()
+        response = client.post('/api/v1/employees/token/refresh',
+                               json={'refresh_token': tokens['refresh_token']})
+        assert response.status_code == 401
+
+
+class TestBcryptCost():
+    def test_login_rehashes_to_configured_cost(self, app, client, make_employee):
+        employee = make_employee()
+        app.config['BCRYPT_LOG_ROUNDS'] = 5
+
+        response = client.post('/api/v1/employees/login',
+                               json={'email': employee['email'], 'password': 'secret123'})
+        assert response.status_code == 200
+
+        with app.app_context():
+            stored = Employee.query.get(employee['id']).password_hash
+        assert hash_settings(stored) == ('2b', 5)
+
+        response = client.post('/api/v1/employees/login',
+                               json={'email': employee['email'], 'password': 'secret123'})
+        assert response.status_code == 200
+
+    def test_calibrate_command(self, app):
+        result = app.test_cli_runner().invoke(
+            args=['calibrate-bcrypt', '--target-ms', '10000', '--max-rounds', '5', '--samples', '1'])
+        assert result.exit_code == 0
+        assert 'Recommended BCRYPT_LOG_ROUNDS=5' in result.output
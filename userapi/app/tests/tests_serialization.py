@@ -0,0 +1,27 @@
+import json
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+from app.serialization.json_provider import OrjsonProvider, create_json_provider
+
+
+class TestJsonProvider():
+    def test_orjson_matches_default_provider(self, app):
+        assert isinstance(app.json, OrjsonProvider)
+        payload = {'b': [1, 2.5, None], 'a': 'ñandú', 'c': Decimal('1.5')}
+        stdlib = DefaultJSONProvider(app)
+        assert json.loads(app.json.dumps(payload)) == json.loads(stdlib.dumps(payload))
+        assert app.json.dumps({'b': 1, 'a': 2}) == '{"a":2,"b":1}'
+
+    def test_provider_is_configurable(self, app):
+        app.config['JSON_PROVIDER'] = 'default'
+        assert type(create_json_provider(app)) is DefaultJSONProvider
+        app.config['JSON_PROVIDER'] = 'app.serialization.json_provider:OrjsonProvider'
+        assert type(create_json_provider(app)) is OrjsonProvider
+
+    def test_list_payload_unchanged(self, client, make_employee):
+        employee = make_employee(skills=[{'skill_name': 'SQL', 'skill_level': 40}])
+        response = client.get('/api/v1/employees')
+        assert response.mimetype == 'application/json'
+        assert response.json['employees'] == [employee]
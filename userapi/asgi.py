@@ -0,0 +1,12 @@
+import os
+from app.asgi.application import create_asgi_app
+
+# Async read API (employee lookups), run with e.g. `uvicorn asgi:app`.
+# Needs the packages in requirements-asgi.txt.
+config = os.getenv('FLASK_ENV', 'production')
+
+# Use docker config when DATABASE_URL points to PostgreSQL
+if os.getenv('DATABASE_URL') and 'postgresql' in os.getenv('DATABASE_URL', ''):
+    config = 'docker'
+
+app = create_asgi_app(config)
@@ -0,0 +1,148 @@
+"""Bulk generator of a reproducible benchmark dataset.
+
+Run from the userapi directory:
+
+    python -m benchmarks.dataset --employees 100000 --skills 10
+
+Fills the database of the app (DATABASE_URL, default sqlite:///benchmark.db)
+with generated employees and skills. The same --seed always produces the same
+rows, so runs on different commits measure the same data. Every employee's
+password is DATASET_PASSWORD. Prints the row counts and load time as JSON.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///benchmark.db')
+
+from sqlalchemy import insert, text
+
+from app.app import create_app
+from app.db.db import db, Employee, Skill
+from app.db.migrations import upgrade
+from app.modules.analytics.aggregates import fill_employee_counts, fill_skill_stats
+from app.modules.employee.importer import copy_rows
+from app.security.hashing import bcrypt_options, hash_password
+
+DATASET_PASSWORD = 'benchmark123'
+
+DEPARTMENTS = ('Engineering', 'Sales', 'Marketing', 'Finance', 'Operations', 'Support', 'Legal', 'People')
+POSITIONS = ('Engineer', 'Senior Engineer', 'Manager', 'Analyst', 'Designer', 'Consultant', 'Director', 'Intern')
+FIRST_NAMES = ('Ana', 'Luis', 'Maria', 'Juan', 'Sofia', 'Carlos', 'Laura', 'Diego', 'Elena', 'Pablo')
+LAST_NAMES = ('Garcia', 'Lopez', 'Martinez', 'Rodriguez', 'Gomez', 'Perez', 'Sanchez', 'Ramirez', 'Torres', 'Diaz')
+SKILL_NAMES = tuple(f'Skill {n:02d}' for n in range(40)) + (
+    'Python', 'SQL', 'Go', 'Docker', 'React', 'Kubernetes', 'Rust', 'Java', 'Excel', 'Negotiation')
+
+EMPLOYEE_FIELDS = ['id', 'name', 'position', 'email', 'department', 'seed', 'password_hash', 'version']
+SKILL_FIELDS = ['id', 'employee_id', 'skill_name', 'skill_level']
+
+
+def employee_email(employee_id):
+    return f'employee{employee_id}@bench.example.com'
+
+
+def employee_rows(rng, start, stop, password_hash):
+    for employee_id in range(start, stop):
+        yield (
+            employee_id,
+            f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {employee_id}',
+            rng.choice(POSITIONS),
+            employee_email(employee_id),
+            rng.choice(DEPARTMENTS),
+            f'AB{employee_id % 1000:03d}CD',
+            password_hash,
+            1,
+        )
+
+
+def skill_rows(rng, start, stop, skills_per_employee):
+    """Skills of employees [start, stop); skill ids are derived from the employee id."""
+    for employee_id in range(start, stop):
+        names = rng.sample(SKILL_NAMES, skills_per_employee)
+        first_id = (employee_id - 1) * skills_per_employee + 1
+        for offset, skill_name in enumerate(names):
+            yield (first_id + offset, employee_id, skill_name, rng.randint(0, 100))
+
+
+def skill_ids_of(employee_id, skills_per_employee):
+    first_id = (employee_id - 1) * skills_per_employee + 1
+    return range(first_id, first_id + skills_per_employee)
+
+
+def load_rows(connection, table, fields, rows):
+    if connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2':
+        copy_rows(connection, table.name, fields, rows)
+    else:
+        connection.execute(insert(table), [dict(zip(fields, row)) for row in rows])
+
+
+def generate(employees, skills_per_employee, seed=42, batch_size=10000):
+    """Recreate the schema and load the dataset in batches, one transaction each.
+
+    Runs inside an app context. Skill levels, names and departments are
+    drawn from random.Random(seed); ids are dense from 1.
+
+    Returns:
+        The report of row counts and timings.
+    """
+    skills_per_employee = min(skills_per_employee, len(SKILL_NAMES))
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    db.session.remove()
+    db.drop_all()
+    upgrade(db.engine)
+    # One hash shared by every row: hashing 100k passwords would dominate the load
+    password_hash = hash_password(DATASET_PASSWORD, **bcrypt_options())
+
+    employees_table, skills_table = Employee.__table__, Skill.__table__
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('PRAGMA synchronous = OFF')
+            connection.commit()
+        for start in range(1, employees + 1, batch_size):
+            stop = min(start + batch_size, employees + 1)
+            with connection.begin():
+                load_rows(connection, employees_table, EMPLOYEE_FIELDS,
+                          list(employee_rows(rng, start, stop, password_hash)))
+                load_rows(connection, skills_table, SKILL_FIELDS,
+                          list(skill_rows(rng, start, stop, skills_per_employee)))
+        with connection.begin():
+            connection.execute(fill_skill_stats())
+            connection.execute(fill_employee_counts())
+            if connection.dialect.name == 'postgresql':
+                # Ids were given explicitly; move the sequences past them
+                for table in ('employees', 'skills'):
+                    connection.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"))
+            connection.exec_driver_sql('ANALYZE')
+
+    return {
+        'employees': employees,
+        'skills': employees * skills_per_employee,
+        'skills_per_employee': skills_per_employee,
+        'seed': seed,
+        'database': db.engine.dialect.name,
+        'load_s': round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--employees', type=int, default=100000)
+    parser.add_argument('--skills', type=int, default=10, help='skills per employee')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--config', default='production', help='config name passed to create_app')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        report = generate(args.employees, args.skills, args.seed, args.batch_size)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""Load and latency benchmark of every employee API route.
+
+Run from the userapi directory, on a dataset made by benchmarks.dataset:
+
+    python -m benchmarks.dataset --employees 100000 --skills 10
+    python -m benchmarks.load --requests 500 --concurrency 8 --output results.json
+
+Each route is driven twice: in process through the Flask test client (no
+network, one request at a time) and over HTTP by --concurrency threads with
+keep-alive connections, against a threaded server started on a free port or
+against --url (e.g. gunicorn). The JSON report has throughput and
+p50/p95/p99 latency (ms) per route and driver, plus the commit, dataset and
+settings, so reports from different commits can be compared. The built-in
+server shares the process (and the GIL) with the load threads; point --url
+at gunicorn for numbers closer to production.
+
+Requests are generated from --seed, so two runs on a freshly generated
+dataset send the same requests. Writes and deletes use their own id ranges
+and consume the dataset: regenerate it before each run.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///benchmark.db')
+
+from sqlalchemy import func, select
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app.app import create_app
+from app.db.db import db, Employee, Skill
+from app.security.tokens import issue_tokens
+from benchmarks.dataset import (
+    DATASET_PASSWORD, DEPARTMENTS, FIRST_NAMES, SKILL_NAMES, employee_email, generate, skill_ids_of
+)
+
+# Requests per route relative to --requests (the export reads the whole table)
+REQUEST_SHARE = {'export_employees': 0.01, 'import_employees': 0.1}
+# Rows per bulk import request; each row costs a bcrypt hash
+IMPORT_BATCH = 10
+
+
+class Workload:
+    """Deterministic request generator over the id ranges of the dataset.
+
+    Reads use the first half of the employees, skill creates and updates
+    the next 10%, skill set replacements the next 10%, skill deletes the
+    next 10% and employee deletes the rest (from the top), so no route trips
+    over the rows another one changed.
+    """
+
+    def __init__(self, employees, skills_per_employee, tokens, seed=42):
+        self.employees = employees
+        self.skills_per_employee = skills_per_employee
+        self.tokens = tokens
+        self.rng = random.Random(seed)
+        self.run_id = seed
+        self.created = 0
+        self.read_ids = (1, max(1, employees * 5 // 10))
+        self.write_ids = (self.read_ids[1] + 1, max(self.read_ids[1] + 1, employees * 6 // 10))
+        self.replace_ids = (self.write_ids[1] + 1, max(self.write_ids[1] + 1, employees * 7 // 10))
+        self.next_skill_delete = skill_ids_of(self.replace_ids[1] + 1, skills_per_employee).start
+        self.next_employee_delete = employees
+        self.scenarios = {
+            'create_employee': self.create_employee,
+            'import_employees': self.import_employees,
+            'get_all_employees': self.get_all_employees,
+            'search_employees': self.search_employees,
+            'export_employees': lambda: ('GET', '/api/v1/employees/export', None, {}),
+            'get_employee_by_id': lambda: ('GET', f'/api/v1/employees/{self.read_id()}', None, {}),
+            'get_employee_by_email': lambda: (
+                'GET', f'/api/v1/employees/by-email/{employee_email(self.read_id())}', None, {}),
+            'login_employee': lambda: ('POST', '/api/v1/employees/login',
+                                       {'email': employee_email(self.read_id()), 'password': DATASET_PASSWORD}, {}),
+            'refresh_token': lambda: ('POST', '/api/v1/employees/token/refresh',
+                                      {'refresh_token': self.tokens['refresh_token']}, {}),
+            'get_current_employee': lambda: ('GET', '/api/v1/employees/me', None,
+                                             {'Authorization': f'Bearer {self.tokens["access_token"]}'}),
+            'create_skill': self.create_skill,
+            'get_employee_skills': lambda: ('GET', f'/api/v1/employees/{self.read_id()}/skills', None, {}),
+            'save_skill_set': self.save_skill_set,
+            'search_skills': self.search_skills,
+            'update_skill': self.update_skill,
+            'delete_skill': self.delete_skill,
+            'delete_employee': self.delete_employee,
+        }
+
+    def read_id(self):
+        return self.rng.randint(*self.read_ids)
+
+    def write_id(self):
+        return self.rng.randint(*self.write_ids)
+
+    def new_employee(self):
+        self.created += 1
+        return {
+            'name': f'New Employee {self.created}', 'position': 'Engineer',
+            'email': f'new{self.run_id}-{self.created}@bench.example.com', 'department': 'Engineering',
+            'seed': 'AB123CD', 'password': DATASET_PASSWORD,
+            'skills': [{'skill_name': name, 'skill_level': self.rng.randint(0, 100)}
+                       for name in self.rng.sample(SKILL_NAMES, 3)],
+        }
+
+    def create_employee(self):
+        return 'POST', '/api/v1/employees', self.new_employee(), {}
+
+    def import_employees(self):
+        return 'POST', '/api/v1/employees/bulk', [self.new_employee() for _ in range(IMPORT_BATCH)], {}
+
+    def get_all_employees(self):
+        return 'GET', f'/api/v1/employees?limit=50&after={self.read_id()}', None, {}
+
+    def search_employees(self):
+        # Typeahead: the first letters of a name, sometimes narrowed by a department
+        terms = [self.rng.choice(FIRST_NAMES)[:self.rng.randint(2, 4)]]
+        if self.rng.random() < 0.5:
+            terms.append(self.rng.choice(DEPARTMENTS)[:3])
+        return 'GET', f'/api/v1/employees/search?{urlencode({"q": " ".join(terms), "limit": 10})}', None, {}
+
+    def create_skill(self):
+        self.created += 1
+        return ('POST', f'/api/v1/employees/{self.write_id()}/skills',
+                {'skill_name': f'Bench {self.created}', 'skill_level': self.rng.randint(0, 100)}, {})
+
+    def save_skill_set(self):
+        skills = [{'skill_name': name, 'skill_level': self.rng.randint(0, 100)}
+                  for name in self.rng.sample(SKILL_NAMES, self.skills_per_employee)]
+        employee_id = self.rng.randint(*self.replace_ids)
+        return 'PUT', f'/api/v1/employees/{employee_id}/skills', {'skills': skills}, {}
+
+    def search_skills(self):
+        first, second = self.rng.sample(SKILL_NAMES, 2)
+        level = self.rng.randint(50, 95)
+        query = urlencode([('skill', f'{first}:{level}'), ('skill', f'{second}:{level}'), ('match', 'any')])
+        return 'GET', f'/api/v1/skills/search?{query}', None, {}
+
+    def update_skill(self):
+        skill_id = self.rng.choice(skill_ids_of(self.write_id(), self.skills_per_employee))
+        return 'PUT', f'/api/v1/skills/{skill_id}', {'skill_level': self.rng.randint(0, 100)}, {}
+
+    def delete_skill(self):
+        skill_id, self.next_skill_delete = self.next_skill_delete, self.next_skill_delete + 1
+        return 'DELETE', f'/api/v1/skills/{skill_id}', None, {}
+
+    def delete_employee(self):
+        employee_id, self.next_employee_delete = self.next_employee_delete, self.next_employee_delete - 1
+        return 'DELETE', f'/api/v1/employees/{employee_id}', None, {}
+
+    def requests(self, route, count):
+        return [self.scenarios[route]() for _ in range(count)]
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(latencies, statuses, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': sum(1 for status in statuses if status >= 400),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+    }
+
+
+def run_test_client(app, requests):
+    """Send the requests one by one through the Flask test client."""
+    client = app.test_client()
+    latencies, statuses = [], []
+    started = time.perf_counter()
+    for method, path, body, headers in requests:
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        response.get_data()
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status_code)
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def run_http(base_url, requests, concurrency):
+    """Send the requests from concurrency threads, each on its own keep-alive connection."""
+    url = urlsplit(base_url)
+    local = threading.local()
+
+    def send(request):
+        method, path, body, headers = request
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=300)
+        payload = None if body is None else json.dumps(body).encode()
+        headers = {**headers, **({'Content-Type': 'application/json'} if payload is not None else {})}
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            local.connection = None
+            status = 599
+        return time.perf_counter() - start, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, requests))
+    elapsed = time.perf_counter() - started
+    return summarize([latency for latency, _ in results], [status for _, status in results], elapsed)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve(app):
+    """Start a threaded server for app on a free local port; returns (server, base_url)."""
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def check_coverage(app, workload):
+    """Fail if an employee_bp route has no scenario, so new routes get benchmarked."""
+    endpoints = {rule.endpoint.split('.', 1)[1] for rule in app.url_map.iter_rules()
+                 if rule.endpoint.startswith('employee.')}
+    missing = endpoints.difference(workload.scenarios)
+    if missing:
+        raise SystemExit(f'No benchmark scenario for: {", ".join(sorted(missing))}')
+
+
+def commit_id():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(app, requests_per_route, concurrency, seed=42, url=None, drivers=('test_client', 'http')):
+    """Benchmark every employee route with each driver and return the report."""
+    with app.app_context():
+        employees = db.session.scalar(select(func.max(Employee.id))) or 0
+        skills = db.session.scalar(select(func.count()).select_from(Skill)) or 0
+        tokens = issue_tokens(db.session.get(Employee, 1))
+    workload = Workload(employees, max(1, round(skills / employees)) if employees else 1, tokens, seed)
+    check_coverage(app, workload)
+
+    report = {
+        'commit': commit_id(),
+        'python': platform.python_version(),
+        'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0],
+        'dataset': {'employees': employees, 'skills': skills},
+        'settings': {'requests_per_route': requests_per_route, 'concurrency': concurrency, 'seed': seed},
+    }
+    server = None
+    if 'http' in drivers and url is None:
+        server, url = serve(app)
+    try:
+        for driver in drivers:
+            results = report[driver] = {}
+            for route in workload.scenarios:
+                count = max(1, int(requests_per_route * REQUEST_SHARE.get(route, 1)))
+                requests = workload.requests(route, count)
+                if driver == 'test_client':
+                    results[route] = run_test_client(app, requests)
+                else:
+                    results[route] = run_http(url, requests, concurrency)
+    finally:
+        if server is not None:
+            server.shutdown()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='requests per route and driver')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--url', help='benchmark a running server instead of starting one')
+    parser.add_argument('--driver', choices=('test_client', 'http'), action='append',
+                        help='run only this driver (repeatable)')
+    parser.add_argument('--generate', type=int, metavar='EMPLOYEES',
+                        help='first regenerate the dataset with this many employees (10 skills each)')
+    parser.add_argument('--config', default='production', help='config name passed to create_app')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    if args.generate:
+        with app.app_context():
+            generate(args.generate, 10, args.seed)
+    report = run(app, args.requests, args.concurrency, args.seed, args.url,
+                 tuple(args.driver or ('test_client', 'http')))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
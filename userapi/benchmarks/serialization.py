@@ -0,0 +1,104 @@
+"""Micro-benchmark of the employee read path: ORM + to_dict + stdlib JSON
+against column rows + build_payloads + the configured fast JSON provider.
+
+Run from the userapi directory:
+
+    python -m benchmarks.serialization --employees 10000 --repeat 5
+
+The database defaults to an in-memory SQLite one (set DATABASE_URL to use
+another) and is filled with generated employees. Prints the best time in
+milliseconds for each phase as JSON.
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+from app.app import create_app
+from app.db.db import db, Employee, Skill
+from app.modules.employee.serializers import select_employees, build_payloads
+
+SKILL_NAMES = ('Python', 'SQL', 'Go', 'Docker', 'React')
+
+
+def populate(employee_count, skills_per_employee):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(Employee.__table__), [
+        {
+            'id': i, 'name': f'Employee {i}', 'position': 'Engineer',
+            'email': f'employee{i}@company.com', 'department': f'Department {i % 20}',
+            'password_hash': 'x', 'seed': 'AB123CD', 'version': 1,
+        }
+        for i in range(1, employee_count + 1)
+    ])
+    db.session.execute(insert(Skill.__table__), [
+        {'employee_id': i, 'skill_name': SKILL_NAMES[n], 'skill_level': (i + n) % 101}
+        for i in range(1, employee_count + 1)
+        for n in range(skills_per_employee)
+    ])
+    db.session.commit()
+
+
+def orm_payloads():
+    employees = Employee.query.options(selectinload(Employee.skills)).order_by(Employee.id).all()
+    return [employee.to_dict() for employee in employees]
+
+
+def row_payloads():
+    return build_payloads(db.session.execute(select_employees().order_by(Employee.id)))
+
+
+def best_of(repeat, fn):
+    """Best wall time in ms over repeat runs, with a fresh session each time."""
+    timings = []
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(min(timings), 2), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--skills', type=int, default=3, help='skills per employee (max 5)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    stdlib_json = DefaultJSONProvider(app)
+    with app.app_context():
+        populate(args.employees, min(args.skills, len(SKILL_NAMES)))
+
+        orm_build, orm_result = best_of(args.repeat, orm_payloads)
+        row_build, row_result = best_of(args.repeat, row_payloads)
+        # The relationship loader leaves skill order to the database, rows order by id
+        for employee in orm_result:
+            employee['skills'].sort(key=lambda skill: skill['id'])
+        assert orm_result == row_result, 'both paths must produce the same payloads'
+
+        body = {'employees': row_result}
+        stdlib_encode, _ = best_of(args.repeat, lambda: stdlib_json.dumps(body))
+        fast_encode, _ = best_of(args.repeat, lambda: app.json.dumps(body))
+
+    report = {
+        'employees': args.employees,
+        'skills_per_employee': min(args.skills, len(SKILL_NAMES)),
+        'json_provider': type(app.json).__name__,
+        'to_dict': {'build_ms': orm_build, 'encode_ms': stdlib_encode, 'total_ms': round(orm_build + stdlib_encode, 2)},
+        'rows': {'build_ms': row_build, 'encode_ms': fast_encode, 'total_ms': round(row_build + fast_encode, 2)},
+    }
+    report['speedup'] = round(report['to_dict']['total_ms'] / report['rows']['total_ms'], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()